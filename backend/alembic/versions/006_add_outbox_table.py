@@ -0,0 +1,67 @@
+"""Add outbox table and delivery columns on webhook_logs
+
+Revision ID: 006_add_outbox_table
+Revises: 005
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '006_add_outbox_table'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    
+    # Create outbox table for queued webhook deliveries (create_all may have built it already)
+    if not inspector.has_table('outbox'):
+        op.create_table('outbox',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('destination', sa.String(100), nullable=False),
+            sa.Column('url', sa.Text(), nullable=False),
+            sa.Column('payload', sa.Text(), nullable=False),
+            sa.Column('feedback_submission_id', sa.String(255), nullable=True),
+
+            # Delivery state
+            sa.Column('status', sa.String(20), nullable=False, server_default='pending'),
+            sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('next_attempt_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+            sa.Column('last_error', sa.Text(), nullable=True),
+
+            # Timestamps
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+
+            sa.PrimaryKeyConstraint('id')
+        )
+    op.execute('CREATE INDEX IF NOT EXISTS ix_outbox_id ON outbox (id)')
+    op.execute('CREATE INDEX IF NOT EXISTS ix_outbox_status_next_attempt_at ON outbox (status, next_attempt_at)')
+
+    # Link each logged delivery attempt back to its outbox message
+    columns = {column['name'] for column in inspector.get_columns('webhook_logs')}
+    missing = [name for name in ('outbox_id', 'attempt') if name not in columns]
+    if missing:
+        with op.batch_alter_table('webhook_logs') as batch_op:
+            for name in missing:
+                batch_op.add_column(sa.Column(name, sa.Integer(), nullable=True))
+    if 'ix_webhook_logs_outbox_id' not in {index['name'] for index in inspector.get_indexes('webhook_logs')}:
+        op.create_index('ix_webhook_logs_outbox_id', 'webhook_logs', ['outbox_id'], unique=False)
+
+
+def downgrade() -> None:
+    # Drop webhook_logs delivery columns
+    op.drop_index('ix_webhook_logs_outbox_id', table_name='webhook_logs')
+    with op.batch_alter_table('webhook_logs') as batch_op:
+        batch_op.drop_column('attempt')
+        batch_op.drop_column('outbox_id')
+
+    # Drop outbox table
+    op.drop_index('ix_outbox_status_next_attempt_at', table_name='outbox')
+    op.drop_index('ix_outbox_id', table_name='outbox')
+    op.drop_table('outbox')
@@ -0,0 +1,38 @@
+"""Add upload_cache table
+
+Revision ID: 007_add_upload_cache_table
+Revises: 006_add_outbox_table
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '007_add_upload_cache_table'
+down_revision = '006_add_outbox_table'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Create content-addressed index of uploaded images (create_all may have built it already)
+    if not sa.inspect(op.get_bind()).has_table('upload_cache'):
+        op.create_table('upload_cache',
+            sa.Column('content_hash', sa.String(128), nullable=False),
+            sa.Column('response_body', sa.Text(), nullable=False),
+            sa.Column('size_bytes', sa.Integer(), nullable=True),
+            sa.Column('content_type', sa.String(100), nullable=True),
+            sa.Column('hit_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+            sa.Column('last_accessed_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+
+            sa.PrimaryKeyConstraint('content_hash')
+        )
+    op.execute('CREATE INDEX IF NOT EXISTS ix_upload_cache_last_accessed_at ON upload_cache (last_accessed_at)')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_upload_cache_last_accessed_at', table_name='upload_cache')
+    op.drop_table('upload_cache')
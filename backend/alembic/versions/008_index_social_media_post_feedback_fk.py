@@ -0,0 +1,50 @@
+"""Index and foreign key for social_media_posts.feedback_submission_id
+
+Migration 003 declared both, but SQLite cannot ALTER constraints, so databases
+that were built by create_all or where 003 failed have neither. This migration
+only adds what is missing.
+
+Revision ID: 008_index_social_media_post_feedback_fk
+Revises: 007_add_upload_cache_table
+Create Date: 2026-10-16 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '008_index_social_media_post_feedback_fk'
+down_revision = '007_add_upload_cache_table'
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = 'ix_social_media_posts_feedback_submission_id'
+FK_NAME = 'fk_social_media_posts_feedback_submission_id'
+
+
+def _has_feedback_fk(inspector) -> bool:
+    return any(
+        fk['referred_table'] == 'feedback_submissions' and fk['constrained_columns'] == ['feedback_submission_id']
+        for fk in inspector.get_foreign_keys('social_media_posts')
+    )
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    
+    # Lookup of the post linked to a feedback submission was a full table scan
+    op.execute(f'CREATE INDEX IF NOT EXISTS {INDEX_NAME} ON social_media_posts (feedback_submission_id)')
+    
+    # SQLite needs the table rebuilt to add a constraint
+    if not _has_feedback_fk(inspector):
+        with op.batch_alter_table('social_media_posts') as batch_op:
+            batch_op.create_foreign_key(FK_NAME, 'feedback_submissions', ['feedback_submission_id'], ['submission_id'])
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if any(fk['name'] == FK_NAME for fk in inspector.get_foreign_keys('social_media_posts')):
+        with op.batch_alter_table('social_media_posts') as batch_op:
+            batch_op.drop_constraint(FK_NAME, type_='foreignkey')
+    op.execute(f'DROP INDEX IF EXISTS {INDEX_NAME}')
@@ -0,0 +1,34 @@
+"""Composite (created_at, id) indexes for keyset pagination
+
+Revision ID: 009_add_keyset_pagination_indexes
+Revises: 008_index_social_media_post_feedback_fk
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '009_add_keyset_pagination_indexes'
+down_revision = '008_index_social_media_post_feedback_fk'
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ('ix_feedback_submissions_created_at_id', 'feedback_submissions', ('created_at', 'id')),
+    ('ix_social_media_posts_created_at_id', 'social_media_posts', ('created_at', 'id')),
+    # The posts list is usually filtered by status
+    ('ix_social_media_posts_status_created_at_id', 'social_media_posts', ('status', 'created_at', 'id')),
+)
+
+
+def upgrade() -> None:
+    # create_all may already have built them on fresh databases
+    for name, table, columns in INDEXES:
+        op.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {table} ({", ".join(columns)})')
+
+
+def downgrade() -> None:
+    for name, _, _ in reversed(INDEXES):
+        op.execute(f'DROP INDEX IF EXISTS {name}')
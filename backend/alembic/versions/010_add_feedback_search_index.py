@@ -0,0 +1,31 @@
+"""Add feedback_search FTS5 index and sync triggers
+
+Revision ID: 010_add_feedback_search_index
+Revises: 009_add_keyset_pagination_indexes
+Create Date: 2026-10-16 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.search import create_search_index, drop_search_index, rebuild_search_index
+
+
+# revision identifiers, used by Alembic.
+revision = '010_add_feedback_search_index'
+down_revision = '009_add_keyset_pagination_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Full-text index over generated content, feedback and post prompts
+    connection = op.get_bind()
+    create_search_index(connection)
+    
+    # Index the rows written before the triggers existed
+    rebuild_search_index(connection)
+
+
+def downgrade() -> None:
+    drop_search_index(op.get_bind())
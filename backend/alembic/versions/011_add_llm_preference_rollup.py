@@ -0,0 +1,43 @@
+"""Add llm_preference_daily rollup and its maintenance triggers
+
+Revision ID: 011_add_llm_preference_rollup
+Revises: 010_add_feedback_search_index
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.analytics import backfill_llm_preferences, create_rollup_triggers, drop_rollup_triggers
+
+
+# revision identifiers, used by Alembic.
+revision = '011_add_llm_preference_rollup'
+down_revision = '010_add_feedback_search_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    
+    # Chosen-LLM counts per creation day, platform and model (create_all may have built it already)
+    if not sa.inspect(connection).has_table('llm_preference_daily'):
+        op.create_table('llm_preference_daily',
+            sa.Column('day', sa.Date(), nullable=False),
+            sa.Column('platform', sa.String(20), nullable=False),
+            sa.Column('model', sa.String(100), nullable=False),
+            sa.Column('count', sa.Integer(), nullable=False, server_default='0'),
+
+            sa.PrimaryKeyConstraint('day', 'platform', 'model')
+        )
+    
+    create_rollup_triggers(connection)
+    
+    # Count the submissions written before the triggers existed
+    backfill_llm_preferences(connection)
+
+
+def downgrade() -> None:
+    drop_rollup_triggers(op.get_bind())
+    op.drop_table('llm_preference_daily')
@@ -0,0 +1,39 @@
+"""Add cache_generations and the triggers that bump the feedback response cache generations
+
+Revision ID: 012_add_feedback_cache_generation
+Revises: 011_add_llm_preference_rollup
+Create Date: 2026-10-16 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.cache import create_generation_triggers, drop_generation_triggers
+
+
+# revision identifiers, used by Alembic.
+revision = '012_add_feedback_cache_generation'
+down_revision = '011_add_llm_preference_rollup'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    
+    # Per-key write counters that keep the per-worker response caches coherent
+    if not sa.inspect(connection).has_table('cache_generations'):
+        op.create_table('cache_generations',
+            sa.Column('name', sa.String(50), nullable=False),
+            sa.Column('cache_key', sa.String(255), nullable=False),
+            sa.Column('generation', sa.Integer(), nullable=False, server_default='0'),
+
+            sa.PrimaryKeyConstraint('name', 'cache_key')
+        )
+    
+    create_generation_triggers(connection)
+
+
+def downgrade() -> None:
+    drop_generation_triggers(op.get_bind())
+    op.drop_table('cache_generations')
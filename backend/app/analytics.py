@@ -0,0 +1,165 @@
+"""
+Incrementally maintained LLM preference rollup
+
+``llm_preference_daily`` counts feedback submissions per creation day,
+platform (linkedin, x, image) and chosen model. Triggers on
+``feedback_submissions`` keep it current: an insert counts the chosen models,
+an update that changes a choice moves one count from the old model to the new
+one (on the submission's creation day, so counts never drift), and a delete
+removes the counts. Date-range queries then read a few hundred rollup rows by
+primary key instead of scanning every submission.
+
+The triggers are created by migration 011 and, for databases built with
+``create_all``, by a metadata ``after_create`` hook. To recompute the rollup
+from scratch:
+
+    python -m app.analytics backfill
+"""
+import logging
+import sys
+from datetime import date
+from typing import Dict, List, Optional
+
+from sqlalchemy import event, select, text
+
+from . import models
+from .database import engine
+
+logger = logging.getLogger(__name__)
+
+
+ROLLUP_TABLE = "llm_preference_daily"
+PLATFORM_COLUMNS = {
+    "linkedin": "linkedin_chosen_llm",
+    "x": "x_chosen_llm",
+    "image": "image_chosen_llm",
+}
+
+
+def _increment(row: str, platform: str, column: str, condition: str) -> str:
+    # WHERE is required before ON CONFLICT in INSERT ... SELECT
+    return (
+        f"INSERT INTO {ROLLUP_TABLE}(day, platform, model, count) "
+        f"SELECT date({row}.created_at), '{platform}', {row}.{column}, 1 WHERE {condition} "
+        f"ON CONFLICT(day, platform, model) DO UPDATE SET count = count + 1;"
+    )
+
+
+def _decrement(row: str, platform: str, column: str, condition: str) -> str:
+    key = f"day = date({row}.created_at) AND platform = '{platform}' AND model = {row}.{column}"
+    return (
+        f"UPDATE {ROLLUP_TABLE} SET count = count - 1 WHERE {key} AND {condition};\n        "
+        f"DELETE FROM {ROLLUP_TABLE} WHERE {key} AND count <= 0;"
+    )
+
+
+def _statements(build, row: str, changed: bool = False) -> str:
+    """One statement per platform; with ``changed`` only for platforms whose choice (or day) changed"""
+    statements = []
+    for platform, column in PLATFORM_COLUMNS.items():
+        condition = f"coalesce({row}.{column}, '') != ''"
+        if changed:
+            condition += f" AND (old.{column} IS NOT new.{column} OR old.created_at IS NOT new.created_at)"
+        statements.append(build(row, platform, column, condition))
+    return "\n        ".join(statements)
+
+
+ROLLUP_DDL = [
+    f"""CREATE TRIGGER IF NOT EXISTS llm_preference_after_insert AFTER INSERT ON feedback_submissions BEGIN
+        {_statements(_increment, 'new')}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS llm_preference_after_update
+    AFTER UPDATE OF {', '.join(PLATFORM_COLUMNS.values())}, created_at ON feedback_submissions BEGIN
+        {_statements(_decrement, 'old', changed=True)}
+        {_statements(_increment, 'new', changed=True)}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS llm_preference_after_delete AFTER DELETE ON feedback_submissions BEGIN
+        {_statements(_decrement, 'old')}
+    END""",
+]
+
+ROLLUP_DROP = [
+    "DROP TRIGGER IF EXISTS llm_preference_after_delete",
+    "DROP TRIGGER IF EXISTS llm_preference_after_update",
+    "DROP TRIGGER IF EXISTS llm_preference_after_insert",
+]
+
+BACKFILL_SQL = " UNION ALL ".join(
+    f"SELECT date(created_at) AS day, '{platform}' AS platform, {column} AS model, count(*) AS count "
+    f"FROM feedback_submissions WHERE coalesce({column}, '') != '' GROUP BY day, {column}"
+    for platform, column in PLATFORM_COLUMNS.items()
+)
+
+
+def create_rollup_triggers(connection):
+    for statement in ROLLUP_DDL:
+        connection.execute(text(statement))
+
+
+def drop_rollup_triggers(connection):
+    for statement in ROLLUP_DROP:
+        connection.execute(text(statement))
+
+
+def backfill_llm_preferences(connection) -> int:
+    """Recompute the whole rollup from feedback_submissions; returns the number of rollup rows"""
+    connection.execute(text(f"DELETE FROM {ROLLUP_TABLE}"))
+    connection.execute(text(f"INSERT INTO {ROLLUP_TABLE}(day, platform, model, count) {BACKFILL_SQL}"))
+    rows = connection.execute(text(f"SELECT count(*) FROM {ROLLUP_TABLE}")).scalar()
+    logger.info("Backfilled %s with %s rows", ROLLUP_TABLE, rows)
+    return rows
+
+
+def llm_preferences(db, start: Optional[date] = None, end: Optional[date] = None, platform: Optional[str] = None) -> List:
+    """(day, platform, model, count) rollup rows in ``[start, end]``, oldest day first"""
+    rollup = models.LLMPreferenceDaily
+    query = select(rollup.day, rollup.platform, rollup.model, rollup.count)
+    if start:
+        query = query.where(rollup.day >= start)
+    if end:
+        query = query.where(rollup.day <= end)
+    if platform:
+        query = query.where(rollup.platform == platform)
+    return db.execute(query.order_by(rollup.day, rollup.platform, rollup.count.desc(), rollup.model)).all()
+
+
+def summarize(rows) -> List[Dict]:
+    """Total count and share of each model within its platform, most chosen first"""
+    totals: Dict[tuple, int] = {}
+    for row in rows:
+        totals[(row.platform, row.model)] = totals.get((row.platform, row.model), 0) + row.count
+    platform_totals: Dict[str, int] = {}
+    for (platform, _), count in totals.items():
+        platform_totals[platform] = platform_totals.get(platform, 0) + count
+    return [
+        {"platform": platform, "model": model, "count": count, "share": count / platform_totals[platform]}
+        for (platform, model), count in sorted(totals.items(), key=lambda item: (item[0][0], -item[1], item[0][1]))
+    ]
+
+
+@event.listens_for(models.Base.metadata, "after_create")
+def _create_rollup_triggers_after_create_all(target, connection, **kwargs):
+    if connection.dialect.name != "sqlite":
+        return
+    # A database from before the rollup existed has submissions the triggers never saw
+    existing = connection.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'llm_preference_after_insert'"
+    )).first()
+    create_rollup_triggers(connection)
+    if existing is None:
+        backfill_llm_preferences(connection)
+
+
+def main(argv: List[str]) -> int:
+    if argv[1:] != ["backfill"]:
+        print("usage: python -m app.analytics backfill", file=sys.stderr)
+        return 2
+    with engine.begin() as connection:
+        create_rollup_triggers(connection)
+        rows = backfill_llm_preferences(connection)
+    print(f"Backfilled {rows} rollup rows")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+from typing import Optional
+from datetime import date
+import logging
+import traceback
+
+from .. import schemas
+from ..analytics import PLATFORM_COLUMNS, llm_preferences, summarize
+from ..database import get_db
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+
+@router.get("/llm-preferences", response_model=schemas.LLMPreferencesResponse)
+def get_llm_preferences(
+    start: Optional[date] = Query(None, description="First creation day (UTC), inclusive"),
+    end: Optional[date] = Query(None, description="Last creation day (UTC), inclusive"),
+    platform: Optional[str] = Query(None, pattern=f"^({'|'.join(PLATFORM_COLUMNS)})$"),
+    daily: bool = Query(False, description="Include the per-day breakdown"),
+    db: Session = Depends(get_db)
+):
+    """Which LLM was chosen how often per platform, from the llm_preference_daily rollup"""
+    try:
+        logger.info("Fetching LLM preferences for start=%s, end=%s, platform=%s", start, end, platform)
+        
+        if start and end and start > end:
+            raise HTTPException(status_code=400, detail="start must not be after end")
+        
+        rows = llm_preferences(db, start=start, end=end, platform=platform)
+        
+        return schemas.LLMPreferencesResponse(
+            start=start,
+            end=end,
+            totals=summarize(rows),
+            daily=[schemas.LLMPreferenceDay.model_validate(row) for row in rows] if daily else None,
+        )
+        
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        logger.error("Database error fetching LLM preferences: %s", e)
+        raise HTTPException(
+            status_code=500, 
+            detail=f"Database error: {str(e)}"
+        )
+    except Exception as e:
+        logger.error("Unexpected error fetching LLM preferences: %s", e)
+        logger.error("Traceback: %s", traceback.format_exc())
+        raise HTTPException(
+            status_code=500, 
+            detail=f"Internal server error: {str(e)}"
+        )
@@ -1,16 +1,48 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Form, Body, Request
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Form, Body, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from typing import List, Optional, Union
+from pydantic import TypeAdapter, ValidationError
 import uuid
 import logging
+import os
 import traceback
 from datetime import datetime
 import json
 import re
 
-from .. import models, schemas
-from ..database import get_db
+from .. import database, models, schemas
+from ..cache import CACHE_HEADER, feedback_cache, read_generation
+from ..compression import precompressed_response
+from ..conditional import (
+    claim_version,
+    feedback_version_from_row,
+    feedback_version_statement,
+    has_preconditions,
+    if_match_failed,
+    is_not_modified,
+    not_modified_response,
+    validator_headers,
+    version_of
+)
+from ..database import get_db, get_async_db
+from ..export import EXPORT_FORMATS, export_statement, stream_export
+from ..filters import (
+    DEFAULT_SORT,
+    POST_FIELDS,
+    InvalidFilter,
+    filter_feedback,
+    parse_fields,
+    parse_sort,
+    project_feedback,
+    sort_feedback
+)
+from ..pagination import NEXT_CURSOR_HEADER, InvalidCursor, paginate
+from ..responses import model_response, models_response
+from ..search import search_feedback
 from ..main import (
     log_escape_characters, 
     validate_and_log_json_content, 
@@ -23,6 +55,121 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/feedback", tags=["feedback"])
 
+FEEDBACK_BULK_MAX_ITEMS = int(os.getenv("FEEDBACK_BULK_MAX_ITEMS", "1000"))
+FEEDBACK_BATCH_GET_MAX_IDS = int(os.getenv("FEEDBACK_BATCH_GET_MAX_IDS", "1000"))
+# Older SQLite builds allow 999 bound variables per statement
+IN_CLAUSE_CHUNK_SIZE = 500
+
+
+def get_feedback_with_post(db: Session, submission_id: str):
+    """Feedback submission and its first linked social media post in one LEFT JOIN query"""
+    row = db.query(models.FeedbackSubmission, models.SocialMediaPost).outerjoin(
+        models.SocialMediaPost,
+        models.SocialMediaPost.feedback_submission_id == models.FeedbackSubmission.submission_id
+    ).filter(
+        models.FeedbackSubmission.submission_id == submission_id
+    ).order_by(models.SocialMediaPost.id).first()
+    
+    if row is None:
+        return None, None
+    return row
+
+
+# Built once: validating a whole page through one adapter avoids a Python-level
+# constructor call (and FastAPI's second validation) per row
+FEEDBACK_RESPONSES = TypeAdapter(List[schemas.FeedbackSubmissionResponse])
+
+
+def first_post(feedback):
+    """First linked social media post of a submission loaded with ``selectinload``"""
+    return feedback.social_media_posts[0] if feedback.social_media_posts else None
+
+
+def build_feedback_responses(
+    feedbacks: List[models.FeedbackSubmission],
+    social_media_posts: List[Optional[models.SocialMediaPost]],
+    fields: Optional[List[str]] = None,
+) -> List[schemas.FeedbackSubmissionResponse]:
+    """Response models for feedback submissions, validated once; image URLs come from the linked posts
+    
+    Without ``fields`` the submissions are validated straight from their attributes.
+    With ``fields`` only those are read (unloaded columns are never touched) and set
+    on the models (see ``response_model_exclude_unset``).
+    """
+    if fields is None:
+        responses = FEEDBACK_RESPONSES.validate_python(feedbacks, from_attributes=True)
+        post_fields = POST_FIELDS
+    else:
+        feedback_fields = [field for field in fields if field not in POST_FIELDS]
+        responses = FEEDBACK_RESPONSES.validate_python(
+            [{field: getattr(feedback, field) for field in feedback_fields} for feedback in feedbacks]
+        )
+        post_fields = POST_FIELDS.intersection(fields)
+    
+    if not post_fields:
+        return responses
+    # The submission has image URL columns of its own; the linked post's win
+    return [
+        response.model_copy(update={
+            field: getattr(social_media_post, field) if social_media_post is not None else None for field in post_fields
+        })
+        for response, social_media_post in zip(responses, social_media_posts)
+    ]
+
+
+def build_feedback_response(feedback, social_media_post, fields: Optional[List[str]] = None) -> schemas.FeedbackSubmissionResponse:
+    return build_feedback_responses([feedback], [social_media_post], fields)[0]
+
+
+def feedback_form_link(submission_id: str) -> str:
+    return f"http://104.131.8.230:3000/feedback/{submission_id}"
+
+
+def clean_form_value(value):
+    """Clean form values - convert 'string' to None, empty strings to None, and strip quotes"""
+    if value is None or value == "" or value == "string":
+        return None
+    if isinstance(value, str):
+        
+        value = clean_string_content(value)
+    return value
+
+
+def prepare_feedback_data(feedback: schemas.FeedbackSubmissionCreate, context: str) -> dict:
+    """Column values for a new feedback submission with placeholder and quoted form values cleaned"""
+    feedback_data = feedback.model_dump()
+    log_escape_characters(feedback_data, context)
+    
+    for field_name, field_value in feedback_data.items():
+        if isinstance(field_value, str):
+            feedback_data[field_name] = clean_form_value(field_value)
+        elif field_value is not None:
+            feedback_data[field_name] = validate_and_log_json_content(field_value, field_name)
+    return feedback_data
+
+
+def parse_bulk_items(body: bytes, content_type: str) -> list:
+    """Items of a JSON array or NDJSON body; an NDJSON line that is not valid JSON becomes a JSONDecodeError item"""
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        items = []
+        for line in body.decode("utf-8").splitlines():
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                items.append(e)
+        return items
+    
+    try:
+        items = json.loads(body.decode("utf-8"))
+    except json.JSONDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON format: {str(e)}")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Expected a JSON array of feedback submissions or an NDJSON body")
+    return items
+
+
 @router.post("", response_model=schemas.FeedbackSubmissionCreateResponse)
 def create_feedback_submission(
     feedback: schemas.FeedbackSubmissionCreate,
@@ -30,28 +177,10 @@ def create_feedback_submission(
 ):
     """Create a new feedback submission"""
     try:
-        logger.info(f"Creating feedback submission for execution_id: {feedback.n8n_execution_id}")
-        
-        
-        feedback_data = feedback.model_dump()
-        log_escape_characters(feedback_data, "CREATE_FEEDBACK")
+        logger.info("Creating feedback submission for execution_id: %s", feedback.n8n_execution_id)
         
         
-        def clean_form_value(value):
-            """Clean form values - convert 'string' to None, empty strings to None, and strip quotes"""
-            if value is None or value == "" or value == "string":
-                return None
-            if isinstance(value, str):
-                
-                value = clean_string_content(value)
-            return value
-        
-        
-        for field_name, field_value in feedback_data.items():
-            if isinstance(field_value, str):
-                feedback_data[field_name] = clean_form_value(field_value)
-            elif field_value is not None:
-                feedback_data[field_name] = validate_and_log_json_content(field_value, field_name)
+        feedback_data = prepare_feedback_data(feedback, "CREATE_FEEDBACK")
         
         db_feedback = models.FeedbackSubmission(
             submission_id=str(uuid.uuid4()),
@@ -61,109 +190,350 @@ def create_feedback_submission(
         db.commit()
         db.refresh(db_feedback)
         
-        logger.info(f"Successfully created feedback submission with ID: {db_feedback.submission_id}")
-        
-        
-        feedback_form_link = f"http://104.131.8.230:3000/feedback/{db_feedback.submission_id}"
+        logger.info("Successfully created feedback submission with ID: %s", db_feedback.submission_id)
         
         return schemas.FeedbackSubmissionCreateResponse(
             status_code=201,
             submission_id=db_feedback.submission_id,
             feedback_id=db_feedback.submission_id,  
-            feedback_form_link=feedback_form_link,
+            feedback_form_link=feedback_form_link(db_feedback.submission_id),
             message="Feedback submission was stored successfully! You can provide feedback using the link above."
         )
         
     except IntegrityError as e:
-        logger.error(f"Database integrity error: {str(e)}")
+        logger.error("Database integrity error: %s", e)
         db.rollback()
         raise HTTPException(
             status_code=400, 
             detail=f"Database integrity error: {str(e)}"
         )
     except SQLAlchemyError as e:
-        logger.error(f"Database error: {str(e)}")
+        logger.error("Database error: %s", e)
         db.rollback()
         raise HTTPException(
             status_code=500, 
             detail=f"Database error: {str(e)}"
         )
     except Exception as e:
-        logger.error(f"Unexpected error creating feedback submission: {str(e)}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.error("Unexpected error creating feedback submission: %s", e)
+        logger.error("Traceback: %s", traceback.format_exc())
         db.rollback()
         raise HTTPException(
             status_code=500, 
             detail=f"Internal server error: {str(e)}"
         )
 
-@router.get("", response_model=List[schemas.FeedbackSubmissionResponse])
+@router.post("/bulk", response_model=schemas.FeedbackBulkCreateResponse)
+async def create_feedback_submissions_bulk(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create many feedback submissions in one transaction from a JSON array or NDJSON body
+    
+    Invalid items are reported per index and skipped; the valid ones are inserted
+    with a single executemany.
+    """
+    try:
+        body = await request.body()
+        items = parse_bulk_items(body, request.headers.get("content-type", ""))
+        logger.info("Bulk creating %s feedback submissions", len(items))
+        
+        if not items:
+            raise HTTPException(status_code=400, detail="No feedback submissions in request body")
+        if len(items) > FEEDBACK_BULK_MAX_ITEMS:
+            raise HTTPException(
+                status_code=413,
+                detail=f"At most {FEEDBACK_BULK_MAX_ITEMS} feedback submissions per request, got {len(items)}"
+            )
+        
+        results = []
+        rows = []
+        for index, item in enumerate(items):
+            if isinstance(item, json.JSONDecodeError):
+                errors = [{"type": "json_invalid", "loc": ["body", index], "msg": f"Invalid JSON format: {str(item)}"}]
+                results.append(schemas.FeedbackBulkItemResult(index=index, status_code=422, errors=errors))
+                continue
+            try:
+                feedback = schemas.FeedbackSubmissionCreate.model_validate(item)
+            except ValidationError as e:
+                errors = e.errors(include_url=False, include_context=False, include_input=False)
+                results.append(schemas.FeedbackBulkItemResult(index=index, status_code=422, errors=errors))
+                continue
+            
+            submission_id = str(uuid.uuid4())
+            rows.append({"submission_id": submission_id, **prepare_feedback_data(feedback, "BULK_CREATE_FEEDBACK")})
+            results.append(schemas.FeedbackBulkItemResult(
+                index=index,
+                status_code=201,
+                submission_id=submission_id,
+                feedback_form_link=feedback_form_link(submission_id),
+            ))
+        
+        if rows:
+            await db.execute(insert(models.FeedbackSubmission), rows)
+            await db.commit()
+        
+        failed = len(items) - len(rows)
+        logger.info("Bulk created %s feedback submissions, %s failed validation", len(rows), failed)
+        
+        if not failed:
+            status_code, message = 201, "All feedback submissions were stored successfully"
+        elif rows:
+            status_code, message = 207, f"{len(rows)} feedback submissions were stored, {failed} failed validation"
+        else:
+            status_code, message = 422, "No feedback submissions were stored, all failed validation"
+        
+        return schemas.FeedbackBulkCreateResponse(
+            status_code=status_code,
+            created=len(rows),
+            failed=failed,
+            results=results,
+            message=message,
+        )
+        
+    except HTTPException:
+        raise
+    except IntegrityError as e:
+        logger.error("Database integrity error in bulk create: %s", e)
+        await db.rollback()
+        raise HTTPException(
+            status_code=400, 
+            detail=f"Database integrity error: {str(e)}"
+        )
+    except SQLAlchemyError as e:
+        logger.error("Database error in bulk create: %s", e)
+        await db.rollback()
+        raise HTTPException(
+            status_code=500, 
+            detail=f"Database error: {str(e)}"
+        )
+    except Exception as e:
+        logger.error("Unexpected error in bulk create: %s", e)
+        logger.error("Traceback: %s", traceback.format_exc())
+        await db.rollback()
+        raise HTTPException(
+            status_code=500, 
+            detail=f"Internal server error: {str(e)}"
+        )
+
+@router.post("/batch-get", response_model=schemas.FeedbackBatchGetResponse)
+def get_feedback_batch(
+    request: schemas.FeedbackBatchGetRequest,
+    db: Session = Depends(get_db)
+):
+    """Get many feedback submissions by ID in input order, with their linked post image URLs
+    
+    Two queries per 500 IDs (the submissions, then their posts); unknown IDs are listed in ``missing``.
+    """
+    try:
+        submission_ids = list(dict.fromkeys(request.submission_ids))
+        logger.info("Fetching %s feedback submissions by ID", len(submission_ids))
+        
+        if len(submission_ids) > FEEDBACK_BATCH_GET_MAX_IDS:
+            raise HTTPException(
+                status_code=413,
+                detail=f"At most {FEEDBACK_BATCH_GET_MAX_IDS} submission IDs per request, got {len(submission_ids)}"
+            )
+        
+        found = {}
+        for start in range(0, len(submission_ids), IN_CLAUSE_CHUNK_SIZE):
+            chunk = submission_ids[start:start + IN_CLAUSE_CHUNK_SIZE]
+            for feedback in db.query(models.FeedbackSubmission).options(
+                selectinload(models.FeedbackSubmission.social_media_posts)
+            ).filter(models.FeedbackSubmission.submission_id.in_(chunk)):
+                found[feedback.submission_id] = feedback
+        
+        ordered = [found[submission_id] for submission_id in submission_ids if submission_id in found]
+        missing = [submission_id for submission_id in submission_ids if submission_id not in found]
+        results = build_feedback_responses(ordered, [first_post(feedback) for feedback in ordered])
+        
+        logger.info("Found %s feedback submissions, %s missing", len(results), len(missing))
+        return model_response(schemas.FeedbackBatchGetResponse.model_construct(results=results, missing=missing))
+        
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        logger.error("Database error fetching feedback submissions by ID: %s", e)
+        raise HTTPException(
+            status_code=500, 
+            detail=f"Database error: {str(e)}"
+        )
+    except Exception as e:
+        logger.error("Unexpected error fetching feedback submissions by ID: %s", e)
+        logger.error("Traceback: %s", traceback.format_exc())
+        raise HTTPException(
+            status_code=500, 
+            detail=f"Internal server error: {str(e)}"
+        )
+
+@router.get("", response_model=List[schemas.FeedbackSubmissionResponse], response_model_exclude_unset=True)
 def get_all_feedback_submissions(
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    email: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    linkedin_chosen_llm: Optional[str] = None,
+    has_feedback: Optional[bool] = None,
+    sort: Optional[str] = Query(None, description="Column to sort by, prefix with '-' for descending"),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields to return"),
     db: Session = Depends(get_db)
 ):
-    """Get all feedback submissions with pagination"""
+    """Get feedback submissions, oldest first unless ``sort`` says otherwise
+    
+    Pass the X-Next-Cursor response header back as ``cursor`` to get the next page
+    (default sort only); ``skip`` is still accepted but gets slower the deeper the page.
+    """
     try:
-        logger.info(f"Fetching all feedback submissions with skip={skip}, limit={limit}")
+        logger.info(
+            "Fetching feedback submissions with skip=%s, limit=%s, cursor=%s, sort=%s, fields=%s",
+            skip, limit, cursor, sort, fields
+        )
         
-        feedback_submissions = db.query(models.FeedbackSubmission).offset(skip).limit(limit).all()
+        sort_key = parse_sort(sort)
+        projected_fields = parse_fields(fields)
+        
+        query = project_feedback(db.query(models.FeedbackSubmission), projected_fields)
+        query = filter_feedback(
+            query,
+            email=email,
+            created_after=created_after,
+            created_before=created_before,
+            linkedin_chosen_llm=linkedin_chosen_llm,
+            has_feedback=has_feedback,
+        )
+        
+        headers = {}
+        if sort_key == (DEFAULT_SORT, False):
+            feedback_submissions, next_cursor = paginate(query, models.FeedbackSubmission, limit, cursor=cursor, skip=skip)
+            if next_cursor:
+                headers[NEXT_CURSOR_HEADER] = next_cursor
+        elif cursor:
+            raise HTTPException(status_code=400, detail="cursor can only be used with the default sort")
+        else:
+            feedback_submissions = sort_feedback(query, sort_key).offset(skip).limit(limit).all()
+        
+        logger.info("Successfully retrieved %s feedback submissions", len(feedback_submissions))
+        
+        wants_post = projected_fields is None or bool(POST_FIELDS.intersection(projected_fields))
+        posts = [first_post(feedback) if wants_post else None for feedback in feedback_submissions]
+        return models_response(
+            build_feedback_responses(feedback_submissions, posts, projected_fields),
+            exclude_unset=True,
+            headers=headers,
+        )
+        
+    except HTTPException:
+        raise
+    except (InvalidCursor, InvalidFilter) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except SQLAlchemyError as e:
+        logger.error("Database error fetching all feedback submissions: %s", e)
+        raise HTTPException(
+            status_code=500, 
+            detail=f"Database error: {str(e)}"
+        )
+    except Exception as e:
+        logger.error("Unexpected error fetching all feedback submissions: %s", e)
+        logger.error("Traceback: %s", traceback.format_exc())
+        raise HTTPException(
+            status_code=500, 
+            detail=f"Internal server error: {str(e)}"
+        )
+
+@router.get("/search", response_model=List[schemas.FeedbackSearchResult])
+def search_feedback_submissions(
+    q: str = Query(..., min_length=1, description='Words to find; "quoted phrase", prefix*'),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
+    """Full-text search over generated LinkedIn/X content, feedback and post prompts, best match first"""
+    try:
+        logger.info("Searching feedback submissions for q=%r, limit=%s, offset=%s", q, limit, offset)
         
-        logger.info(f"Successfully retrieved {len(feedback_submissions)} feedback submissions")
+        results = search_feedback(db, q, limit=limit, offset=offset)
         
-        response_list = []
-        for feedback in feedback_submissions:
-            response_data = {}
-            for field in schemas.FeedbackSubmissionResponse.model_fields:
-                value = getattr(feedback, field, None)
-                response_data[field] = value if value is not None else None
-            response_list.append(schemas.FeedbackSubmissionResponse(**response_data))
-        return response_list
+        logger.info("Search for %r returned %s results", q, len(results))
+        return results
         
     except SQLAlchemyError as e:
-        logger.error(f"Database error fetching all feedback submissions: {str(e)}")
+        logger.error("Database error searching feedback submissions: %s", e)
         raise HTTPException(
             status_code=500, 
             detail=f"Database error: {str(e)}"
         )
     except Exception as e:
-        logger.error(f"Unexpected error fetching all feedback submissions: {str(e)}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.error("Unexpected error searching feedback submissions: %s", e)
+        logger.error("Traceback: %s", traceback.format_exc())
         raise HTTPException(
             status_code=500, 
             detail=f"Internal server error: {str(e)}"
         )
 
+@router.get("/export")
+def export_feedback_submissions(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    email: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    linkedin_chosen_llm: Optional[str] = None,
+    has_feedback: Optional[bool] = None,
+):
+    """Stream every matching feedback submission joined with its social media posts as NDJSON or CSV
+    
+    Takes the same filters as the list endpoint. ``CompressionMiddleware`` encodes
+    the stream per ``Accept-Encoding``. Errors after the first chunk can only
+    truncate the stream.
+    """
+    logger.info(
+        "Exporting feedback submissions as %s (email=%s, created_after=%s, created_before=%s, linkedin_chosen_llm=%s, has_feedback=%s)",
+        export_format, email, created_after, created_before, linkedin_chosen_llm, has_feedback
+    )
+    
+    statement = filter_feedback(
+        export_statement(),
+        email=email,
+        created_after=created_after,
+        created_before=created_before,
+        linkedin_chosen_llm=linkedin_chosen_llm,
+        has_feedback=has_feedback,
+    )
+    
+    return StreamingResponse(
+        stream_export(database.SessionLocal, statement, fmt=export_format),
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="feedback_export.{export_format}"', "Vary": "Accept-Encoding"},
+    )
+
 @router.get("/execution/{execution_id}", response_model=List[schemas.FeedbackSubmissionResponse])
 def get_feedback_by_execution_id(execution_id: str, db: Session = Depends(get_db)):
     """Get feedback submissions by n8n execution ID"""
     try:
-        logger.info(f"Fetching feedback submissions for execution_id: {execution_id}")
+        logger.info("Fetching feedback submissions for execution_id: %s", execution_id)
         
-        feedback_submissions = db.query(models.FeedbackSubmission).filter(
+        feedback_submissions = db.query(models.FeedbackSubmission).options(
+            selectinload(models.FeedbackSubmission.social_media_posts)
+        ).filter(
             models.FeedbackSubmission.n8n_execution_id == execution_id
         ).all()
         
-        logger.info(f"Successfully retrieved {len(feedback_submissions)} feedback submissions for execution_id: {execution_id}")
+        logger.info("Successfully retrieved %s feedback submissions for execution_id: %s", len(feedback_submissions), execution_id)
         
-        response_list = []
-        for feedback in feedback_submissions:
-            response_data = {}
-            for field in schemas.FeedbackSubmissionResponse.model_fields:
-                value = getattr(feedback, field, None)
-                response_data[field] = value if value is not None else None
-            response_list.append(schemas.FeedbackSubmissionResponse(**response_data))
-        return response_list
+        return models_response(
+            build_feedback_responses(feedback_submissions, [first_post(feedback) for feedback in feedback_submissions])
+        )
         
     except SQLAlchemyError as e:
-        logger.error(f"Database error fetching feedback by execution_id: {str(e)}")
+        logger.error("Database error fetching feedback by execution_id: %s", e)
         raise HTTPException(
             status_code=500, 
             detail=f"Database error: {str(e)}"
         )
     except Exception as e:
-        logger.error(f"Unexpected error fetching feedback by execution_id: {str(e)}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.error("Unexpected error fetching feedback by execution_id: %s", e)
+        logger.error("Traceback: %s", traceback.format_exc())
         raise HTTPException(
             status_code=500, 
             detail=f"Internal server error: {str(e)}"
@@ -172,67 +542,55 @@ def get_feedback_by_execution_id(execution_id: str, db: Session = Depends(get_db
 @router.get("/{submission_id}", response_model=schemas.FeedbackSubmissionResponse)
 def get_feedback_by_submission_id(submission_id: str, request: Request, db: Session = Depends(get_db)):
     """Get feedback submission by submission ID"""
-    logger.info(f"GET /api/feedback/{submission_id} endpoint called")
-    logger.info(f"Request received for submission ID: {submission_id}")
-    logger.info(f"Request headers: {dict(request.headers)}")
-    logger.info(f"Request method: {request.method}")
-    logger.info(f"Request URL: {request.url}")
     try:
-        logger.info(f"Fetching feedback submission with ID: {submission_id}")
-        
-        feedback = db.query(models.FeedbackSubmission).filter(
-            models.FeedbackSubmission.submission_id == submission_id
-        ).first()
-        
-        if feedback is None:
-            logger.warning(f"Feedback submission not found with ID: {submission_id}")
-            raise HTTPException(status_code=404, detail="Feedback submission not found")
-        
-        logger.info(f"Successfully retrieved feedback submission with ID: {submission_id}")
-        
+        logger.debug("Fetching feedback submission with ID: %s", submission_id)
         
-        social_media_post = db.query(models.SocialMediaPost).filter(
-            models.SocialMediaPost.feedback_submission_id == submission_id
-        ).first()
+        cached = None
+        if feedback_cache.enabled:
+            # Read the generation before the data, so a concurrent write makes this entry stale
+            generation = read_generation(db, feedback_cache.name, submission_id)
+            cached = feedback_cache.get(submission_id, generation)
         
+        if cached is None and has_preconditions(request):
+            version = feedback_version_from_row(db.execute(feedback_version_statement(submission_id)).first())
+            if version is not None and is_not_modified(request, *version):
+                return not_modified_response(*version)
         
-        response_data = {}
-        for field in schemas.FeedbackSubmissionResponse.model_fields:
-            try:
-                value = getattr(feedback, field, None)
-                response_data[field] = value if value is not None else None
-            except AttributeError:
-                
-                response_data[field] = None
-        
+        if cached is not None:
+            body, etag, last_modified, variants = cached
+            if is_not_modified(request, etag, last_modified):
+                return not_modified_response(etag, last_modified)
+            headers = {CACHE_HEADER: "HIT", **validator_headers(etag, last_modified)}
+            return precompressed_response(request, body, variants, headers=headers)
         
-        if social_media_post:
-            logger.info(f"Found linked social media post with image_url: {social_media_post.image_url}")
-            logger.info(f"Found linked social media post with uploaded_image_url: {social_media_post.uploaded_image_url}")
-            response_data['image_url'] = social_media_post.image_url
-            response_data['uploaded_image_url'] = social_media_post.uploaded_image_url
-        else:
-            logger.warning(f"No linked social media post found for feedback submission {submission_id}")
-            response_data['image_url'] = None
-            response_data['uploaded_image_url'] = None
+        feedback, social_media_post = get_feedback_with_post(db, submission_id)
         
-        logger.info(f"Returning response data for submission {submission_id}")
-        logger.info(f"Image URLs in response: image_url={response_data.get('image_url')}, uploaded_image_url={response_data.get('uploaded_image_url')}")
+        if feedback is None:
+            logger.warning("Feedback submission not found with ID: %s", submission_id)
+            raise HTTPException(status_code=404, detail="Feedback submission not found")
         
+        logger.debug("Successfully retrieved feedback submission with ID: %s", submission_id)
         
-        return schemas.FeedbackSubmissionResponse(**response_data)
+        body = build_feedback_response(feedback, social_media_post).model_dump_json().encode("utf-8")
+        etag, last_modified = version_of(feedback, social_media_post)
+        # Encoded copies are added to the entry as clients ask for them
+        variants = {}
+        if feedback_cache.enabled:
+            feedback_cache.set(submission_id, (body, etag, last_modified, variants), generation)
+        headers = {CACHE_HEADER: "MISS", **validator_headers(etag, last_modified)}
+        return precompressed_response(request, body, variants, headers=headers)
         
     except HTTPException:
         raise
     except SQLAlchemyError as e:
-        logger.error(f"Database error fetching feedback submission: {str(e)}")
+        logger.error("Database error fetching feedback submission: %s", e)
         raise HTTPException(
             status_code=500, 
             detail=f"Database error: {str(e)}"
         )
     except Exception as e:
-        logger.error(f"Unexpected error fetching feedback submission: {str(e)}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.error("Unexpected error fetching feedback submission: %s", e)
+        logger.error("Traceback: %s", traceback.format_exc())
         raise HTTPException(
             status_code=500, 
             detail=f"Internal server error: {str(e)}"
@@ -242,32 +600,42 @@ def get_feedback_by_submission_id(submission_id: str, request: Request, db: Sess
 def update_feedback_submission(
     submission_id: str,
     feedback_update: schemas.FeedbackSubmissionUpdate,
+    request: Request,
     db: Session = Depends(get_db)
 ):
-    """Update an existing feedback submission"""
+    """Update an existing feedback submission
+    
+    With ``If-Match`` the update only applies if the submission still has that ETag (412 otherwise).
+    """
     try:
-        logger.info(f"Updating feedback submission with ID: {submission_id}")
-        logger.info(f"Update data received: {feedback_update.model_dump()}")
+        logger.debug("Updating feedback submission with ID: %s", submission_id)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Update data received: %s", feedback_update.model_dump())
         
         
-        db_feedback = db.query(models.FeedbackSubmission).filter(
-            models.FeedbackSubmission.submission_id == submission_id
-        ).first()
+        checked_version = None
+        if "if-match" in request.headers:
+            checked_version = db.execute(feedback_version_statement(submission_id)).first()
+            if checked_version is not None and if_match_failed(request, feedback_version_from_row(checked_version)[0]):
+                logger.info("If-Match precondition failed updating feedback submission %s", submission_id)
+                raise HTTPException(status_code=412, detail="Feedback submission was modified since it was read")
+        
+        db_feedback, social_media_post = get_feedback_with_post(db, submission_id)
         
         if db_feedback is None:
-            logger.warning(f"Feedback submission not found with ID: {submission_id}")
+            logger.warning("Feedback submission not found with ID: %s", submission_id)
             raise HTTPException(status_code=404, detail="Feedback submission not found")
         
-        logger.info(f"Found existing feedback: {db_feedback.submission_id}")
+        logger.debug("Found existing feedback: %s", db_feedback.submission_id)
         
         
         update_data = feedback_update.model_dump(exclude_unset=True)
-        logger.info(f"Fields to update: {list(update_data.keys())}")
+        logger.debug("Fields to update: %s", list(update_data.keys()))
         
         
         forbidden_fields = {'id', 'submission_id', 'created_at'}
         update_data = {k: v for k, v in update_data.items() if k not in forbidden_fields}
-        logger.info(f"Filtered fields to update: {list(update_data.keys())}")
+        logger.debug("Filtered fields to update: %s", list(update_data.keys()))
         
         
         if 'email' in update_data:
@@ -303,92 +671,53 @@ def update_feedback_submission(
             
             update_data['updated_at'] = datetime.utcnow()
             
+            if checked_version is not None:
+                claimed = db.execute(claim_version(models.FeedbackSubmission, checked_version, update_data['updated_at']))
+                if claimed.rowcount == 0:
+                    db.rollback()
+                    logger.info("Feedback submission %s was written after its If-Match check", submission_id)
+                    raise HTTPException(status_code=412, detail="Feedback submission was modified since it was read")
+            
             for field, value in update_data.items():
-                logger.info(f"Setting field {field} to {value}")
+                logger.debug("Setting field %s to %s", field, value)
                 setattr(db_feedback, field, value)
             
+            # Build the response before committing: every changed value is already
+            # on the instance, and commit would expire it and force a reload
+            db.flush()
+            updated = build_feedback_response(db_feedback, social_media_post)
+            headers = validator_headers(*version_of(db_feedback, social_media_post))
             db.commit()
-            db.refresh(db_feedback)
-            
-            logger.info(f"Successfully updated feedback submission with ID: {submission_id}")
-            
-            
-            social_media_post = db.query(models.SocialMediaPost).filter(
-                models.SocialMediaPost.feedback_submission_id == submission_id
-            ).first()
-            
-            
-            response_data = {}
-            for field in schemas.FeedbackSubmissionResponse.model_fields:
-                try:
-                    value = getattr(db_feedback, field, None)
-                    response_data[field] = value if value is not None else None
-                except AttributeError:
-                    
-                    response_data[field] = None
-            
+            feedback_cache.invalidate(submission_id)
             
-            if social_media_post:
-                logger.info(f"Found linked social media post with image_url: {social_media_post.image_url}")
-                logger.info(f"Found linked social media post with uploaded_image_url: {social_media_post.uploaded_image_url}")
-                response_data['image_url'] = social_media_post.image_url
-                response_data['uploaded_image_url'] = social_media_post.uploaded_image_url
-            else:
-                logger.warning(f"No linked social media post found for feedback submission {submission_id}")
-                response_data['image_url'] = None
-                response_data['uploaded_image_url'] = None
+            logger.info("Successfully updated feedback submission with ID: %s", submission_id)
             
-            return schemas.FeedbackSubmissionResponse(**response_data)
+            return model_response(updated, headers=headers)
         else:
-            logger.info(f"No fields to update for submission ID: {submission_id}")
-            
-            
-            social_media_post = db.query(models.SocialMediaPost).filter(
-                models.SocialMediaPost.feedback_submission_id == submission_id
-            ).first()
-            
-            
-            response_data = {}
-            for field in schemas.FeedbackSubmissionResponse.model_fields:
-                try:
-                    value = getattr(db_feedback, field, None)
-                    response_data[field] = value if value is not None else None
-                except AttributeError:
-                    
-                    response_data[field] = None
-            
+            logger.debug("No fields to update for submission ID: %s", submission_id)
             
-            if social_media_post:
-                logger.info(f"Found linked social media post with image_url: {social_media_post.image_url}")
-                logger.info(f"Found linked social media post with uploaded_image_url: {social_media_post.uploaded_image_url}")
-                response_data['image_url'] = social_media_post.image_url
-                response_data['uploaded_image_url'] = social_media_post.uploaded_image_url
-            else:
-                logger.warning(f"No linked social media post found for feedback submission {submission_id}")
-                response_data['image_url'] = None
-                response_data['uploaded_image_url'] = None
-            
-            return schemas.FeedbackSubmissionResponse(**response_data)
+            headers = validator_headers(*version_of(db_feedback, social_media_post))
+            return model_response(build_feedback_response(db_feedback, social_media_post), headers=headers)
             
     except HTTPException:
         raise
     except IntegrityError as e:
-        logger.error(f"Database integrity error updating feedback submission: {str(e)}")
+        logger.error("Database integrity error updating feedback submission: %s", e)
         db.rollback()
         raise HTTPException(
             status_code=400, 
             detail=f"Database integrity error: {str(e)}"
         )
     except SQLAlchemyError as e:
-        logger.error(f"Database error updating feedback submission: {str(e)}")
+        logger.error("Database error updating feedback submission: %s", e)
         db.rollback()
         raise HTTPException(
             status_code=500, 
             detail=f"Database error: {str(e)}"
         )
     except Exception as e:
-            logger.error(f"Unexpected error updating feedback submission: {str(e)}")
-            logger.error(f"Traceback: {traceback.format_exc()}")
+            logger.error("Unexpected error updating feedback submission: %s", e)
+            logger.error("Traceback: %s", traceback.format_exc())
             db.rollback()
             
             
@@ -407,31 +736,45 @@ def update_feedback_submission(
 async def update_feedback_submission_raw(
     submission_id: str,
     request: Request,
-    db: Session = Depends(get_db)
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Update an existing feedback submission with raw JSON handling"""
+    """Update an existing feedback submission with raw JSON handling
+    
+    With ``If-Match`` the update only applies if the submission still has that ETag (412 otherwise).
+    """
     try:
-        logger.info(f"Updating feedback submission with ID: {submission_id} using raw JSON")
+        logger.debug("Updating feedback submission with ID: %s using raw JSON", submission_id)
         
         
-        db_feedback = db.query(models.FeedbackSubmission).filter(
-            models.FeedbackSubmission.submission_id == submission_id
-        ).first()
+        result = await db.execute(
+            select(models.FeedbackSubmission).where(
+                models.FeedbackSubmission.submission_id == submission_id
+            )
+        )
+        db_feedback = result.scalars().first()
         
         if db_feedback is None:
-            logger.warning(f"Feedback submission not found with ID: {submission_id}")
+            logger.warning("Feedback submission not found with ID: %s", submission_id)
             raise HTTPException(status_code=404, detail="Feedback submission not found")
         
+        checked_version = None
+        if "if-match" in request.headers:
+            checked_version = (await db.execute(feedback_version_statement(submission_id))).first()
+            if checked_version is None or if_match_failed(request, feedback_version_from_row(checked_version)[0]):
+                logger.info("If-Match precondition failed updating feedback submission %s", submission_id)
+                raise HTTPException(status_code=412, detail="Feedback submission was modified since it was read")
+        
         
         try:
             body = await request.body()
             raw_data = json.loads(body.decode('utf-8'))
         except json.JSONDecodeError as e:
-            logger.error(f"JSON decode error: {str(e)}")
+            logger.error("JSON decode error: %s", e)
             
             try:
                 body_str = body.decode('utf-8')
-                logger.info(f"Attempting to clean JSON string. Original length: {len(body_str)}")
+                logger.debug("Attempting to clean JSON string. Original length: %s", len(body_str))
                 
                 
                 cleaned_str = body_str
@@ -439,7 +782,7 @@ async def update_feedback_submission_raw(
                 
                 if "'" in cleaned_str:
                     cleaned_str = cleaned_str.replace("'", "\\'")
-                    logger.info("Replaced unescaped apostrophes")
+                    logger.debug("Replaced unescaped apostrophes")
                 
                 
                 
@@ -450,14 +793,14 @@ async def update_feedback_submission_raw(
                 
                 cleaned_str = re.sub(r'[\x00-\x1f\x7f-\x9f]', '', cleaned_str)
                 
-                logger.info("Cleaned control characters from JSON string")
+                logger.debug("Cleaned control characters from JSON string")
                 
                 
                 raw_data = json.loads(cleaned_str)
-                logger.info("Successfully cleaned and parsed JSON after initial failure")
+                logger.debug("Successfully cleaned and parsed JSON after initial failure")
                 
             except Exception as clean_error:
-                logger.error(f"Failed to clean JSON: {str(clean_error)}")
+                logger.error("Failed to clean JSON: %s", clean_error)
                 
                 body_str = body.decode('utf-8')
                 error_pos = e.pos
@@ -488,6 +831,13 @@ async def update_feedback_submission_raw(
             
             raw_data['updated_at'] = datetime.utcnow()
             
+            if checked_version is not None:
+                claimed = await db.execute(claim_version(models.FeedbackSubmission, checked_version, raw_data['updated_at']))
+                if claimed.rowcount == 0:
+                    await db.rollback()
+                    logger.info("Feedback submission %s was written after its If-Match check", submission_id)
+                    raise HTTPException(status_code=412, detail="Feedback submission was modified since it was read")
+            
             for field, value in raw_data.items():
                 if hasattr(db_feedback, field):
                     
@@ -497,42 +847,45 @@ async def update_feedback_submission_raw(
                             
                             if isinstance(value, str):
                                 value = clean_string_content(value)
-                            logger.info(f"Updating n8n_execution_id from '{current_value}' to '{value}'")
+                            logger.debug("Updating n8n_execution_id from '%s' to '%s'", current_value, value)
                             setattr(db_feedback, field, value)
                         else:
-                            logger.info(f"Skipping n8n_execution_id update - current value '{current_value}' is not empty")
+                            logger.debug("Skipping n8n_execution_id update - current value '%s' is not empty", current_value)
                     else:
                         
-                        logger.info(f"Updating field '{field}' to '{value}'")
+                        logger.debug("Updating field '%s' to '%s'", field, value)
                         setattr(db_feedback, field, value)
         
-        db.commit()
-        db.refresh(db_feedback)
+        await db.commit()
+        feedback_cache.invalidate(submission_id)
+        await db.refresh(db_feedback)
+        version = feedback_version_from_row((await db.execute(feedback_version_statement(submission_id))).first())
+        response.headers.update(validator_headers(*version))
         
-        logger.info(f"Successfully updated feedback submission with ID: {submission_id}")
+        logger.info("Successfully updated feedback submission with ID: %s", submission_id)
         
         return db_feedback
             
     except HTTPException:
         raise
     except IntegrityError as e:
-        logger.error(f"Database integrity error updating feedback submission: {str(e)}")
-        db.rollback()
+        logger.error("Database integrity error updating feedback submission: %s", e)
+        await db.rollback()
         raise HTTPException(
             status_code=400, 
             detail=f"Database integrity error: {str(e)}"
         )
     except SQLAlchemyError as e:
-        logger.error(f"Database error updating feedback submission: {str(e)}")
-        db.rollback()
+        logger.error("Database error updating feedback submission: %s", e)
+        await db.rollback()
         raise HTTPException(
             status_code=500, 
             detail=f"Database error: {str(e)}"
         )
     except Exception as e:
-        logger.error(f"Unexpected error updating feedback submission: {str(e)}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
-        db.rollback()
+        logger.error("Unexpected error updating feedback submission: %s", e)
+        logger.error("Traceback: %s", traceback.format_exc())
+        await db.rollback()
         raise HTTPException(
             status_code=500, 
             detail=f"Internal server error: {str(e)}"
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from . import feedback, social_media, webhooks, utils, users
+from . import feedback, social_media, webhooks, utils, users, analytics
 
 # Create the main API router with /api prefix
 api_router = APIRouter(prefix="/api")
@@ -10,3 +10,4 @@ api_router.include_router(social_media.router)
 api_router.include_router(webhooks.router)
 api_router.include_router(utils.router)
 api_router.include_router(users.router)
+api_router.include_router(analytics.router)
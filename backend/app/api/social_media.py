@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Body
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Body, Request, Response
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from typing import List, Optional, Union
@@ -11,7 +11,20 @@ import re
 import os
 
 from .. import models, schemas
+from ..cache import feedback_cache
+from ..conditional import (
+    claim_version,
+    has_preconditions,
+    if_match_failed,
+    is_not_modified,
+    not_modified_response,
+    post_version_from_row,
+    post_version_statement,
+    validator_headers,
+    version_of
+)
 from ..database import get_db
+from ..pagination import NEXT_CURSOR_HEADER, InvalidCursor, paginate
 from ..main import (
     determine_post_image_type,
     handle_image_url_storage
@@ -28,19 +41,19 @@ def create_social_media_post(
 ):
     """Create a new social media post request"""
     try:
-        logger.info(f"Creating social media post for creator: {post.content_creator}")
+        logger.info("Creating social media post for creator: %s", post.content_creator)
         
         
         post_data = post.model_dump()
-        logger.info(f"Received post data: {post_data}")
+        logger.info("Received post data: %s", post_data)
         
         if 'post_image_type' in post_data:
             post_data['post_image_type'] = determine_post_image_type(post_data['post_image_type'])
-            logger.info(f"Determined post_image_type: {post_data['post_image_type']}")
+            logger.info("Determined post_image_type: %s", post_data['post_image_type'])
             
             
             post_data = handle_image_url_storage(post_data, post_data['post_image_type'])
-            logger.info(f"After image URL handling: image_url={post_data.get('image_url')}, uploaded_image_url={post_data.get('uploaded_image_url')}")
+            logger.info("After image URL handling: image_url=%s, uploaded_image_url=%s", post_data.get('image_url'), post_data.get('uploaded_image_url'))
         
         
         for field, value in post_data.items():
@@ -56,26 +69,26 @@ def create_social_media_post(
         db.commit()
         db.refresh(db_post)
         
-        logger.info(f"Successfully created social media post with ID: {db_post.post_id}")
+        logger.info("Successfully created social media post with ID: %s", db_post.post_id)
         return db_post
         
     except IntegrityError as e:
-        logger.error(f"Database integrity error: {str(e)}")
+        logger.error("Database integrity error: %s", e)
         db.rollback()
         raise HTTPException(
             status_code=400, 
             detail=f"Database integrity error: {str(e)}"
         )
     except SQLAlchemyError as e:
-        logger.error(f"Database error: {str(e)}")
+        logger.error("Database error: %s", e)
         db.rollback()
         raise HTTPException(
             status_code=500, 
             detail=f"Database error: {str(e)}"
         )
     except Exception as e:
-        logger.error(f"Unexpected error creating social media post: {str(e)}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.error("Unexpected error creating social media post: %s", e)
+        logger.error("Traceback: %s", traceback.format_exc())
         db.rollback()
         raise HTTPException(
             status_code=500, 
@@ -84,67 +97,83 @@ def create_social_media_post(
 
 @router.get("", response_model=List[schemas.SocialMediaPostResponse])
 def get_all_social_media_posts(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     status: Optional[str] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    """Get all social media posts with optional filtering by status"""
+    """Get all social media posts, oldest first, with optional filtering by status
+    
+    Pass the X-Next-Cursor response header back as ``cursor`` to get the next page;
+    ``skip`` is still accepted but gets slower the deeper the page.
+    """
     try:
-        logger.info(f"Fetching social media posts with skip={skip}, limit={limit}, status={status}")
+        logger.info("Fetching social media posts with skip=%s, limit=%s, status=%s, cursor=%s", skip, limit, status, cursor)
         
         query = db.query(models.SocialMediaPost)
         
         if status:
             query = query.filter(models.SocialMediaPost.status == status)
         
-        posts = query.offset(skip).limit(limit).all()
+        posts, next_cursor = paginate(query, models.SocialMediaPost, limit, cursor=cursor, skip=skip)
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
         
-        logger.info(f"Successfully retrieved {len(posts)} social media posts")
+        logger.info("Successfully retrieved %s social media posts", len(posts))
         return posts
         
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except SQLAlchemyError as e:
-        logger.error(f"Database error fetching social media posts: {str(e)}")
+        logger.error("Database error fetching social media posts: %s", e)
         raise HTTPException(
             status_code=500, 
             detail=f"Database error: {str(e)}"
         )
     except Exception as e:
-        logger.error(f"Unexpected error fetching social media posts: {str(e)}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.error("Unexpected error fetching social media posts: %s", e)
+        logger.error("Traceback: %s", traceback.format_exc())
         raise HTTPException(
             status_code=500, 
             detail=f"Internal server error: {str(e)}"
         )
 
 @router.get("/{post_id}", response_model=schemas.SocialMediaPostResponse)
-def get_social_media_post_by_id(post_id: str, db: Session = Depends(get_db)):
+def get_social_media_post_by_id(post_id: str, request: Request, response: Response, db: Session = Depends(get_db)):
     """Get social media post by post ID"""
     try:
-        logger.info(f"Fetching social media post with ID: {post_id}")
+        logger.info("Fetching social media post with ID: %s", post_id)
+        
+        if has_preconditions(request):
+            version = post_version_from_row(db.execute(post_version_statement(post_id)).first())
+            if version is not None and is_not_modified(request, *version):
+                return not_modified_response(*version)
         
         post = db.query(models.SocialMediaPost).filter(
             models.SocialMediaPost.post_id == post_id
         ).first()
         
         if post is None:
-            logger.warning(f"Social media post not found with ID: {post_id}")
+            logger.warning("Social media post not found with ID: %s", post_id)
             raise HTTPException(status_code=404, detail="Social media post not found")
         
-        logger.info(f"Successfully retrieved social media post with ID: {post_id}")
+        logger.info("Successfully retrieved social media post with ID: %s", post_id)
+        response.headers.update(validator_headers(*version_of(post)))
         return post
         
     except HTTPException:
         raise
     except SQLAlchemyError as e:
-        logger.error(f"Database error fetching social media post: {str(e)}")
+        logger.error("Database error fetching social media post: %s", e)
         raise HTTPException(
             status_code=500, 
             detail=f"Database error: {str(e)}"
         )
     except Exception as e:
-        logger.error(f"Unexpected error fetching social media post: {str(e)}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.error("Unexpected error fetching social media post: %s", e)
+        logger.error("Traceback: %s", traceback.format_exc())
         raise HTTPException(
             status_code=500, 
             detail=f"Internal server error: {str(e)}"
@@ -154,24 +183,24 @@ def get_social_media_post_by_id(post_id: str, db: Session = Depends(get_db)):
 def get_social_media_posts_by_creator(creator_id: str, db: Session = Depends(get_db)):
     """Get social media posts by content creator ID"""
     try:
-        logger.info(f"Fetching social media posts for creator: {creator_id}")
+        logger.info("Fetching social media posts for creator: %s", creator_id)
         
         posts = db.query(models.SocialMediaPost).filter(
             models.SocialMediaPost.content_creator == creator_id
         ).all()
         
-        logger.info(f"Successfully retrieved {len(posts)} social media posts for creator: {creator_id}")
+        logger.info("Successfully retrieved %s social media posts for creator: %s", len(posts), creator_id)
         return posts
         
     except SQLAlchemyError as e:
-        logger.error(f"Database error fetching posts by creator: {str(e)}")
+        logger.error("Database error fetching posts by creator: %s", e)
         raise HTTPException(
             status_code=500, 
             detail=f"Database error: {str(e)}"
         )
     except Exception as e:
-        logger.error(f"Unexpected error fetching posts by creator: {str(e)}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.error("Unexpected error fetching posts by creator: %s", e)
+        logger.error("Traceback: %s", traceback.format_exc())
         raise HTTPException(
             status_code=500, 
             detail=f"Internal server error: {str(e)}"
@@ -181,19 +210,31 @@ def get_social_media_posts_by_creator(creator_id: str, db: Session = Depends(get
 def update_social_media_post(
     post_id: str,
     post_update: schemas.SocialMediaPostUpdate,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ):
-    """Update an existing social media post"""
+    """Update an existing social media post
+    
+    With ``If-Match`` the update only applies if the post still has that ETag (412 otherwise).
+    """
     try:
-        logger.info(f"Updating social media post with ID: {post_id}")
+        logger.info("Updating social media post with ID: %s", post_id)
         
         
+        checked_version = None
+        if "if-match" in request.headers:
+            checked_version = db.execute(post_version_statement(post_id)).first()
+            if checked_version is not None and if_match_failed(request, post_version_from_row(checked_version)[0]):
+                logger.info("If-Match precondition failed updating social media post %s", post_id)
+                raise HTTPException(status_code=412, detail="Social media post was modified since it was read")
+        
         db_post = db.query(models.SocialMediaPost).filter(
             models.SocialMediaPost.post_id == post_id
         ).first()
         
         if db_post is None:
-            logger.warning(f"Social media post not found with ID: {post_id}")
+            logger.warning("Social media post not found with ID: %s", post_id)
             raise HTTPException(status_code=404, detail="Social media post not found")
         
         
@@ -208,6 +249,13 @@ def update_social_media_post(
             
             update_data['updated_at'] = datetime.utcnow()
             
+            if checked_version is not None:
+                claimed = db.execute(claim_version(models.SocialMediaPost, checked_version, update_data['updated_at']))
+                if claimed.rowcount == 0:
+                    db.rollback()
+                    logger.info("Social media post %s was written after its If-Match check", post_id)
+                    raise HTTPException(status_code=412, detail="Social media post was modified since it was read")
+            
             
             for field, value in update_data.items():
                 if isinstance(value, str):
@@ -219,32 +267,35 @@ def update_social_media_post(
             
             db.commit()
             db.refresh(db_post)
+            feedback_cache.invalidate(db_post.feedback_submission_id)
             
-            logger.info(f"Successfully updated social media post with ID: {post_id}")
+            logger.info("Successfully updated social media post with ID: %s", post_id)
+            response.headers.update(validator_headers(*version_of(db_post)))
             return db_post
         else:
-            logger.info(f"No fields to update for post ID: {post_id}")
+            logger.info("No fields to update for post ID: %s", post_id)
+            response.headers.update(validator_headers(*version_of(db_post)))
             return db_post
             
     except HTTPException:
         raise
     except IntegrityError as e:
-        logger.error(f"Database integrity error updating social media post: {str(e)}")
+        logger.error("Database integrity error updating social media post: %s", e)
         db.rollback()
         raise HTTPException(
             status_code=400, 
             detail=f"Database integrity error: {str(e)}"
         )
     except SQLAlchemyError as e:
-        logger.error(f"Database error updating social media post: {str(e)}")
+        logger.error("Database error updating social media post: %s", e)
         db.rollback()
         raise HTTPException(
             status_code=500, 
             detail=f"Database error: {str(e)}"
         )
     except Exception as e:
-        logger.error(f"Unexpected error updating social media post: {str(e)}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.error("Unexpected error updating social media post: %s", e)
+        logger.error("Traceback: %s", traceback.format_exc())
         db.rollback()
         raise HTTPException(
             status_code=500, 
@@ -255,34 +306,34 @@ def update_social_media_post(
 def delete_social_media_post(post_id: str, db: Session = Depends(get_db)):
     """Delete a social media post"""
     try:
-        logger.info(f"Deleting social media post with ID: {post_id}")
+        logger.info("Deleting social media post with ID: %s", post_id)
         
         db_post = db.query(models.SocialMediaPost).filter(
             models.SocialMediaPost.post_id == post_id
         ).first()
         
         if db_post is None:
-            logger.warning(f"Social media post not found with ID: {post_id}")
+            logger.warning("Social media post not found with ID: %s", post_id)
             raise HTTPException(status_code=404, detail="Social media post not found")
         
         db.delete(db_post)
         db.commit()
         
-        logger.info(f"Successfully deleted social media post with ID: {post_id}")
+        logger.info("Successfully deleted social media post with ID: %s", post_id)
         return {"message": "Social media post deleted successfully"}
         
     except HTTPException:
         raise
     except SQLAlchemyError as e:
-        logger.error(f"Database error deleting social media post: {str(e)}")
+        logger.error("Database error deleting social media post: %s", e)
         db.rollback()
         raise HTTPException(
             status_code=500, 
             detail=f"Database error: {str(e)}"
         )
     except Exception as e:
-        logger.error(f"Unexpected error deleting social media post: {str(e)}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.error("Unexpected error deleting social media post: %s", e)
+        logger.error("Traceback: %s", traceback.format_exc())
         db.rollback()
         raise HTTPException(
             status_code=500, 
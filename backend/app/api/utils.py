@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Request
 from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 import logging
@@ -7,9 +8,16 @@ import traceback
 import httpx
 import json
 import re
+import time
 from datetime import datetime
 
-from ..database import get_db
+from ..cache import feedback_cache
+from ..database import get_db, get_async_db, get_sqlite_pragmas, is_sqlite_url, DATABASE_URL
+from ..http_client import get_http_client, UPLOAD_TIMEOUT
+from ..uploads import (
+    MultipartFileStream, UploadTooLarge, hash_upload, upload_cache,
+    UPLOAD_CACHE_ENABLED, UPLOAD_MAX_BYTES, UPLOAD_SERVER_URL,
+)
 
 
 logger = logging.getLogger(__name__)
@@ -24,7 +32,7 @@ def read_root():
         logger.info("Root endpoint accessed")
         return {"message": "n8n Execution Feedback API", "version": "1.0.0"}
     except Exception as e:
-        logger.error(f"Error in root endpoint: {str(e)}")
+        logger.error("Error in root endpoint: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.get("/health")
@@ -35,21 +43,25 @@ def health_check(db: Session = Depends(get_db)):
         logger.debug("Health check endpoint accessed")
         
         
+        sqlite_pragmas = None
         try:
             db.execute(text("SELECT 1"))
             db_status = "connected"
+            if is_sqlite_url(DATABASE_URL):
+                sqlite_pragmas = get_sqlite_pragmas(db.connection())
         except Exception as db_error:
-            logger.error(f"Database connection error: {str(db_error)}")
+            logger.error("Database connection error: %s", db_error)
             db_status = f"error: {str(db_error)}"
         
         return {
             "status": "healthy", 
             "message": "API is running",
             "database": db_status,
+            "sqlite_pragmas": sqlite_pragmas,
             "timestamp": datetime.utcnow().isoformat()
         }
     except Exception as e:
-        logger.error(f"Error in health check endpoint: {str(e)}")
+        logger.error("Error in health check endpoint: %s", e)
         raise HTTPException(status_code=500, detail="Health check failed")
 
 @router.get("/migrations/status")
@@ -86,7 +98,7 @@ def migration_status():
             "timestamp": datetime.utcnow().isoformat()
         }
     except Exception as e:
-        logger.error(f"Error in migration status endpoint: {str(e)}")
+        logger.error("Error in migration status endpoint: %s", e)
         return {
             "status": "error",
             "error": str(e),
@@ -116,7 +128,7 @@ def run_migrations():
                 "timestamp": datetime.utcnow().isoformat()
             }
         else:
-            logger.warning(f"⚠️ Manual migrations failed (exit code: {result.returncode})")
+            logger.warning("⚠️ Manual migrations failed (exit code: %s)", result.returncode)
             return {
                 "status": "error",
                 "message": "Migrations failed",
@@ -126,7 +138,7 @@ def run_migrations():
                 "timestamp": datetime.utcnow().isoformat()
             }
     except Exception as e:
-        logger.error(f"Error in manual migration endpoint: {str(e)}")
+        logger.error("Error in manual migration endpoint: %s", e)
         return {
             "status": "error",
             "error": str(e),
@@ -134,45 +146,98 @@ def run_migrations():
         }
 
 @router.post("/upload-image")
-async def upload_image(file: UploadFile = File(...)):
-    """Upload image to external server and return the URL"""
+async def upload_image(
+    file: UploadFile = File(...),
+    client: httpx.AsyncClient = Depends(get_http_client),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Upload image to external server and return the URL
+    
+    The file is streamed to the upload server in chunks rather than read into memory.
+    Files already uploaded before are answered from the content-addressed upload cache.
+    """
     try:
-        logger.info(f"Uploading image: {file.filename}")
-        
-        
-        file_content = await file.read()
-        
-        
-        files = {"files": (file.filename, file_content, file.content_type)}
-        
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "http://165.227.123.243:8000/upload",
-                files=files,
-                timeout=30.0
+        logger.info("Uploading image: %s", file.filename)
+        
+        
+        if file.size is not None and file.size > UPLOAD_MAX_BYTES:
+            raise UploadTooLarge(UPLOAD_MAX_BYTES)
+        
+        content_hash = None
+        if UPLOAD_CACHE_ENABLED:
+            content_hash, size = await hash_upload(file)
+            cached = await upload_cache.get(db, content_hash)
+            if cached is not None:
+                logger.info("Upload cache hit for %s (%s, %s bytes)", file.filename, content_hash[:12], size)
+                return cached
+        
+        body = MultipartFileStream(file)
+        started = time.perf_counter()
+        
+        response = await client.post(
+            UPLOAD_SERVER_URL,
+            content=body,
+            headers={"Content-Type": body.content_type},
+            timeout=UPLOAD_TIMEOUT
+        )
+        
+        elapsed = time.perf_counter() - started
+        throughput = body.bytes_read / elapsed if elapsed > 0 else 0.0
+        logger.info("Streamed %s bytes of %s in %.2fs (%.1f KiB/s)", body.bytes_read, file.filename, elapsed, throughput / 1024)
+        
+        if response.status_code == 200:
+            result = response.json()
+            logger.info("Successfully uploaded image: %s", file.filename)
+            if content_hash is not None:
+                await upload_cache.put(db, content_hash, result, body.bytes_read, file.content_type)
+            return result
+        else:
+            logger.error("External server error: %s - %s", response.status_code, response.text)
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"External server error: {response.text}"
             )
             
-            if response.status_code == 200:
-                result = response.json()
-                logger.info(f"Successfully uploaded image: {file.filename}")
-                return result
-            else:
-                logger.error(f"External server error: {response.status_code} - {response.text}")
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"External server error: {response.text}"
-                )
-                
+    except HTTPException:
+        raise
+    except UploadTooLarge as e:
+        logger.warning("Rejected upload %s: %s", file.filename, e)
+        raise HTTPException(status_code=413, detail=str(e))
     except httpx.TimeoutException:
         logger.error("Timeout uploading image to external server")
         raise HTTPException(status_code=408, detail="Upload timeout")
     except httpx.RequestError as e:
-        logger.error(f"Request error uploading image: {str(e)}")
+        logger.error("Request error uploading image: %s", e)
         raise HTTPException(status_code=502, detail=f"External server error: {str(e)}")
     except Exception as e:
-        logger.error(f"Unexpected error uploading image: {str(e)}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.error("Unexpected error uploading image: %s", e)
+        logger.error("Traceback: %s", traceback.format_exc())
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+@router.get("/upload-cache/stats")
+async def upload_cache_stats(db: AsyncSession = Depends(get_async_db)):
+    """Entry count and hit ratio of the upload cache"""
+    try:
+        return await upload_cache.stats(db)
+    except Exception as e:
+        logger.error("Error reading upload cache stats: %s", e)
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+@router.get("/response-cache/stats")
+def response_cache_stats():
+    """Entry count and hit ratio of this worker's feedback response cache"""
+    return feedback_cache.stats()
+
+@router.delete("/upload-cache")
+async def purge_upload_cache(content_hash: str = None, db: AsyncSession = Depends(get_async_db)):
+    """Drop one cached upload by content hash, or the whole cache"""
+    try:
+        removed = await upload_cache.purge(db, content_hash)
+        logger.info("Purged %s upload cache entries", removed)
+        return {"removed": removed}
+    except Exception as e:
+        logger.error("Error purging upload cache: %s", e)
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @router.post("/test-escape-characters")
@@ -216,8 +281,8 @@ def test_escape_characters_endpoint(data: dict):
         }
         
     except Exception as e:
-        logger.error(f"Error in escape character test endpoint: {str(e)}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.error("Error in escape character test endpoint: %s", e)
+        logger.error("Traceback: %s", traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Test endpoint error: {str(e)}")
 
 @router.post("/test-json-parsing")
@@ -240,7 +305,7 @@ async def test_json_parsing_endpoint(request: Request):
                 "status": "success"
             }
         except json.JSONDecodeError as e:
-            logger.error(f"JSON decode error: {str(e)}")
+            logger.error("JSON decode error: %s", e)
             
             
             error_pos = e.pos
@@ -275,8 +340,8 @@ async def test_json_parsing_endpoint(request: Request):
                 }
         
     except Exception as e:
-        logger.error(f"Error in JSON parsing test endpoint: {str(e)}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.error("Error in JSON parsing test endpoint: %s", e)
+        logger.error("Traceback: %s", traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Test endpoint error: {str(e)}")
 
 @router.post("/fix-json")
@@ -298,7 +363,7 @@ async def fix_json_endpoint(request: Request):
                 "status": "already_valid"
             }
         except json.JSONDecodeError as e:
-            logger.info(f"Attempting to fix JSON: {str(e)}")
+            logger.info("Attempting to fix JSON: %s", e)
             
             
             fixed_str = body_str
@@ -339,8 +404,8 @@ async def fix_json_endpoint(request: Request):
                 }
         
     except Exception as e:
-        logger.error(f"Error in fix JSON endpoint: {str(e)}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.error("Error in fix JSON endpoint: %s", e)
+        logger.error("Traceback: %s", traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Fix JSON endpoint error: {str(e)}")
 
 @router.post("/debug-json")
@@ -406,8 +471,8 @@ async def debug_json_endpoint(request: Request):
             }
         
     except Exception as e:
-        logger.error(f"Error in debug JSON endpoint: {str(e)}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.error("Error in debug JSON endpoint: %s", e)
+        logger.error("Traceback: %s", traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Debug JSON endpoint error: {str(e)}")
 
 @router.post("/test-post-image-type")
@@ -478,8 +543,8 @@ def test_post_image_type_endpoint(data: dict):
         }
         
     except Exception as e:
-        logger.error(f"Error in post image type test endpoint: {str(e)}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.error("Error in post image type test endpoint: %s", e)
+        logger.error("Traceback: %s", traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Test endpoint error: {str(e)}")
 
 @router.get("/test-cors")
@@ -1,5 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, Body
-from sqlalchemy.orm import Session
+from fastapi.responses import JSONResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 import uuid
 import logging
@@ -8,8 +10,10 @@ import httpx
 import os
 
 from .. import models
-from ..database import get_db
+from ..database import get_async_db
+from ..http_client import get_http_client, N8N_TIMEOUT
 from ..main import determine_post_image_type
+from ..outbox import enqueue, notify_dispatcher
 
 
 logger = logging.getLogger(__name__)
@@ -22,21 +26,32 @@ async def webhook_proxy_options():
     """Handle CORS preflight request for webhook-proxy endpoint"""
     return {"message": "OK"}
 
-@router.post("/webhook-proxy")
-async def proxy_webhook(request: Request, data: list = Body(...), db: Session = Depends(get_db)):
+@router.post("/webhook-proxy", status_code=202)
+async def proxy_webhook(
+    request: Request,
+    data: list = Body(...),
+    db: AsyncSession = Depends(get_async_db)
+):
     """Proxy webhook requests to n8n webhook to avoid CORS issues and create feedback entry
     
-    This endpoint handles CORS preflight requests and forwards webhook data to n8n.
+    The feedback entry, social media post and the n8n payload are committed in one
+    transaction; the payload is then delivered by the outbox dispatcher, so this
+    endpoint answers 202 without waiting on n8n.
     """
-    logger.info(f"Webhook proxy endpoint called with data length: {len(data) if data else 0}")
-    logger.info(f"Request headers: {dict(request.headers)}")
+    logger.debug("Webhook proxy endpoint called with data length: %s", len(data) if data else 0)
     
     try:
-        logger.info("Proxying webhook request to n8n and creating feedback entry")
+        logger.debug("Queueing webhook request to n8n and creating feedback entry")
         
+        webhook_url = os.getenv("N8N_WEBHOOK_URL", "https://ultrasoundai.app.n8n.cloud/webhook/1ef36a73-0e04-4cf5-ae0c-c3f1dca496ba")
+        feedback_form_link = None
+        feedback_submission = None
+        social_media_post = None
+        outbox_message = None
         
         if data and len(data) > 0:
-            webhook_data = data[0]
+            # Enrich a copy: if the commit fails, the original payload is forwarded instead
+            webhook_data = dict(data[0])
             
             
             try:
@@ -72,11 +87,11 @@ async def proxy_webhook(request: Request, data: list = Body(...), db: Session =
                 post_image_radio = webhook_data.get("Post Image?", "")
                 post_image_type = determine_post_image_type(post_image_radio)
                 
-                logger.info(f"Post image radio selection: '{post_image_radio}'")
-                logger.info(f"Determined post_image_type: '{post_image_type}'")
-                logger.info(f"Webhook data keys: {list(webhook_data.keys())}")
-                logger.info(f"Image URL field value: '{webhook_data.get('Image URL', '')}'")
-                logger.info(f"Upload an Image field value: '{webhook_data.get('Upload an Image', '')}'")
+                logger.debug("Post image radio selection: '%s'", post_image_radio)
+                logger.debug("Determined post_image_type: '%s'", post_image_type)
+                logger.debug("Webhook data keys: %s", list(webhook_data.keys()))
+                logger.debug("Image URL field value: '%s'", webhook_data.get('Image URL', ''))
+                logger.debug("Upload an Image field value: '%s'", webhook_data.get('Upload an Image', ''))
                 
                 
                 
@@ -90,17 +105,17 @@ async def proxy_webhook(request: Request, data: list = Body(...), db: Session =
                     
                     image_url = clean_webhook_value(image_url_value) if image_url_value else None
                     uploaded_image_url = None
-                    logger.info(f"Storing external image URL: {image_url}")
+                    logger.debug("Storing external image URL: %s", image_url)
                 elif post_image_type == "Yes, Upload Image":
                     
                     image_url = None
                     uploaded_image_url = clean_webhook_value(upload_image_value) if upload_image_value else None
-                    logger.info(f"Storing uploaded image URL: {uploaded_image_url}")
+                    logger.debug("Storing uploaded image URL: %s", uploaded_image_url)
                 else:
                     
                     image_url = None
                     uploaded_image_url = None
-                    logger.info(f"No image needed, cleared both URL fields")
+                    logger.debug("No image needed, cleared both URL fields")
                 
                 social_media_post = models.SocialMediaPost(
                     post_id=str(uuid.uuid4()),
@@ -120,18 +135,15 @@ async def proxy_webhook(request: Request, data: list = Body(...), db: Session =
                 )
                 
                 db.add(social_media_post)
-                db.commit()
-                db.refresh(feedback_submission)
-                db.refresh(social_media_post)
                 
                 
                 feedback_form_link = f"http://104.131.8.230:3000/feedback/{feedback_submission.submission_id}"
                 
-                logger.info(f"Created empty feedback entry with ID: {feedback_submission.submission_id}")
-                logger.info(f"Created social media post entry with ID: {social_media_post.post_id}")
-                logger.info(f"Social media post image_url: {social_media_post.image_url}")
-                logger.info(f"Social media post uploaded_image_url: {social_media_post.uploaded_image_url}")
-                logger.info(f"Feedback form link: {feedback_form_link}")
+                logger.debug("Created empty feedback entry with ID: %s", feedback_submission.submission_id)
+                logger.debug("Created social media post entry with ID: %s", social_media_post.post_id)
+                logger.debug("Social media post image_url: %s", social_media_post.image_url)
+                logger.debug("Social media post uploaded_image_url: %s", social_media_post.uploaded_image_url)
+                logger.debug("Feedback form link: %s", feedback_form_link)
                 
                 
                 webhook_data["Feedback Form URL"] = feedback_form_link
@@ -146,8 +158,8 @@ async def proxy_webhook(request: Request, data: list = Body(...), db: Session =
                 webhook_data["Image URL"] = social_media_post.image_url
                 webhook_data["Upload an Image"] = social_media_post.uploaded_image_url
                 
-                logger.info(f"Added to webhook data - Image URL: {webhook_data['Image URL']}")
-                logger.info(f"Added to webhook data - Upload an Image: {webhook_data['Upload an Image']}")
+                logger.debug("Added to webhook data - Image URL: %s", webhook_data['Image URL'])
+                logger.debug("Added to webhook data - Upload an Image: %s", webhook_data['Upload an Image'])
                 
                 
                 for key in webhook_data:
@@ -172,59 +184,59 @@ async def proxy_webhook(request: Request, data: list = Body(...), db: Session =
                 webhook_data = clean_webhook_data(webhook_data)
                 
                 
-                data[0] = webhook_data
+                outbox_message = enqueue(
+                    db, "n8n_social_media", webhook_url, [webhook_data, *data[1:]],
+                    feedback_submission_id=feedback_submission.submission_id
+                )
+                await db.commit()
                 
             except Exception as e:
-                logger.error(f"Failed to create database entries: {str(e)}")
+                logger.error("Failed to create database entries: %s", e)
                 
-                db.rollback()
+                await db.rollback()
+                feedback_form_link = None
+                feedback_submission = None
+                social_media_post = None
+                outbox_message = None
         
         
-        async with httpx.AsyncClient() as client:
-            
-            webhook_url = os.getenv("N8N_WEBHOOK_URL", "https://ultrasoundai.app.n8n.cloud/webhook/1ef36a73-0e04-4cf5-ae0c-c3f1dca496ba")
-            
-            response = await client.post(
-                webhook_url,
-                json=data,
-                headers={"Content-Type": "application/json"},
-                timeout=30.0
-            )
+        if outbox_message is None:
+            # Nothing was stored locally, still forward the caller's payload to n8n in a new transaction
+            outbox_message = enqueue(db, "n8n_social_media", webhook_url, data)
+            await db.commit()
+        
+        notify_dispatcher(request.app)
+        logger.info("Queued webhook request to n8n as outbox message %s", outbox_message.id)
+        
+        return JSONResponse(
+            status_code=202,
+            content={
+                "message": "Webhook request queued for delivery",
+                "feedback_form_link": feedback_form_link,
+                "feedback_submission_id": feedback_submission.submission_id if feedback_submission else None,
+                "social_media_post_id": social_media_post.post_id if social_media_post else None,
+                "outbox_id": outbox_message.id
+            }
+        )
             
-            if response.status_code == 200:
-                logger.info("Successfully forwarded webhook request to n8n")
-                return {
-                    "message": "Webhook request forwarded successfully",
-                    "feedback_form_link": feedback_form_link if 'feedback_form_link' in locals() else None,
-                    "feedback_submission_id": feedback_submission.submission_id if 'feedback_submission' in locals() else None,
-                    "social_media_post_id": social_media_post.post_id if 'social_media_post' in locals() else None
-                }
-            else:
-                logger.error(f"N8n webhook error: {response.status_code} - {response.text}")
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"N8n webhook error: {response.text}"
-                )
-                
-    except httpx.TimeoutException:
-        logger.error("Timeout forwarding webhook request to n8n")
-        raise HTTPException(status_code=408, detail="Webhook timeout")
-    except httpx.RequestError as e:
-        logger.error(f"Request error forwarding webhook: {str(e)}")
-        raise HTTPException(status_code=502, detail=f"Webhook error: {str(e)}")
+    except SQLAlchemyError as e:
+        logger.error("Database error queueing webhook: %s", e)
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
     except Exception as e:
-        logger.error(f"Unexpected error forwarding webhook: {str(e)}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.error("Unexpected error forwarding webhook: %s", e)
+        logger.error("Traceback: %s", traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @router.post("/submit-feedback-webhook")
 async def submit_feedback_webhook(
     feedback_data: dict = Body(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    client: httpx.AsyncClient = Depends(get_http_client)
 ):
     """Submit feedback data to the specified webhook URL with both social media and feedback data"""
     try:
-        logger.info("Submitting feedback data to webhook")
+        logger.debug("Submitting feedback data to webhook")
         
         
         submission_id = feedback_data.get("submission_id")
@@ -232,25 +244,31 @@ async def submit_feedback_webhook(
             raise HTTPException(status_code=400, detail="submission_id is required")
         
         
-        feedback_submission = db.query(models.FeedbackSubmission).filter(
-            models.FeedbackSubmission.submission_id == submission_id
-        ).first()
+        result = await db.execute(
+            select(models.FeedbackSubmission).where(
+                models.FeedbackSubmission.submission_id == submission_id
+            )
+        )
+        feedback_submission = result.scalars().first()
         
         if not feedback_submission:
             raise HTTPException(status_code=404, detail="Feedback submission not found")
         
         
-        social_media_post = db.query(models.SocialMediaPost).filter(
-            models.SocialMediaPost.feedback_submission_id == feedback_submission.submission_id
-        ).first()
+        result = await db.execute(
+            select(models.SocialMediaPost).where(
+                models.SocialMediaPost.feedback_submission_id == feedback_submission.submission_id
+            )
+        )
+        social_media_post = result.scalars().first()
         
         
         if social_media_post:
-            logger.info(f"Found social media post with ID: {social_media_post.post_id}")
-            logger.info(f"Social media post image_url: {social_media_post.image_url}")
-            logger.info(f"Social media post uploaded_image_url: {social_media_post.uploaded_image_url}")
+            logger.debug("Found social media post with ID: %s", social_media_post.post_id)
+            logger.debug("Social media post image_url: %s", social_media_post.image_url)
+            logger.debug("Social media post uploaded_image_url: %s", social_media_post.uploaded_image_url)
         else:
-            logger.warning(f"No social media post found for feedback submission ID: {feedback_submission.submission_id}")
+            logger.warning("No social media post found for feedback submission ID: %s", feedback_submission.submission_id)
             logger.warning("This means the image URLs will be null in the webhook")
         
         
@@ -328,47 +346,46 @@ async def submit_feedback_webhook(
         webhook_payload["Twitter Image LLM"] = feedback_submission.twitter_image_llm or ""
         
         
-        logger.info(f"Webhook payload image_url: {webhook_payload.get('image_url')}")
-        logger.info(f"Webhook payload uploaded_image_url: {webhook_payload.get('uploaded_image_url')}")
-        logger.info(f"Webhook payload feedback_image_url: {webhook_payload.get('feedback_image_url')}")
-        logger.info(f"Webhook payload feedback_uploaded_image_url: {webhook_payload.get('feedback_uploaded_image_url')}")
-        logger.info(f"Social media post image_url: {social_media_post.image_url if social_media_post else None}")
-        logger.info(f"Social media post uploaded_image_url: {social_media_post.uploaded_image_url if social_media_post else None}")
-        logger.info(f"Feedback submission image_url: {feedback_submission.image_url}")
-        logger.info(f"Feedback submission uploaded_image_url: {feedback_submission.uploaded_image_url}")
+        logger.debug("Webhook payload image_url: %s", webhook_payload.get('image_url'))
+        logger.debug("Webhook payload uploaded_image_url: %s", webhook_payload.get('uploaded_image_url'))
+        logger.debug("Webhook payload feedback_image_url: %s", webhook_payload.get('feedback_image_url'))
+        logger.debug("Webhook payload feedback_uploaded_image_url: %s", webhook_payload.get('feedback_uploaded_image_url'))
+        logger.debug("Social media post image_url: %s", social_media_post.image_url if social_media_post else None)
+        logger.debug("Social media post uploaded_image_url: %s", social_media_post.uploaded_image_url if social_media_post else None)
+        logger.debug("Feedback submission image_url: %s", feedback_submission.image_url)
+        logger.debug("Feedback submission uploaded_image_url: %s", feedback_submission.uploaded_image_url)
         
         
         webhook_url = "https://ultrasoundai.app.n8n.cloud/webhook/3f455a01-2e10-4605-9a9c-d2e6da548bb5"
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                webhook_url,
-                json=webhook_payload,
-                headers={"Content-Type": "application/json"},
-                timeout=30.0
+        response = await client.post(
+            webhook_url,
+            json=webhook_payload,
+            headers={"Content-Type": "application/json"},
+            timeout=N8N_TIMEOUT
+        )
+        
+        if response.status_code == 200:
+            logger.info("Successfully submitted feedback data to webhook")
+            return {
+                "message": "Feedback data submitted to webhook successfully",
+                "webhook_response": response.json() if response.headers.get("content-type", "").startswith("application/json") else response.text,
+                "status_code": response.status_code
+            }
+        else:
+            logger.error("Webhook error: %s - %s", response.status_code, response.text)
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"Webhook error: {response.text}"
             )
             
-            if response.status_code == 200:
-                logger.info("Successfully submitted feedback data to webhook")
-                return {
-                    "message": "Feedback data submitted to webhook successfully",
-                    "webhook_response": response.json() if response.headers.get("content-type", "").startswith("application/json") else response.text,
-                    "status_code": response.status_code
-                }
-            else:
-                logger.error(f"Webhook error: {response.status_code} - {response.text}")
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Webhook error: {response.text}"
-                )
-                
     except httpx.TimeoutException:
         logger.error("Timeout submitting feedback data to webhook")
         raise HTTPException(status_code=408, detail="Webhook timeout")
     except httpx.RequestError as e:
-        logger.error(f"Request error submitting feedback data: {str(e)}")
+        logger.error("Request error submitting feedback data: %s", e)
         raise HTTPException(status_code=502, detail=f"Webhook error: {str(e)}")
     except Exception as e:
-        logger.error(f"Unexpected error submitting feedback data: {str(e)}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.error("Unexpected error submitting feedback data: %s", e)
+        logger.error("Traceback: %s", traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -0,0 +1,178 @@
+"""
+In-process LRU + TTL cache of serialized feedback responses
+
+``GET /api/feedback/{submission_id}`` is polled while an editor works on the
+form; ``feedback_cache`` keeps the encoded JSON body (with its ETag,
+Last-Modified and compressed copies) per submission_id so a poll costs one
+primary key lookup instead of the join, pydantic validation and compression.
+
+Every uvicorn worker has its own cache. To keep them coherent, triggers on
+``feedback_submissions`` (update, delete) and ``social_media_posts`` (insert,
+update, delete) bump the ``cache_generations`` row of the affected submission
+only. A lookup first reads that row by primary key and serves the entry only
+if it was stored under the same generation, so a write drops one entry in
+every worker and leaves the rest of the cache alone. Writes through the API
+additionally evict their submission directly, and the TTL bounds staleness
+should the counter ever be bypassed (e.g. a restore without triggers).
+
+The table row and triggers are created by migration 012 and, for databases
+built with ``create_all``, by a metadata ``after_create`` hook.
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from sqlalchemy import event, text
+
+from . import models
+from .metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+
+FEEDBACK_CACHE_MAX_ENTRIES = int(os.getenv("FEEDBACK_CACHE_MAX_ENTRIES", "1024"))
+FEEDBACK_CACHE_TTL_SECONDS = float(os.getenv("FEEDBACK_CACHE_TTL_SECONDS", "60"))
+CACHE_HEADER = "X-Cache"
+
+CACHE_LOOKUPS = REGISTRY.counter(
+    "response_cache_lookups_total", "Response cache lookups by cache and result (hit, miss, expired, stale)", ("cache", "result"))
+CACHE_EVICTIONS = REGISTRY.counter(
+    "response_cache_evictions_total", "Entries dropped from a response cache by reason (size, invalidated, generation)", ("cache", "reason"))
+
+_BUMP = (
+    "INSERT INTO cache_generations(name, cache_key, generation) SELECT '{name}', {key}, 1 WHERE {key} IS NOT NULL "
+    "ON CONFLICT(name, cache_key) DO UPDATE SET generation = generation + 1;"
+)
+
+
+def _moved(column: str) -> str:
+    # The new key of an UPDATE, or NULL (no second bump) when it did not change
+    return f"CASE WHEN NEW.{column} IS NOT OLD.{column} THEN NEW.{column} END"
+
+
+# cache name -> (trigger, timing, SQL expressions of the cache keys it touches)
+GENERATION_TRIGGERS = {
+    "feedback": [
+        ("feedback_cache_after_update", "AFTER UPDATE ON feedback_submissions", ("OLD.submission_id", _moved("submission_id"))),
+        ("feedback_cache_after_delete", "AFTER DELETE ON feedback_submissions", ("OLD.submission_id",)),
+        ("feedback_cache_post_after_insert", "AFTER INSERT ON social_media_posts", ("NEW.feedback_submission_id",)),
+        ("feedback_cache_post_after_update", "AFTER UPDATE ON social_media_posts",
+         ("OLD.feedback_submission_id", _moved("feedback_submission_id"))),
+        ("feedback_cache_post_after_delete", "AFTER DELETE ON social_media_posts", ("OLD.feedback_submission_id",)),
+    ],
+}
+
+
+def create_generation_triggers(connection):
+    for name, triggers in GENERATION_TRIGGERS.items():
+        for trigger, timing, keys in triggers:
+            bumps = " ".join(_BUMP.format(name=name, key=key) for key in keys)
+            connection.execute(text(f"CREATE TRIGGER IF NOT EXISTS {trigger} {timing} BEGIN {bumps} END"))
+
+
+def drop_generation_triggers(connection):
+    for triggers in GENERATION_TRIGGERS.values():
+        for trigger, _, _ in triggers:
+            connection.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+
+
+def read_generation(db, name: str, key: str) -> int:
+    """Current generation of one cache key (0 before the first write it depends on)"""
+    generation = db.execute(
+        text("SELECT generation FROM cache_generations WHERE name = :name AND cache_key = :key"), {"name": name, "key": key}
+    ).scalar()
+    return generation or 0
+
+
+class ResponseCache:
+    """Bounded key -> response cache with LRU eviction, a TTL and per-key generations
+
+    Entries are only served for the generation of their key they were stored
+    under, so a response built from data read before another worker's write is
+    never served after it. ``max_entries`` of 0 disables the cache.
+    """
+
+    def __init__(self, name: str, max_entries: int, ttl_seconds: float, clock=time.monotonic):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, key: str, generation: int) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] != generation:
+                del self._entries[key]
+                entry = None
+                result = "stale"
+                CACHE_EVICTIONS.inc(self.name, "generation")
+            elif entry is not None and entry[0] <= self.clock():
+                del self._entries[key]
+                entry = None
+                result = "expired"
+            else:
+                result = "miss" if entry is None else "hit"
+            if entry is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        CACHE_LOOKUPS.inc(self.name, result)
+        return entry[2] if entry is not None else None
+
+    def set(self, key: str, value: Any, generation: int):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, generation, value)
+            self._entries.move_to_end(key)
+            evicted = 0
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+        if evicted:
+            CACHE_EVICTIONS.inc(self.name, "size", amount=evicted)
+
+    def invalidate(self, key: Optional[str]):
+        if key is None:
+            return
+        with self._lock:
+            removed = self._entries.pop(key, None)
+        if removed is not None:
+            CACHE_EVICTIONS.inc(self.name, "invalidated")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else None,
+        }
+
+
+feedback_cache = ResponseCache("feedback", FEEDBACK_CACHE_MAX_ENTRIES, FEEDBACK_CACHE_TTL_SECONDS)
+
+
+@event.listens_for(models.Base.metadata, "after_create")
+def _create_generation_triggers_after_create_all(target, connection, **kwargs):
+    if connection.dialect.name == "sqlite":
+        create_generation_triggers(connection)
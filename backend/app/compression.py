@@ -0,0 +1,272 @@
+"""
+Response compression negotiated on Accept-Encoding
+
+``CompressionMiddleware`` compresses text-like responses with zstd, brotli or
+gzip, in that order of preference among the codings the client accepts.
+zstd and brotli need the optional ``zstandard`` and ``brotli`` packages;
+without them only gzip is offered. Bodies sent in one piece are left alone
+below ``COMPRESSION_MIN_BYTES``. A ``StreamingResponse`` is compressed chunk
+by chunk, and each chunk is flushed so NDJSON lines still reach the client
+as they are produced.
+
+Responses that already carry a ``Content-Encoding`` pass through untouched.
+Endpoints that cache their body use ``precompressed_response`` instead: it
+stores each encoded variant next to the cached body, so a cache hit is not
+recompressed.
+"""
+import logging
+import os
+import threading
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import Request, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .metrics import REGISTRY
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Serializes filling the ``variants`` of cached bodies from threadpool routes
+_variants_lock = threading.Lock()
+
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() in ("1", "true", "yes")
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+ZSTD_LEVEL = 3
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+COMPRESSION_BYTES = REGISTRY.counter(
+    "http_response_compression_bytes_total", "Response bytes before and after compression, by coding", ("encoding", "stage"))
+
+
+class _GzipEncoder:
+    def __init__(self):
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliEncoder:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdEncoder:
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+ENCODERS = {"gzip": _GzipEncoder}
+if brotli is not None:
+    ENCODERS["br"] = _BrotliEncoder
+if zstandard is not None:
+    ENCODERS["zstd"] = _ZstdEncoder
+
+# Most preferred first
+PREFERENCE = [name for name in ("zstd", "br", "gzip") if name in ENCODERS]
+
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    """Best coding offered by the server and accepted by the client, or None for identity"""
+    if not accept_encoding:
+        return None
+    accepted: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+    wildcard = accepted.get("*", 0.0)
+    candidates = [(accepted.get(name, wildcard), -rank, name) for rank, name in enumerate(PREFERENCE)]
+    quality, _, name = max(candidates)
+    return name if quality > 0 else None
+
+
+def compress_bytes(data: bytes, encoding: str) -> bytes:
+    encoder = ENCODERS[encoding]()
+    compressed = encoder.compress(data) + encoder.finish()
+    COMPRESSION_BYTES.inc(encoding, "in", amount=len(data))
+    COMPRESSION_BYTES.inc(encoding, "out", amount=len(compressed))
+    return compressed
+
+
+def is_compressible(content_type: str) -> bool:
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def _with_vary(headers: List[Tuple[bytes, bytes]]) -> List[Tuple[bytes, bytes]]:
+    """Raw response headers with ``Vary: Accept-Encoding`` added unless the route already set it"""
+    if any(name.lower() == b"vary" and b"accept-encoding" in value.lower() for name, value in headers):
+        return headers
+    return headers + [(b"vary", b"Accept-Encoding")]
+
+
+def _may_compress(message: Message) -> bool:
+    """Whether a response start is one this middleware would compress for a client that asked"""
+    headers = {name.lower(): value for name, value in message.get("headers", [])}
+    content_type = headers.get(b"content-type", b"").decode("latin-1")
+    return not (
+        message["status"] in (204, 304)
+        or b"content-encoding" in headers
+        or b"no-transform" in headers.get(b"cache-control", b"")
+        or not is_compressible(content_type)
+    )
+
+
+def precompressed_response(
+    request: Request,
+    body: bytes,
+    variants: Dict[str, bytes],
+    media_type: str = "application/json",
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """Response for a cached body, compressing it at most once per coding
+
+    ``variants`` lives next to the body in the cache and collects the encoded
+    copies; the middleware skips the response since it is already encoded.
+    Concurrent requests for a missing coding compress it once, under a lock.
+    """
+    headers = dict(headers or {})
+    headers["Vary"] = "Accept-Encoding"
+    encoding = negotiate(request.headers.get("accept-encoding")) if COMPRESSION_ENABLED else None
+    if encoding is None or len(body) < COMPRESSION_MIN_BYTES:
+        return Response(content=body, media_type=media_type, headers=headers)
+    content = variants.get(encoding)
+    if content is None:
+        with _variants_lock:
+            content = variants.get(encoding)
+            if content is None:
+                content = variants[encoding] = compress_bytes(body, encoding)
+    headers["Content-Encoding"] = encoding
+    return Response(content=content, media_type=media_type, headers=headers)
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware compressing text-like responses per Accept-Encoding"""
+
+    def __init__(self, app: ASGIApp, min_bytes: int = COMPRESSION_MIN_BYTES):
+        self.app = app
+        self.min_bytes = min_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = None
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+        encoding = negotiate(accept_encoding)
+        if encoding is None:
+            # Sent uncompressed, but a cache must not reuse it for clients that accept a coding
+            async def send_with_vary(message: Message):
+                if message["type"] == "http.response.start" and _may_compress(message):
+                    message["headers"] = _with_vary(list(message.get("headers", [])))
+                await send(message)
+
+            await self.app(scope, receive, send_with_vary)
+            return
+
+        start: Optional[Message] = None
+        encoder = None
+        passthrough = False
+
+        async def send_wrapper(message: Message):
+            nonlocal start, encoder, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                if not _may_compress(message):
+                    passthrough = True
+                    await send(message)
+                    return
+                # Held back until the first body message shows whether the body is small
+                start = message
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if encoder is None:
+                if not more_body and len(body) < self.min_bytes:
+                    passthrough = True
+                    start["headers"] = _with_vary(list(start.get("headers", [])))
+                    await send(start)
+                    await send(message)
+                    return
+                encoder = ENCODERS[encoding]()
+                headers = [(name, value) for name, value in start.get("headers", []) if name.lower() != b"content-length"]
+                headers = _with_vary(headers + [(b"content-encoding", encoding.encode("latin-1"))])
+                if not more_body:
+                    compressed = encoder.compress(body) + encoder.finish()
+                    headers.append((b"content-length", str(len(compressed)).encode("latin-1")))
+                    start["headers"] = headers
+                    COMPRESSION_BYTES.inc(encoding, "in", amount=len(body))
+                    COMPRESSION_BYTES.inc(encoding, "out", amount=len(compressed))
+                    await send(start)
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+                start["headers"] = headers
+                await send(start)
+
+            compressed = encoder.compress(body) if body else b""
+            if not more_body:
+                compressed += encoder.finish()
+            COMPRESSION_BYTES.inc(encoding, "in", amount=len(body))
+            COMPRESSION_BYTES.inc(encoding, "out", amount=len(compressed))
+            if compressed or not more_body:
+                await send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,176 @@
+"""
+HTTP validators (weak ETag, Last-Modified) and conditional request handling
+
+Feedback and post resources get a weak ETag derived from ``(id, updated_at)``
+of the rows their body is built from (rows never updated fall back to
+``created_at``), and a ``Last-Modified`` of the newest of those timestamps.
+A feedback body includes image URLs from its first linked post, so that post's
+version is part of the feedback ETag too.
+
+``If-None-Match`` / ``If-Modified-Since`` on GET are answered with 304 after a
+version-only query that skips the large content columns. ``If-Match`` on PUT
+gives optimistic concurrency: a client sends the ETag it last saw and gets
+412 when someone else has written since. Comparison is weak for both headers,
+as every ETag here is weak.
+
+The If-Match check reads the version before the write, so two PUTs with the
+same ETag could both pass it. ``claim_version`` closes that gap: the first
+write of the transaction only moves ``updated_at`` on if the row still stores
+the value the check was made against, and a 0 rowcount means 412.
+"""
+import hashlib
+import re
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+
+from fastapi import Request, Response
+from sqlalchemy import String, select, type_coerce, update
+
+from . import models
+
+ETAG_HEADER = "ETag"
+LAST_MODIFIED_HEADER = "Last-Modified"
+
+_ENTITY_TAG = re.compile(r'(?:W/)?"[^"]*"')
+
+Version = Tuple[str, datetime]
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; everything is stored in UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def version_of(*rows) -> Version:
+    """(weak ETag, last modified) of the rows a response is built from; ``None`` rows are skipped"""
+    parts = []
+    last_modified = datetime(1970, 1, 1, tzinfo=timezone.utc)
+    for row in rows:
+        if row is None:
+            continue
+        changed = row.updated_at or row.created_at
+        parts.append(f"{row.id}:{changed.isoformat() if changed else ''}")
+        if changed is not None:
+            last_modified = max(last_modified, _as_utc(changed))
+    digest = hashlib.blake2b("|".join(parts).encode("utf-8"), digest_size=8).hexdigest()
+    return f'W/"{digest}"', last_modified
+
+
+def stored_updated_at(model):
+    """``updated_at`` exactly as stored: timestamps written by ``func.now()`` and by
+    Python differ in format, so the claim compares the raw value rather than a datetime"""
+    return type_coerce(model.updated_at, String).label("stored_updated_at")
+
+
+def feedback_version_statement(submission_id: str):
+    """Version columns of a submission and its first linked post (see ``get_feedback_with_post``)"""
+    feedback = models.FeedbackSubmission
+    post = models.SocialMediaPost
+    return (
+        select(feedback.id, feedback.created_at, feedback.updated_at, stored_updated_at(feedback),
+               post.id.label("post_id"), post.created_at.label("post_created_at"), post.updated_at.label("post_updated_at"))
+        .outerjoin(post, post.feedback_submission_id == feedback.submission_id)
+        .where(feedback.submission_id == submission_id)
+        .order_by(post.id)
+        .limit(1)
+    )
+
+
+def post_version_statement(post_id: str):
+    post = models.SocialMediaPost
+    return select(post.id, post.created_at, post.updated_at, stored_updated_at(post)).where(post.post_id == post_id).limit(1)
+
+
+def claim_version(model, version_row, updated_at: datetime):
+    """UPDATE setting ``updated_at`` only while the row is unchanged since ``version_row`` was read
+
+    Run it as the first write of the transaction and answer 412 when it matches no
+    row; until commit it also holds SQLite's write lock, so a concurrent PUT
+    checked against the same version waits and then fails its own claim.
+    """
+    column = type_coerce(model.updated_at, String)
+    stored = version_row.stored_updated_at
+    return (
+        update(model)
+        .where(model.id == version_row.id, column.is_(None) if stored is None else column == stored)
+        .values(updated_at=updated_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+class _VersionRow:
+    __slots__ = ("id", "created_at", "updated_at")
+
+    def __init__(self, id, created_at, updated_at):
+        self.id = id
+        self.created_at = created_at
+        self.updated_at = updated_at
+
+
+def feedback_version_from_row(row) -> Optional[Version]:
+    if row is None:
+        return None
+    linked_post = None
+    if row.post_id is not None:
+        linked_post = _VersionRow(row.post_id, row.post_created_at, row.post_updated_at)
+    return version_of(row, linked_post)
+
+
+def post_version_from_row(row) -> Optional[Version]:
+    return version_of(row) if row is not None else None
+
+
+def _strip_weak(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def _entity_tags(header: str):
+    return {_strip_weak(tag) for tag in _ENTITY_TAG.findall(header)}
+
+
+def _weak_match(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    return _strip_weak(etag) in _entity_tags(header)
+
+
+def has_preconditions(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def is_not_modified(request: Request, etag: str, last_modified: datetime) -> bool:
+    """Whether a GET can be answered with 304; If-None-Match wins over If-Modified-Since"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _weak_match(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # HTTP dates have whole-second resolution
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def if_match_failed(request: Request, etag: Optional[str]) -> bool:
+    """Whether an If-Match precondition is present and not met (``etag`` is None for a missing resource)"""
+    if_match = request.headers.get("if-match")
+    if if_match is None:
+        return False
+    return etag is None or not _weak_match(if_match, etag)
+
+
+def validator_headers(etag: str, last_modified: datetime) -> Dict[str, str]:
+    return {ETAG_HEADER: etag, LAST_MODIFIED_HEADER: format_datetime(last_modified, usegmt=True)}
+
+
+def not_modified_response(etag: str, last_modified: datetime) -> Response:
+    """304 with the validators and the ``Vary`` of the 200 it stands for (bodies differ per Accept-Encoding)"""
+    return Response(status_code=304, headers={**validator_headers(etag, last_modified), "Vary": "Accept-Encoding"})
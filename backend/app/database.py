@@ -1,9 +1,15 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
 from dotenv import load_dotenv
 import logging
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from .metrics import instrument_engine, DB_QUERIES, DB_QUERY_DURATION
 
 
 logger = logging.getLogger(__name__)
@@ -12,23 +18,204 @@ load_dotenv()
 
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///app/n8n_database.sqlite")
-logger.info(f"Using database URL: {DATABASE_URL}")
+logger.info("Using database URL: %s", DATABASE_URL)
 
 
-try:
-    engine = create_engine(
-        DATABASE_URL,
-        connect_args={"check_same_thread": False},  
-        echo=False,  
+PRAGMA_CHOICES = {
+    "journal_mode": ("DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"),
+    "synchronous": ("OFF", "NORMAL", "FULL", "EXTRA"),
+    "temp_store": ("DEFAULT", "FILE", "MEMORY"),
+}
+
+
+def pragma_choice(env_name: str, default: str, pragma: str) -> str:
+    """Read a keyword PRAGMA value from the environment, rejecting anything SQLite doesn't define"""
+    value = os.getenv(env_name, default).strip().upper()
+    if value not in PRAGMA_CHOICES[pragma]:
+        raise ValueError(f"{env_name}={value!r} is not a valid {pragma}; expected one of {', '.join(PRAGMA_CHOICES[pragma])}")
+    return value
+
+
+def pragma_int(env_name: str, default: int) -> int:
+    """Read an integer PRAGMA value from the environment"""
+    value = os.getenv(env_name, str(default))
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{env_name}={value!r} is not an integer") from None
+
+
+# PRAGMAs applied to every new SQLite connection. WAL lets the readers in both
+# uvicorn workers keep going while a writer commits; the rest trade a little
+# durability on power loss (synchronous=NORMAL) for far fewer fsyncs. Values
+# are interpolated into the PRAGMA statement, so they are validated here.
+SQLITE_PRAGMAS = {
+    "journal_mode": pragma_choice("SQLITE_JOURNAL_MODE", "WAL", "journal_mode"),
+    "synchronous": pragma_choice("SQLITE_SYNCHRONOUS", "NORMAL", "synchronous"),
+    "busy_timeout": pragma_int("SQLITE_BUSY_TIMEOUT_MS", 5000),
+    # Negative values are KiB rather than pages: -16000 is ~16MB per connection
+    "cache_size": pragma_int("SQLITE_CACHE_SIZE", -16000),
+    "mmap_size": pragma_int("SQLITE_MMAP_SIZE", 64 * 1024 * 1024),
+    "temp_store": pragma_choice("SQLITE_TEMP_STORE", "MEMORY", "temp_store"),
+}
+
+
+def is_sqlite_url(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record=None):
+    """SQLAlchemy ``connect`` listener that configures a fresh SQLite connection"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def get_sqlite_pragmas(connection) -> dict:
+    """Read back the PRAGMA values that are actually active on a connection"""
+    values = {}
+    for name in SQLITE_PRAGMAS:
+        values[name] = connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+    return values
+
+
+# Statements slower than this are logged together with the shape of their parameters
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+MAX_LOGGED_STATEMENT = 1000
+
+
+class QueryStats:
+    """Statement count and cumulative DB time for the current request"""
+
+    __slots__ = ("count", "duration")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+
+# Set per request by ServerTimingMiddleware. The stats object itself is shared,
+# so sync routes running in the threadpool (which gets a copy of the context)
+# still add to the same counters.
+_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def start_query_stats():
+    """Begin collecting for the current context; returns the stats and a reset token"""
+    stats = QueryStats()
+    return stats, _query_stats.set(stats)
+
+
+def stop_query_stats(token):
+    _query_stats.reset(token)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _query_stats.get()
+
+
+def describe_parameters(parameters, executemany: bool = False) -> str:
+    """Types and sizes of bound parameters, never their values"""
+    def shape(value):
+        if isinstance(value, (str, bytes)):
+            return f"{type(value).__name__}({len(value)})"
+        return type(value).__name__
+
+    def describe(params):
+        if isinstance(params, dict):
+            return "{" + ", ".join(f"{key}: {shape(value)}" for key, value in params.items()) + "}"
+        if isinstance(params, (list, tuple)):
+            return "(" + ", ".join(shape(value) for value in params) + ")"
+        return shape(params)
+
+    if executemany and parameters:
+        return f"{len(parameters)} x {describe(parameters[0])}"
+    return describe(parameters)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def instrument_queries(engine, name: str):
+    """Time every statement on ``engine`` for metrics, Server-Timing and the slow query log"""
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        DB_QUERIES.inc(name)
+        DB_QUERY_DURATION.observe(elapsed, name)
+        stats = _query_stats.get()
+        if stats is not None:
+            stats.count += 1
+            stats.duration += elapsed
+        if elapsed * 1000 >= SLOW_QUERY_MS:
+            logger.warning(
+                "Slow query (%.1fms, %s engine): %s params=%s",
+                elapsed * 1000, name, statement[:MAX_LOGGED_STATEMENT], describe_parameters(parameters, executemany),
+            )
+
+    def handle_error(exception_context):
+        # after_cursor_execute doesn't fire for failed statements
+        started = exception_context.connection.info.get("query_started") if exception_context.connection is not None else None
+        if started:
+            started.pop()
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine, "handle_error", handle_error)
+
+
+def to_async_url(url: str) -> str:
+    """Map a sync SQLite URL onto the aiosqlite driver"""
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url[len("sqlite:"):]
+    return url
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", to_async_url(DATABASE_URL))
+
+
+def _create_engine(url: str):
+    new_engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False},
+        echo=False,
         pool_pre_ping=True
     )
-    logger.info("SQLite database engine created successfully")
+    if is_sqlite_url(url):
+        event.listen(new_engine, "connect", apply_sqlite_pragmas)
+    instrument_engine(new_engine, "sync")
+    instrument_queries(new_engine, "sync")
+    return new_engine
+
+
+try:
+    engine = _create_engine(DATABASE_URL)
+    logger.info("SQLite database engine created successfully with PRAGMAs: %s", SQLITE_PRAGMAS)
 except Exception as e:
-    logger.error(f"Failed to create database engine: {e}")
+    logger.error("Failed to create database engine: %s", e)
     raise
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def _create_async_engine(url: str):
+    new_engine = create_async_engine(url, echo=False, pool_pre_ping=True)
+    if is_sqlite_url(url):
+        event.listen(new_engine.sync_engine, "connect", apply_sqlite_pragmas)
+    instrument_engine(new_engine.sync_engine, "async")
+    instrument_queries(new_engine.sync_engine, "async")
+    return new_engine
+
+
+# Used by the ``async def`` routes so SQLite I/O runs in aiosqlite's worker
+# thread instead of blocking the event loop. Objects stay usable after commit
+# because lazy attribute loads are not possible outside an awaitable context.
+async_engine = _create_async_engine(ASYNC_DATABASE_URL)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 
@@ -37,27 +224,39 @@ def get_db():
     try:
         yield db
     except Exception as e:
-        logger.error(f"Database session error: {str(e)}")
+        logger.error("Database session error: %s", e)
         db.rollback()
         raise
     finally:
         db.close()
 
-def recreate_engine():
-    """Recreate the database engine if needed"""
-    global engine, SessionLocal
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception as e:
+            logger.error("Async database session error: %s", e)
+            await db.rollback()
+            raise
+
+async def recreate_engine():
+    """Recreate the sync and async database engines if needed
+
+    ``SessionLocal`` and ``AsyncSessionLocal`` are rebound in place, so code
+    holding a reference to either factory gets sessions on the new engines.
+    """
+    global engine, async_engine
     try:
-        logger.info("Recreating SQLite database engine...")
+        logger.info("Recreating SQLite database engines...")
         engine.dispose()
-        engine = create_engine(
-            DATABASE_URL,
-            connect_args={"check_same_thread": False},
-            echo=False,
-            pool_pre_ping=True
-        )
-        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-        logger.info("SQLite database engine recreated successfully")
+        await async_engine.dispose()
+        engine = _create_engine(DATABASE_URL)
+        async_engine = _create_async_engine(ASYNC_DATABASE_URL)
+        SessionLocal.configure(bind=engine)
+        AsyncSessionLocal.configure(bind=async_engine)
+        logger.info("SQLite database engines recreated successfully")
         return True
     except Exception as e:
-        logger.error(f"Failed to recreate database engine: {e}")
-        return False 
\ No newline at end of file
+        logger.error("Failed to recreate database engines: %s", e)
+        return False
@@ -0,0 +1,32 @@
+"""
+Single-pass counter for JSON-style escape sequences in text fields
+
+LLM output arrives with literal ``\\n``, ``\\"``, ``\\uXXXX`` etc. in it. The
+counts are only used for logging, so callers should skip the scan entirely
+when the log level is off.
+"""
+import re
+from collections import Counter
+from typing import Dict
+
+ESCAPE_NAMES = {
+    "n": "newlines",
+    "t": "tabs",
+    "r": "carriage_returns",
+    "b": "backspaces",
+    "f": "form_feeds",
+    '"': "quotes",
+    "\\": "backslashes",
+    "u": "unicode",
+}
+
+# One alternation, left to right: an escaped backslash consumes both characters,
+# so "\\\\n" is one backslash escape followed by a plain "n"
+_ESCAPE_RE = re.compile(r'\\(u(?=[0-9a-fA-F]{4})|[ntrbf"\\])')
+
+
+def count_escapes(text: str) -> Dict[str, int]:
+    """Return ``{escape_name: count}`` for the escape sequences present in ``text``"""
+    if not text or "\\" not in text:
+        return {}
+    return {ESCAPE_NAMES[char]: count for char, count in Counter(_ESCAPE_RE.findall(text)).items()}
@@ -0,0 +1,129 @@
+"""
+Streaming export of feedback submissions joined with their social media posts
+
+Rows come from a Core ``SELECT`` (no ORM objects or identity map) executed with
+``yield_per``, so SQLite hands them over through a server-side cursor in
+batches. They are encoded as NDJSON or CSV into ~64KB chunks, which
+``CompressionMiddleware`` compresses as they are sent when the client accepts
+it. Memory use depends on the batch size, not on the table size.
+
+A submission with several posts appears once per post; one without posts
+appears once with empty ``post_*`` columns.
+"""
+import csv
+import io
+import json
+import logging
+from datetime import datetime
+from typing import Callable, Iterator, Optional
+
+from sqlalchemy import select
+
+from . import models
+
+logger = logging.getLogger(__name__)
+
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    # Starlette appends "; charset=utf-8" to text/* types
+    "csv": "text/csv",
+}
+EXPORT_BATCH_SIZE = 500
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+POST_COLUMNS = (
+    "post_id",
+    "social_platform",
+    "status",
+    "post_image_type",
+    "image_url",
+    "uploaded_image_url",
+    "ai_prompt",
+    "created_at",
+)
+
+
+def export_statement():
+    """All feedback columns plus ``post_*`` columns of linked posts, in primary key order"""
+    feedback = models.FeedbackSubmission
+    post = models.SocialMediaPost
+    columns = [column for column in feedback.__table__.columns]
+    columns += [getattr(post, name).label(name if name.startswith("post_") else f"post_{name}") for name in POST_COLUMNS]
+    return (
+        select(*columns)
+        .outerjoin(post, post.feedback_submission_id == feedback.submission_id)
+        .order_by(feedback.id, post.id)
+    )
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _ndjson_rows(columns, rows) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(dict(zip(columns, row)), default=_json_default, ensure_ascii=False) + "\n"
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _csv_rows(columns, rows) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def take() -> str:
+        line = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return line
+
+    writer.writerow(columns)
+    yield take()
+    for row in rows:
+        writer.writerow([_csv_value(value) for value in row])
+        yield take()
+
+
+def stream_export(
+    session_factory: Callable,
+    statement,
+    fmt: str = "ndjson",
+    batch_size: int = EXPORT_BATCH_SIZE,
+    chunk_bytes: int = EXPORT_CHUNK_BYTES,
+) -> Iterator[bytes]:
+    """Encoded export body, one ~``chunk_bytes`` piece at a time
+
+    The session is opened here rather than taken from the request so it lives
+    exactly as long as the stream.
+    """
+    encode_rows = _csv_rows if fmt == "csv" else _ndjson_rows
+    lines = 0
+
+    with session_factory() as db:
+        result = db.execute(statement.execution_options(yield_per=batch_size))
+        pending = []
+        pending_size = 0
+        for line in encode_rows(list(result.keys()), result):
+            lines += 1
+            pending.append(line)
+            pending_size += len(line)
+            if pending_size >= chunk_bytes:
+                chunk = "".join(pending).encode("utf-8")
+                pending = []
+                pending_size = 0
+                yield chunk
+        chunk = "".join(pending).encode("utf-8")
+        if chunk:
+            yield chunk
+
+    exported = lines - 1 if fmt == "csv" else lines
+    logger.info("Exported %s feedback rows as %s", exported, fmt)
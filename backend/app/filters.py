@@ -0,0 +1,118 @@
+"""
+Server-side filtering, sorting and column projection for feedback lists
+
+The dashboard used to pull every submission and filter in the browser, and each
+row carried nine large ``*_content`` Text columns the list view never shows.
+``fields=`` is applied with ``load_only`` so unrequested columns are neither
+read from SQLite nor serialized.
+"""
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, not_, or_
+from sqlalchemy.orm import load_only, selectinload
+
+from . import models, schemas
+from .pagination import timestamp_param
+
+DEFAULT_SORT = "created_at"
+SORTABLE_FIELDS = frozenset({
+    "id",
+    "created_at",
+    "updated_at",
+    "email",
+    "n8n_execution_id",
+    "linkedin_chosen_llm",
+    "x_chosen_llm",
+    "image_chosen_llm",
+})
+FEEDBACK_FIELDS = frozenset(schemas.FeedbackSubmissionResponse.model_fields)
+# Served from the linked social media post, not the feedback row
+POST_FIELDS = frozenset({"image_url", "uploaded_image_url"})
+# Every way a reviewer can respond: written feedback, a chosen LLM or their own content
+FEEDBACK_METHOD_FIELDS = tuple(field for _, fields in schemas.EXCLUSIVE_FEEDBACK_GROUPS for field in fields)
+
+
+class InvalidFilter(ValueError):
+    """Raised for an unknown sort key or projected field"""
+
+
+def parse_sort(sort: Optional[str]) -> Tuple[str, bool]:
+    """``"email"`` or ``"-email"`` -> (column name, descending)"""
+    sort = (sort or DEFAULT_SORT).strip()
+    descending = sort.startswith("-")
+    name = sort.lstrip("-")
+    if name not in SORTABLE_FIELDS:
+        raise InvalidFilter(f"Cannot sort by '{name}'. Allowed: {', '.join(sorted(SORTABLE_FIELDS))}")
+    return name, descending
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Comma-separated response fields, in the order requested; None means all fields"""
+    if not fields:
+        return None
+    requested = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in requested if name not in FEEDBACK_FIELDS]
+    if unknown:
+        raise InvalidFilter(f"Unknown fields: {', '.join(unknown)}")
+    return requested or None
+
+
+def has_feedback_clause():
+    """True when any LinkedIn, X or image feedback method (feedback text, chosen LLM, custom content) is non-empty"""
+    return or_(*(
+        and_(getattr(models.FeedbackSubmission, name).isnot(None), getattr(models.FeedbackSubmission, name) != "")
+        for name in FEEDBACK_METHOD_FIELDS
+    ))
+
+
+def filter_feedback(
+    query,
+    email: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    linkedin_chosen_llm: Optional[str] = None,
+    has_feedback: Optional[bool] = None,
+):
+    feedback = models.FeedbackSubmission
+    if email:
+        query = query.filter(feedback.email == email)
+    if created_after:
+        query = query.filter(feedback.created_at >= timestamp_param(created_after))
+    if created_before:
+        query = query.filter(feedback.created_at < timestamp_param(created_before))
+    if linkedin_chosen_llm:
+        query = query.filter(feedback.linkedin_chosen_llm == linkedin_chosen_llm)
+    if has_feedback is not None:
+        query = query.filter(has_feedback_clause() if has_feedback else not_(has_feedback_clause()))
+    return query
+
+
+def sort_feedback(query, sort: Tuple[str, bool]):
+    """Order by the sort column with ``id`` as the tie-breaker so pages are stable"""
+    name, descending = sort
+    column = getattr(models.FeedbackSubmission, name)
+    tie_breaker = models.FeedbackSubmission.id
+    if descending:
+        return query.order_by(column.desc(), tie_breaker.desc())
+    return query.order_by(column, tie_breaker)
+
+
+def project_feedback(query, fields: Optional[List[str]]):
+    """Load only the requested columns, and the linked posts only when their image URLs are asked for"""
+    feedback = models.FeedbackSubmission
+    if fields is None:
+        return query.options(selectinload(feedback.social_media_posts))
+
+    # created_at backs the cursor; submission_id joins the posts
+    columns = {"created_at"} | (set(fields) - POST_FIELDS)
+    wants_post = bool(POST_FIELDS.intersection(fields))
+    if wants_post:
+        columns.add("submission_id")
+    options = [load_only(*(getattr(feedback, name) for name in sorted(columns)))]
+    if wants_post:
+        post = models.SocialMediaPost
+        options.append(selectinload(feedback.social_media_posts).load_only(
+            post.feedback_submission_id, post.image_url, post.uploaded_image_url
+        ))
+    return query.options(*options)
@@ -0,0 +1,60 @@
+"""
+Application-scoped httpx client for all outbound calls (n8n webhooks, image uploads)
+"""
+import logging
+import os
+
+import httpx
+from fastapi import Request
+
+from .metrics import InstrumentedTransport
+
+logger = logging.getLogger(__name__)
+
+
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() in ("1", "true", "yes")
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "50"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+
+# Per-destination timeouts. Connecting should be quick everywhere; n8n may take
+# a while to answer because workflows run synchronously behind the webhook.
+DEFAULT_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+N8N_TIMEOUT = httpx.Timeout(float(os.getenv("N8N_TIMEOUT", "30")), connect=5.0)
+UPLOAD_TIMEOUT = httpx.Timeout(float(os.getenv("UPLOAD_TIMEOUT", "30")), connect=5.0)
+
+
+def _http2_supported() -> bool:
+    """HTTP/2 needs the optional ``h2`` package (``httpx[http2]``)"""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Build the shared client; call once at startup and close it at shutdown"""
+    http2 = HTTP2_ENABLED and _http2_supported()
+    if HTTP2_ENABLED and not http2:
+        logger.warning("HTTP/2 requested but the 'h2' package is not installed, falling back to HTTP/1.1")
+
+    limits = httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+    )
+    logger.info("Creating shared HTTP client (http2=%s, limits=%s)", http2, limits)
+    # Pool settings belong to the transport once we pass our own (wrapped for metrics)
+    transport = InstrumentedTransport(httpx.AsyncHTTPTransport(http2=http2, limits=limits))
+    return httpx.AsyncClient(transport=transport, timeout=DEFAULT_TIMEOUT)
+
+
+async def get_http_client(request: Request) -> httpx.AsyncClient:
+    """Dependency returning the client created in the startup event"""
+    client = getattr(request.app.state, "http_client", None)
+    if client is None or client.is_closed:
+        # Startup hooks don't run for bare TestClient instances
+        client = create_http_client()
+        request.app.state.http_client = client
+    return client
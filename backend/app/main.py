@@ -1,7 +1,7 @@
 from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Body, BackgroundTasks, Request
-from fastapi.responses import JSONResponse
-from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from typing import List, Optional
 import uuid
@@ -14,40 +14,39 @@ import asyncio
 import json
 
 from . import models, schemas
-from .database import engine, get_db, DATABASE_URL, recreate_engine
+from . import database
+from .database import AsyncSessionLocal, get_db, get_async_db, DATABASE_URL, recreate_engine
 from .database_utils import wait_for_database, ensure_database_exists
-from sqlalchemy import text
+from .escape_scanner import count_escapes
+from .http_client import create_http_client
+from .logging_config import configure_logging
+from . import metrics
+from .compression import COMPRESSION_ENABLED, CompressionMiddleware
+from .conditional import claim_version, feedback_version_from_row, feedback_version_statement, if_match_failed, validator_headers
+from .middleware import CORSLoggingMiddleware, ServerTimingMiddleware
+from .outbox import OutboxDispatcher
+from . import analytics, cache, search  # register the trigger and FTS index hooks on create_all
+from sqlalchemy import text, select
 import re
 
 
-logging.basicConfig(level=logging.INFO)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 
 def log_escape_characters(data: dict, operation: str):
     """Log information about escape characters in the data for debugging"""
-    escape_patterns = {
-        'newlines': r'\\n',
-        'tabs': r'\\t',
-        'carriage_returns': r'\\r',
-        'backspaces': r'\\b',
-        'form_feeds': r'\\f',
-        'quotes': r'\\"',
-        'backslashes': r'\\\\',
-        'unicode': r'\\u[0-9a-fA-F]{4}'
-    }
+    if not logger.isEnabledFor(logging.INFO):
+        return
     
     for field_name, field_value in data.items():
         if isinstance(field_value, str) and field_value:
-            found_escapes = []
-            for escape_name, pattern in escape_patterns.items():
-                if re.search(pattern, field_value):
-                    count = len(re.findall(pattern, field_value))
-                    found_escapes.append(f"{escape_name}: {count}")
+            escape_counts = count_escapes(field_value)
             
-            if found_escapes:
-                logger.info(f"{operation} - Field '{field_name}' contains escape characters: {', '.join(found_escapes)}")
-                logger.debug(f"{operation} - Field '{field_name}' value: {repr(field_value)}")
+            if escape_counts:
+                found_escapes = ", ".join(f"{name}: {count}" for name, count in escape_counts.items())
+                logger.info("%s - Field '%s' contains escape characters: %s", operation, field_name, found_escapes)
+                logger.debug("%s - Field '%s' value: %r", operation, field_name, field_value)
 
 def validate_and_log_json_content(content: str, field_name: str) -> str:
     """Validate and log JSON content, handling escape characters gracefully"""
@@ -59,26 +58,16 @@ def validate_and_log_json_content(content: str, field_name: str) -> str:
     if "'" in content:
         
         cleaned_content = content.replace("'", "\\'")
-        logger.info(f"Cleaned {field_name}: replaced unescaped apostrophes with escaped ones")
+        logger.info("Cleaned %s: replaced unescaped apostrophes with escaped ones", field_name)
     
     
     cleaned_content = clean_string_content(cleaned_content)
     
     
-    escape_counts = {
-        'newlines': cleaned_content.count('\\n'),
-        'tabs': cleaned_content.count('\\t'),
-        'carriage_returns': cleaned_content.count('\\r'),
-        'backspaces': cleaned_content.count('\\b'),
-        'form_feeds': cleaned_content.count('\\f'),
-        'quotes': cleaned_content.count('\\"'),
-        'backslashes': cleaned_content.count('\\\\'),
-        'unicode': len(re.findall(r'\\u[0-9a-fA-F]{4}', cleaned_content))
-    }
-    
-    total_escapes = sum(escape_counts.values())
-    if total_escapes > 0:
-        logger.info(f"Processing {field_name} with {total_escapes} escape sequences: {escape_counts}")
+    if logger.isEnabledFor(logging.INFO):
+        escape_counts = count_escapes(cleaned_content)
+        if escape_counts:
+            logger.info("Processing %s with %s escape sequences: %s", field_name, sum(escape_counts.values()), escape_counts)
     
     return cleaned_content
 
@@ -93,7 +82,7 @@ def strip_quotes(content: str) -> str:
     
     
     if stripped != content:
-        logger.info(f"Stripped quotes from string: '{content}' -> '{stripped}'")
+        logger.debug("Stripped quotes from string: '%s' -> '%s'", content, stripped)
     
     return stripped
 
@@ -107,7 +96,7 @@ def clean_string_content(content: str) -> str:
     
     
     if cleaned != content:
-        logger.info(f"Stripped quotes from string: '{content}' -> '{cleaned}'")
+        logger.debug("Stripped quotes from string: '%s' -> '%s'", content, cleaned)
     
     return cleaned
 
@@ -129,27 +118,27 @@ def determine_post_image_type(post_image_radio: str) -> str:
     Returns:
         str: Standardized post_image_type value
     """
-    logger.info(f"Determining post_image_type for radio value: '{post_image_radio}'")
+    logger.debug("Determining post_image_type for radio value: '%s'", post_image_radio)
     
     if not post_image_radio:
-        logger.info("No radio value provided, setting to 'No Image Needed'")
+        logger.debug("No radio value provided, setting to 'No Image Needed'")
         return "No Image Needed"
     
     if "Yes, I have an image URL" in post_image_radio:
-        logger.info("Radio contains 'Yes, I have an image URL', setting to 'Yes, Image URL'")
+        logger.debug("Radio contains 'Yes, I have an image URL', setting to 'Yes, Image URL'")
         return "Yes, Image URL"
     elif "Yes, I have an image upload" in post_image_radio:
-        logger.info("Radio contains 'Yes, I have an image upload', setting to 'Yes, Upload Image'")
+        logger.debug("Radio contains 'Yes, I have an image upload', setting to 'Yes, Upload Image'")
         return "Yes, Upload Image"
     elif "Yes, AI generated image" in post_image_radio:
-        logger.info("Radio contains 'Yes, AI generated image', setting to 'Yes, AI Generated'")
+        logger.debug("Radio contains 'Yes, AI generated image', setting to 'Yes, AI Generated'")
         return "Yes, AI Generated"
     elif "No image" in post_image_radio:
-        logger.info("Radio contains 'No image', setting to 'No Image Needed'")
+        logger.debug("Radio contains 'No image', setting to 'No Image Needed'")
         return "No Image Needed"
     else:
         
-        logger.info(f"Radio value '{post_image_radio}' doesn't match expected patterns, keeping original value")
+        logger.debug("Radio value '%s' doesn't match expected patterns, keeping original value", post_image_radio)
         return post_image_radio
 
 
@@ -168,39 +157,39 @@ def handle_image_url_storage(post_data: dict, post_image_type: str) -> dict:
     Returns:
         dict: Updated post data with proper image URL field assignments
     """
-    logger.info(f"Handling image URL storage for post_image_type: '{post_image_type}'")
+    logger.debug("Handling image URL storage for post_image_type: '%s'", post_image_type)
     
     if post_image_type == "Yes, Image URL":
         
         if 'image_url' in post_data:
             post_data['uploaded_image_url'] = None
-            logger.info("External image URL stored in image_url field, cleared uploaded_image_url")
+            logger.debug("External image URL stored in image_url field, cleared uploaded_image_url")
         elif 'uploaded_image_url' in post_data:
             
             post_data['image_url'] = post_data['uploaded_image_url']
             post_data['uploaded_image_url'] = None
-            logger.info("Moved uploaded_image_url to image_url field")
+            logger.debug("Moved uploaded_image_url to image_url field")
         else:
-            logger.info("No image URL provided for external image type")
+            logger.debug("No image URL provided for external image type")
             
     elif post_image_type == "Yes, Upload Image":
         
         if 'uploaded_image_url' in post_data:
             post_data['image_url'] = None
-            logger.info("Uploaded image URL stored in uploaded_image_url field, cleared image_url")
+            logger.debug("Uploaded image URL stored in uploaded_image_url field, cleared image_url")
         elif 'image_url' in post_data:
             
             post_data['uploaded_image_url'] = post_data['image_url']
             post_data['image_url'] = None
-            logger.info("Moved image_url to uploaded_image_url field")
+            logger.debug("Moved image_url to uploaded_image_url field")
         else:
-            logger.info("No image URL provided for upload image type")
+            logger.debug("No image URL provided for upload image type")
             
     else:
         
         post_data['image_url'] = None
         post_data['uploaded_image_url'] = None
-        logger.info(f"Cleared both image URL fields for post_image_type: '{post_image_type}'")
+        logger.debug("Cleared both image URL fields for post_image_type: '%s'", post_image_type)
     
     return post_data
 
@@ -222,17 +211,17 @@ def initialize_database():
     max_table_retries = 3
     for attempt in range(max_table_retries):
         try:
-            models.Base.metadata.create_all(bind=engine)
+            models.Base.metadata.create_all(bind=database.engine)
             logger.info("SQLite database tables created successfully")
             return
         except Exception as e:
-            logger.warning(f"Failed to create database tables (attempt {attempt + 1}/{max_table_retries}): {str(e)}")
+            logger.warning("Failed to create database tables (attempt %s/%s): %s", attempt + 1, max_table_retries, e)
             if attempt < max_table_retries - 1:
                 import time
                 time.sleep(5)
                 logger.info("Retrying table creation...")
             else:
-                logger.error(f"Failed to create database tables after {max_table_retries} attempts")
+                logger.error("Failed to create database tables after %s attempts", max_table_retries)
                 raise RuntimeError(f"Table creation failed: {str(e)}")
 
 
@@ -248,12 +237,12 @@ except RuntimeError as e:
             initialize_database()
             logger.info("Database initialization successful on retry")
         except Exception as retry_e:
-            logger.error(f"Database initialization failed on retry: {str(retry_e)}")
+            logger.error("Database initialization failed on retry: %s", retry_e)
             raise
     else:
         raise
 
-app = FastAPI(title="n8n Execution Feedback API", version="1.0.0")
+app = FastAPI(title="n8n Execution Feedback API", version="1.0.0", default_response_class=ORJSONResponse)
 
 # Configure CORS middleware - this must be added before other middleware
 cors_origins_env = os.getenv("CORS_ORIGINS")
@@ -262,97 +251,30 @@ if cors_origins_env:
 else:
     cors_origins = ["http://localhost:3000", "http://104.131.8.230:3000", "http://127.0.0.1:3000", "http://0.0.0.0:3000"]
 
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=cors_origins,
-    allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
-    allow_headers=["*"],
-    expose_headers=["*"],
-    max_age=3600,
-)
-
-# Force CORS headers on all responses
-@app.middleware("http")
-async def force_cors_headers(request: Request, call_next):
-    """Force CORS headers on all responses"""
-    response = await call_next(request)
-    
-    # Get the origin from the request
-    origin = request.headers.get("origin")
-    
-    # Always prioritize the frontend origin from environment variable
-    frontend_url = os.getenv("FRONTEND_URL", "http://104.131.8.230:3000")
-    
-    # If origin is in our allowed list, use it, otherwise use the frontend URL
-    if origin and origin in cors_origins:
-        response.headers["Access-Control-Allow-Origin"] = origin
-    else:
-        response.headers["Access-Control-Allow-Origin"] = frontend_url
-    
-    # Always set these CORS headers
-    response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, OPTIONS, PATCH"
-    response.headers["Access-Control-Allow-Headers"] = "*"
-    response.headers["Access-Control-Allow-Credentials"] = "true"
-    response.headers["Access-Control-Max-Age"] = "3600"
-    
-    # Log CORS headers being set
-    logger.info(f"Force CORS: Setting headers for origin '{origin}' -> '{response.headers.get('Access-Control-Allow-Origin')}'")
-    
-    return response
-
-# Add explicit OPTIONS handler for all API routes to ensure preflight works
+# Middleware added first runs innermost. Compression sits closest to the routes;
+# Server-Timing collects the SQL stats of the request; CORS headers, preflight
+# answers, JSON error mapping and the access log are all handled by one pure
+# ASGI middleware around it.
+frontend_url = os.getenv("FRONTEND_URL", "http://104.131.8.230:3000")
+if COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+app.add_middleware(ServerTimingMiddleware)
+app.add_middleware(CORSLoggingMiddleware, allow_origins=cors_origins, fallback_origin=frontend_url)
+# Added last so it wraps everything, preflights included
+if metrics.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+
+# Preflights carrying Access-Control-Request-Method are answered by the
+# middleware; plain OPTIONS requests land here and get the CORS headers added
 @app.options("/api/{full_path:path}")
 async def api_options_handler(request: Request, full_path: str):
     """Handle OPTIONS requests for all API routes"""
-    origin = request.headers.get("origin")
-    
-    # Always prioritize the frontend origin from environment variable
-    frontend_url = os.getenv("FRONTEND_URL", "http://104.131.8.230:3000")
-    
-    # If origin is in our allowed list, use it, otherwise use the frontend URL
-    if origin and origin in cors_origins:
-        allowed_origin = origin
-    else:
-        allowed_origin = frontend_url
-    
-    return JSONResponse(
-        content={},
-        headers={
-            "Access-Control-Allow-Origin": allowed_origin,
-            "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS, PATCH",
-            "Access-Control-Allow-Headers": "*",
-            "Access-Control-Allow-Credentials": "true",
-            "Access-Control-Max-Age": "3600",
-        }
-    )
-
-# Add general OPTIONS handler for all other routes
+    return JSONResponse(content={})
+
 @app.options("/{full_path:path}")
 async def general_options_handler(request: Request, full_path: str):
     """Handle OPTIONS requests for all other routes"""
-    origin = request.headers.get("origin")
-    
-    # Always prioritize the frontend origin from environment variable
-    frontend_url = os.getenv("FRONTEND_URL", "http://104.131.8.230:3000")
-    
-    # If origin is in our allowed list, use it, otherwise use the frontend URL
-    if origin and origin in cors_origins:
-        allowed_origin = origin
-    else:
-        allowed_origin = frontend_url
-    
-    return JSONResponse(
-        content={},
-        headers={
-            "Access-Control-Allow-Origin": allowed_origin,
-            "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS, PATCH",
-            "Access-Control-Allow-Headers": "*",
-            "Access-Control-Allow-Credentials": "true",
-            "Access-Control-Max-Age": "3600",
-        }
-    )
+    return JSONResponse(content={})
 
 # Add a simple health check endpoint to test CORS
 @app.get("/health")
@@ -360,6 +282,11 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "message": "Server is running"}
 
+@app.get("/metrics", include_in_schema=False)
+def metrics_endpoint():
+    """Prometheus scrape endpoint (summed over all workers when METRICS_MULTIPROC_DIR is set)"""
+    return Response(content=metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
 # Add a CORS test endpoint
 @app.get("/cors-test")
 async def cors_test():
@@ -396,38 +323,6 @@ logger.info("CORS_ORIGINS environment variable: %s", repr(os.getenv("CORS_ORIGIN
 logger.info("CORS middleware configured with origins: %s", cors_origins)
 logger.info("Total CORS origins configured: %d", len(cors_origins))
 
-# Add middleware to log all incoming requests for debugging (excluding health checks)
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """Log all incoming requests for debugging, excluding health checks"""
-    # Skip logging for health check requests to reduce log spam
-    is_health_check = str(request.url.path) == "/health" and request.headers.get("user-agent", "").startswith("curl")
-    
-    if not is_health_check:
-        logger.info(f"Incoming request: {request.method} {request.url}")
-        logger.info(f"Origin header: {request.headers.get('origin', 'None')}")
-        logger.info(f"User-Agent: {request.headers.get('user-agent', 'None')}")
-    
-    response = await call_next(request)
-    
-    if not is_health_check:
-        logger.info(f"Response status: {response.status_code}")
-        logger.info(f"CORS headers in response:")
-        cors_headers = [
-            "Access-Control-Allow-Origin",
-            "Access-Control-Allow-Methods", 
-            "Access-Control-Allow-Headers",
-            "Access-Control-Allow-Credentials",
-            "Access-Control-Max-Age"
-        ]
-        for header in cors_headers:
-            value = response.headers.get(header)
-            if value:
-                logger.info(f"  {header}: {value}")
-    
-    return response
-
-
 async def check_database_health():
     """Periodically check database health and recreate if needed"""
     while True:
@@ -437,24 +332,24 @@ async def check_database_health():
             
             
             try:
-                with engine.connect() as conn:
+                with database.engine.connect() as conn:
                     conn.execute(text("SELECT 1"))
                 logger.debug("Database health check passed")
             except Exception as e:
-                logger.warning(f"Database health check failed: {str(e)}")
+                logger.warning("Database health check failed: %s", e)
                 logger.info("Attempting to recreate database connection...")
                 try:
-                    if recreate_engine():
+                    if await recreate_engine():
                         logger.info("Database engine recreated successfully")
                     else:
                         logger.warning("Failed to recreate engine, attempting full reinitialization...")
                         initialize_database()
                         logger.info("Database reinitialized successfully")
                 except Exception as recreate_e:
-                    logger.error(f"Failed to recreate database: {str(recreate_e)}")
+                    logger.error("Failed to recreate database: %s", recreate_e)
                     
         except Exception as e:
-            logger.error(f"Error in database health check task: {str(e)}")
+            logger.error("Error in database health check task: %s", e)
             await asyncio.sleep(60)  
 
 
@@ -462,24 +357,33 @@ async def check_database_health():
 async def startup_event():
     """Start background tasks on startup"""
     
+    app.state.http_client = create_http_client()
+    
     try:
         logger.info("Performing startup database check...")
-        with engine.connect() as conn:
+        with database.engine.connect() as conn:
             conn.execute(text("SELECT 1"))
         logger.info("Startup database check passed")
     except Exception as e:
-        logger.warning(f"Startup database check failed: {str(e)}")
+        logger.warning("Startup database check failed: %s", e)
         logger.info("Attempting to reinitialize database on startup...")
         try:
             initialize_database()
             logger.info("Database reinitialized successfully on startup")
         except Exception as init_e:
-            logger.error(f"Failed to reinitialize database on startup: {str(init_e)}")
+            logger.error("Failed to reinitialize database on startup: %s", init_e)
     
     
     asyncio.create_task(check_database_health())
     
     
+    app.state.outbox_dispatcher = OutboxDispatcher(AsyncSessionLocal, lambda: app.state.http_client)
+    app.state.outbox_dispatcher.start()
+    
+    if metrics.REGISTRY.multiproc_dir:
+        app.state.metrics_flusher = asyncio.create_task(metrics.flush_periodically())
+    
+    
     try:
         logger.info("Running Alembic migrations on startup...")
         import subprocess
@@ -493,21 +397,37 @@ async def startup_event():
         if result.returncode == 0:
             logger.info("✅ Alembic migrations completed successfully on startup")
             if result.stdout.strip():
-                logger.info(f"Migration output: {result.stdout.strip()}")
+                logger.info("Migration output: %s", result.stdout.strip())
         else:
-            logger.warning(f"⚠️ Alembic migrations failed on startup (exit code: {result.returncode})")
+            logger.warning("⚠️ Alembic migrations failed on startup (exit code: %s)", result.returncode)
             if result.stderr.strip():
-                logger.warning(f"Migration error: {result.stderr.strip()}")
+                logger.warning("Migration error: %s", result.stderr.strip())
             if result.stdout.strip():
-                logger.info(f"Migration output: {result.stdout.strip()}")
+                logger.info("Migration output: %s", result.stdout.strip())
     except Exception as e:
-        logger.error(f"❌ Failed to run Alembic migrations on startup: {str(e)}")
+        logger.error("❌ Failed to run Alembic migrations on startup: %s", e)
         logger.info("Server will continue without running migrations")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release pooled resources on shutdown"""
+    outbox_dispatcher = getattr(app.state, "outbox_dispatcher", None)
+    if outbox_dispatcher is not None:
+        await outbox_dispatcher.stop()
+    metrics_flusher = getattr(app.state, "metrics_flusher", None)
+    if metrics_flusher is not None:
+        metrics_flusher.cancel()
+        metrics.REGISTRY.write_snapshot()
+    http_client = getattr(app.state, "http_client", None)
+    if http_client is not None:
+        await http_client.aclose()
+    await database.async_engine.dispose()
+
+
 FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:3000")
-logger.info(f"Frontend URL configured as: {FRONTEND_URL}")
-logger.info(f"Environment variables: FRONTEND_URL={os.getenv('FRONTEND_URL')}")
+logger.info("Frontend URL configured as: %s", FRONTEND_URL)
+logger.info("Environment variables: FRONTEND_URL=%s", os.getenv('FRONTEND_URL'))
 
 
 from .api.router import api_router
@@ -520,31 +440,45 @@ app.include_router(api_router)
 async def update_feedback_submission_raw(
     submission_id: str,
     request: Request,
-    db: Session = Depends(get_db)
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Update an existing feedback submission with raw JSON handling"""
+    """Update an existing feedback submission with raw JSON handling
+    
+    With ``If-Match`` the update only applies if the submission still has that ETag (412 otherwise).
+    """
     try:
-        logger.info(f"Updating feedback submission with ID: {submission_id} using raw JSON")
+        logger.debug("Updating feedback submission with ID: %s using raw JSON", submission_id)
         
         
-        db_feedback = db.query(models.FeedbackSubmission).filter(
-            models.FeedbackSubmission.submission_id == submission_id
-        ).first()
+        result = await db.execute(
+            select(models.FeedbackSubmission).where(
+                models.FeedbackSubmission.submission_id == submission_id
+            )
+        )
+        db_feedback = result.scalars().first()
         
         if db_feedback is None:
-            logger.warning(f"Feedback submission not found with ID: {submission_id}")
+            logger.warning("Feedback submission not found with ID: %s", submission_id)
             raise HTTPException(status_code=404, detail="Feedback submission not found")
         
+        checked_version = None
+        if "if-match" in request.headers:
+            checked_version = (await db.execute(feedback_version_statement(submission_id))).first()
+            if checked_version is None or if_match_failed(request, feedback_version_from_row(checked_version)[0]):
+                logger.info("If-Match precondition failed updating feedback submission %s", submission_id)
+                raise HTTPException(status_code=412, detail="Feedback submission was modified since it was read")
+        
         
         try:
             body = await request.body()
             raw_data = json.loads(body.decode('utf-8'))
         except json.JSONDecodeError as e:
-            logger.error(f"JSON decode error: {str(e)}")
+            logger.error("JSON decode error: %s", e)
             
             try:
                 body_str = body.decode('utf-8')
-                logger.info(f"Attempting to clean JSON string. Original length: {len(body_str)}")
+                logger.debug("Attempting to clean JSON string. Original length: %s", len(body_str))
                 
                 
                 cleaned_str = body_str
@@ -552,7 +486,7 @@ async def update_feedback_submission_raw(
                 
                 if "'" in cleaned_str:
                     cleaned_str = cleaned_str.replace("'", "\\'")
-                    logger.info("Replaced unescaped apostrophes")
+                    logger.debug("Replaced unescaped apostrophes")
                 
                 
                 
@@ -563,14 +497,14 @@ async def update_feedback_submission_raw(
                 
                 cleaned_str = re.sub(r'[\x00-\x1f\x7f-\x9f]', '', cleaned_str)
                 
-                logger.info("Cleaned control characters from JSON string")
+                logger.debug("Cleaned control characters from JSON string")
                 
                 
                 raw_data = json.loads(cleaned_str)
-                logger.info("Successfully cleaned and parsed JSON after initial failure")
+                logger.debug("Successfully cleaned and parsed JSON after initial failure")
                 
             except Exception as clean_error:
-                logger.error(f"Failed to clean JSON: {str(clean_error)}")
+                logger.error("Failed to clean JSON: %s", clean_error)
                 
                 body_str = body.decode('utf-8')
                 error_pos = e.pos
@@ -601,101 +535,65 @@ async def update_feedback_submission_raw(
             
             raw_data['updated_at'] = datetime.utcnow()
             
+            if checked_version is not None:
+                claimed = await db.execute(claim_version(models.FeedbackSubmission, checked_version, raw_data['updated_at']))
+                if claimed.rowcount == 0:
+                    await db.rollback()
+                    logger.info("Feedback submission %s was written after its If-Match check", submission_id)
+                    raise HTTPException(status_code=412, detail="Feedback submission was modified since it was read")
+            
             for field, value in raw_data.items():
                 if hasattr(db_feedback, field):
                     
                     if field == 'n8n_execution_id':
                         current_value = getattr(db_feedback, field)
                         if current_value is None or current_value == '':
-                            logger.info(f"Updating n8n_execution_id from '{current_value}' to '{value}'")
+                            logger.debug("Updating n8n_execution_id from '%s' to '%s'", current_value, value)
                             setattr(db_feedback, field, value)
                         else:
-                            logger.info(f"Skipping n8n_execution_id update - current value '{current_value}' is not empty")
+                            logger.debug("Skipping n8n_execution_id update - current value '%s' is not empty", current_value)
                     else:
                         
-                        logger.info(f"Updating field '{field}' to '{value}'")
+                        logger.debug("Updating field '%s' to '%s'", field, value)
                         setattr(db_feedback, field, value)
         
-        db.commit()
-        db.refresh(db_feedback)
+        await db.commit()
+        cache.feedback_cache.invalidate(submission_id)
+        await db.refresh(db_feedback)
+        version = feedback_version_from_row((await db.execute(feedback_version_statement(submission_id))).first())
+        response.headers.update(validator_headers(*version))
         
-        logger.info(f"Successfully updated feedback submission with ID: {submission_id}")
+        logger.info("Successfully updated feedback submission with ID: %s", submission_id)
         
         return db_feedback
             
     except HTTPException:
         raise
     except IntegrityError as e:
-        logger.error(f"Database integrity error updating feedback submission: {str(e)}")
-        db.rollback()
+        logger.error("Database integrity error updating feedback submission: %s", e)
+        await db.rollback()
         raise HTTPException(
             status_code=400, 
             detail=f"Database integrity error: {str(e)}"
         )
     except SQLAlchemyError as e:
-        logger.error(f"Database error updating feedback submission: {str(e)}")
-        db.rollback()
+        logger.error("Database error updating feedback submission: %s", e)
+        await db.rollback()
         raise HTTPException(
             status_code=500, 
             detail=f"Database error: {str(e)}"
         )
     except Exception as e:
-        logger.error(f"Unexpected error updating feedback submission: {str(e)}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
-        db.rollback()
+        logger.error("Unexpected error updating feedback submission: %s", e)
+        logger.error("Traceback: %s", traceback.format_exc())
+        await db.rollback()
         raise HTTPException(
             status_code=500, 
             detail=f"Internal server error: {str(e)}"
         )
 
 
-@app.middleware("http")
-async def json_error_handler(request: Request, call_next):
-    """Middleware to catch JSON parsing errors and provide better error messages"""
-    try:
-        response = await call_next(request)
-        return response
-    except json.JSONDecodeError as e:
-        logger.error(f"JSON decode error in request: {str(e)}")
-        return JSONResponse(
-            status_code=400,
-            content={
-                "detail": [
-                    {
-                        "type": "json_invalid",
-                        "loc": ["body"],
-                        "msg": f"Invalid JSON format: {str(e)}",
-                        "input": {},
-                        "ctx": {
-                            "error": str(e),
-                            "help": "Please check your JSON syntax, especially quotes and special characters. Make sure all apostrophes and quotes are properly escaped."
-                        }
-                    }
-                ]
-            }
-        )
-    except Exception as e:
-        logger.error(f"Unexpected error in middleware: {str(e)}")
-        return JSONResponse(
-            status_code=500,
-            content={
-                "detail": [
-                    {
-                        "type": "internal_error",
-                        "loc": ["body"],
-                        "msg": "Internal server error",
-                        "input": {},
-                        "ctx": {"error": str(e)}
-                    }
-                ]
-            }
-        )
-
-
-
-
-
 
 
 logger.info("API endpoints successfully organized into modular structure")
-logger.info(f"Using SQLite database: {DATABASE_URL}")
\ No newline at end of file
+logger.info("Using SQLite database: %s", DATABASE_URL)
\ No newline at end of file
@@ -0,0 +1,346 @@
+"""
+In-process metrics registry with Prometheus text exposition at /metrics
+
+Counters, gauges and histograms live in plain dicts keyed by label values.
+With several uvicorn workers set ``METRICS_MULTIPROC_DIR``: every worker then
+writes a JSON snapshot of its registry to that directory every
+``METRICS_FLUSH_INTERVAL`` seconds (and right before serving /metrics), and a
+scrape sums the snapshots of all workers, so it doesn't matter which worker
+answers. Snapshots of exited workers are kept so counters and histograms never
+go backwards, but their gauges are dropped: a dead worker holds no pool
+connections. Clear the directory on deploy.
+"""
+import asyncio
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Sequence, Tuple
+
+import httpx
+from sqlalchemy import event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR", "")
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4"
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape_label(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _worker_alive(path: str) -> bool:
+    """Whether the process that wrote ``metrics_<pid>.json`` is still running"""
+    try:
+        pid = int(os.path.basename(path)[len("metrics_"):-len(".json")])
+    except ValueError:
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, registry: "Registry", name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = registry.lock
+        self._values: Dict[Tuple[str, ...], object] = {}
+        registry.register(self)
+
+    def _key(self, labelvalues: Sequence[str]) -> Tuple[str, ...]:
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labelvalues}")
+        return tuple(str(value) for value in labelvalues)
+
+    def snapshot(self) -> List:
+        with self._lock:
+            return [[list(key), value if not isinstance(value, list) else list(value)] for key, value in self._values.items()]
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_Metric):
+    """Monotonically increasing value per label set"""
+
+    kind = "counter"
+
+    def inc(self, *labelvalues: str, amount: float = 1.0):
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """Value that goes up and down; summed across workers"""
+
+    kind = "gauge"
+
+    def inc(self, *labelvalues: str, amount: float = 1.0):
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, *labelvalues: str, amount: float = 1.0):
+        self.inc(*labelvalues, amount=-amount)
+
+    def set(self, value: float, *labelvalues: str):
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = float(value)
+
+
+class Histogram(_Metric):
+    """Bucketed observations; stored as per-bucket counts plus sum and count"""
+
+    kind = "histogram"
+
+    def __init__(self, registry, name, documentation, labelnames=(), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value: float, *labelvalues: str):
+        key = self._key(labelvalues)
+        index = 0
+        while value > self.buckets[index]:
+            index += 1
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [count per bucket..., sum, count]
+                state = [0] * len(self.buckets) + [0.0, 0]
+                self._values[key] = state
+            state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+
+class Registry:
+    """Holds the metric families and renders / persists them"""
+
+    def __init__(self, multiproc_dir: str = METRICS_MULTIPROC_DIR):
+        self.lock = threading.Lock()
+        self.metrics: Dict[str, _Metric] = {}
+        self.multiproc_dir = multiproc_dir
+
+    def register(self, metric: _Metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return Counter(self, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return Gauge(self, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return Histogram(self, name, documentation, labelnames, buckets)
+
+    def snapshot(self) -> Dict[str, List]:
+        return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+    def _snapshot_path(self) -> str:
+        return os.path.join(self.multiproc_dir, f"metrics_{os.getpid()}.json")
+
+    def write_snapshot(self):
+        """Persist this worker's values for the other workers' scrapes (atomic rename)"""
+        if not self.multiproc_dir:
+            return
+        os.makedirs(self.multiproc_dir, exist_ok=True)
+        path = self._snapshot_path()
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp_path, path)
+
+    def collect(self) -> Dict[str, Dict[Tuple[str, ...], object]]:
+        """Values of every family, summed over all worker snapshots in multiprocess mode
+
+        Gauges are summed over live workers only; counters and histograms keep
+        the totals of exited workers too.
+        """
+        if not self.multiproc_dir:
+            snapshots = [(True, self.snapshot())]
+        else:
+            self.write_snapshot()
+            snapshots = []
+            for path in glob.glob(os.path.join(self.multiproc_dir, "metrics_*.json")):
+                try:
+                    with open(path) as f:
+                        snapshots.append((_worker_alive(path), json.load(f)))
+                except (OSError, ValueError) as e:
+                    logger.warning("Skipping unreadable metrics snapshot %s: %s", path, e)
+
+        merged: Dict[str, Dict[Tuple[str, ...], object]] = {name: {} for name in self.metrics}
+        for alive, snapshot in snapshots:
+            for name, samples in snapshot.items():
+                if name not in merged or (not alive and self.metrics[name].kind == "gauge"):
+                    continue
+                family = merged[name]
+                for labels, value in samples:
+                    key = tuple(labels)
+                    if isinstance(value, list):
+                        current = family.get(key)
+                        family[key] = value if current is None else [a + b for a, b in zip(current, value)]
+                    else:
+                        family[key] = family.get(key, 0.0) + value
+        return merged
+
+    def render(self) -> str:
+        """Prometheus text exposition format 0.0.4"""
+        lines = []
+        for name, values in self.collect().items():
+            metric = self.metrics[name]
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for key in sorted(values):
+                value = values[key]
+                if metric.kind != "histogram":
+                    lines.append(f"{name}{_format_labels(metric.labelnames, key)} {_format_value(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(metric.buckets, value[:-2]):
+                    cumulative += count
+                    le = 'le="' + _format_value(bound) + '"'
+                    lines.append(f"{name}_bucket{_format_labels(metric.labelnames, key, le)} {_format_value(cumulative)}")
+                lines.append(f"{name}_sum{_format_labels(metric.labelnames, key)} {_format_value(value[-2])}")
+                lines.append(f"{name}_count{_format_labels(metric.labelnames, key)} {_format_value(value[-1])}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total", "HTTP requests by method, route template and status code", ("method", "route", "status"))
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency by method and route template", ("method", "route"))
+HTTP_CLIENT_REQUESTS = REGISTRY.counter(
+    "http_client_requests_total", "Outbound HTTP requests by destination host and status code", ("destination", "status"))
+HTTP_CLIENT_DURATION = REGISTRY.histogram(
+    "http_client_request_duration_seconds", "Outbound HTTP latency until response headers, by destination host", ("destination",))
+DB_QUERIES = REGISTRY.counter(
+    "db_queries_total", "SQL statements executed", ("engine",))
+DB_QUERY_DURATION = REGISTRY.histogram(
+    "db_query_duration_seconds", "SQL statement execution time", ("engine",))
+DB_QUERIES_PER_REQUEST = REGISTRY.histogram(
+    "db_queries_per_request", "SQL statements executed while serving one request, by route template", ("route",),
+    buckets=(1, 2, 3, 5, 8, 13, 21, 50))
+DB_POOL_CHECKOUTS = REGISTRY.counter(
+    "db_pool_checkouts_total", "Connections checked out of the SQLAlchemy pool", ("engine",))
+DB_POOL_CHECKED_OUT = REGISTRY.gauge(
+    "db_pool_connections_in_use", "Connections currently checked out of the SQLAlchemy pool", ("engine",))
+
+
+def route_template(scope: Scope) -> str:
+    """The matched route's path template, so ids don't explode label cardinality"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording request count and latency per route template"""
+
+    def __init__(self, app: ASGIApp, registry: Registry = REGISTRY):
+        self.app = app
+        self.requests = registry.metrics["http_requests_total"]
+        self.duration = registry.metrics["http_request_duration_seconds"]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = route_template(scope)
+            self.requests.inc(scope["method"], route, str(status_code))
+            self.duration.observe(time.perf_counter() - started, scope["method"], route)
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """Wraps an httpx transport to time outbound requests per destination host"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        destination = request.url.host
+        started = time.perf_counter()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except Exception as e:
+            HTTP_CLIENT_REQUESTS.inc(destination, type(e).__name__)
+            HTTP_CLIENT_DURATION.observe(time.perf_counter() - started, destination)
+            raise
+        HTTP_CLIENT_REQUESTS.inc(destination, str(response.status_code))
+        HTTP_CLIENT_DURATION.observe(time.perf_counter() - started, destination)
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+def instrument_engine(engine, name: str):
+    """Count pool checkouts and connections in use for a (sync) engine"""
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKOUTS.inc(name)
+        DB_POOL_CHECKED_OUT.inc(name)
+
+    def on_checkin(dbapi_connection, connection_record):
+        DB_POOL_CHECKED_OUT.dec(name)
+
+    event.listen(engine, "checkout", on_checkout)
+    event.listen(engine, "checkin", on_checkin)
+
+
+async def flush_periodically(registry: Registry = REGISTRY, interval: float = METRICS_FLUSH_INTERVAL):
+    """Background task keeping this worker's snapshot fresh for the other workers"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            registry.write_snapshot()
+        except OSError as e:
+            logger.warning("Failed to write metrics snapshot: %s", e)
@@ -0,0 +1,208 @@
+"""
+Pure ASGI middleware handling CORS, error mapping and access logging in one pass
+
+This replaces the ``CORSMiddleware`` + three ``@app.middleware("http")`` stack.
+Each ``BaseHTTPMiddleware`` layer spawned a task and wrapped the response
+stream, and the CORS headers were computed twice; here the response headers
+are rewritten once in the ``http.response.start`` message.
+"""
+import json
+import logging
+import os
+import random
+import time
+import traceback
+from typing import Iterable, List, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .database import start_query_stats, stop_query_stats
+from .metrics import DB_QUERIES_PER_REQUEST, route_template
+
+logger = logging.getLogger("app.access")
+
+
+CORS_ALLOW_METHODS = "GET, POST, PUT, DELETE, OPTIONS, PATCH"
+CORS_MAX_AGE = "3600"
+# Fraction of successful requests written to the access log; errors and slow
+# requests are always logged
+ACCESS_LOG_SAMPLE_RATE = float(os.getenv("ACCESS_LOG_SAMPLE_RATE", "1.0"))
+ACCESS_LOG_SLOW_MS = float(os.getenv("ACCESS_LOG_SLOW_MS", "1000"))
+
+JSON_ERROR_HELP = "Please check your JSON syntax, especially quotes and special characters. Make sure all apostrophes and quotes are properly escaped."
+
+
+def _error_body(error_type: str, message: str, ctx: dict) -> bytes:
+    return json.dumps({
+        "detail": [
+            {
+                "type": error_type,
+                "loc": ["body"],
+                "msg": message,
+                "input": {},
+                "ctx": ctx,
+            }
+        ]
+    }).encode("utf-8")
+
+
+class CORSLoggingMiddleware:
+    """CORS headers on every response, direct preflight answers, JSON errors, sampled access log"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        allow_origins: Iterable[str],
+        fallback_origin: str,
+        sample_rate: float = ACCESS_LOG_SAMPLE_RATE,
+        slow_ms: float = ACCESS_LOG_SLOW_MS,
+    ):
+        self.app = app
+        self.allow_origins = frozenset(allow_origins)
+        self.fallback_origin = fallback_origin.encode("latin-1")
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self._static_headers: List[Tuple[bytes, bytes]] = [
+            (b"access-control-allow-methods", CORS_ALLOW_METHODS.encode("latin-1")),
+            (b"access-control-allow-headers", b"*"),
+            (b"access-control-allow-credentials", b"true"),
+            (b"access-control-max-age", CORS_MAX_AGE.encode("latin-1")),
+            (b"access-control-expose-headers", b"*"),
+        ]
+
+    def resolve_origin(self, origin: bytes) -> bytes:
+        """Echo an allowed origin back, otherwise answer with the frontend URL"""
+        if origin and origin.decode("latin-1") in self.allow_origins:
+            return origin
+        return self.fallback_origin
+
+    def cors_headers(self, origin: bytes) -> List[Tuple[bytes, bytes]]:
+        return [(b"access-control-allow-origin", self.resolve_origin(origin))] + self._static_headers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        origin = b""
+        user_agent = b""
+        request_method = b""
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+            elif name == b"user-agent":
+                user_agent = value
+            elif name == b"access-control-request-method":
+                request_method = value
+        preflight = scope["method"] == "OPTIONS" and bool(origin) and bool(request_method)
+
+        cors_headers = self.cors_headers(origin)
+        started = time.perf_counter()
+        status_code = 500
+        response_started = False
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code, response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+                status_code = message["status"]
+                headers = [
+                    (name, value) for name, value in message.get("headers", [])
+                    if not name.startswith(b"access-control-") and name != b"vary"
+                ]
+                vary = [value for name, value in message.get("headers", []) if name == b"vary"]
+                vary.append(b"Origin")
+                headers.extend(cors_headers)
+                headers.append((b"vary", b", ".join(vary)))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            if preflight:
+                allowed = origin.decode("latin-1") in self.allow_origins
+                await self._send_plain(send_wrapper, 200 if allowed else 400, b"OK" if allowed else b"Disallowed CORS origin")
+            else:
+                await self.app(scope, receive, send_wrapper)
+        except json.JSONDecodeError as e:
+            if response_started:
+                raise
+            logger.error("JSON decode error in request: %s", e)
+            await self._send_json(send_wrapper, 400, _error_body(
+                "json_invalid", f"Invalid JSON format: {str(e)}", {"error": str(e), "help": JSON_ERROR_HELP}
+            ))
+        except Exception as e:
+            if response_started:
+                raise
+            logger.error("Unexpected error handling %s %s: %s", scope["method"], scope["path"], e)
+            logger.error("Traceback: %s", traceback.format_exc())
+            await self._send_json(send_wrapper, 500, _error_body("internal_error", "Internal server error", {"error": str(e)}))
+        finally:
+            self._log_access(scope, origin, user_agent, status_code, started)
+
+    def _log_access(self, scope: Scope, origin: bytes, user_agent: bytes, status_code: int, started: float):
+        # Docker health checks poll /health with curl every few seconds
+        if scope["path"] == "/health" and user_agent.startswith(b"curl"):
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if status_code < 400 and elapsed_ms < self.slow_ms and (
+            self.sample_rate <= 0 or (self.sample_rate < 1 and random.random() >= self.sample_rate)
+        ):
+            return
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        query = scope.get("query_string", b"")
+        logger.info(
+            "%s %s%s %d %.1fms origin=%s",
+            scope["method"],
+            scope["path"],
+            "?" + query.decode("latin-1") if query else "",
+            status_code,
+            elapsed_ms,
+            origin.decode("latin-1") or "-",
+        )
+
+    @staticmethod
+    async def _send_plain(send: Send, status: int, body: bytes):
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"text/plain; charset=utf-8"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    @staticmethod
+    async def _send_json(send: Send, status: int, body: bytes):
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+class ServerTimingMiddleware:
+    """Collect per-request SQL statement count and DB time; report them as a Server-Timing header"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats, token = start_query_stats()
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                # Statements issued while streaming the body come too late for the header
+                timing = f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries"'
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            DB_QUERIES_PER_REQUEST.observe(stats.count, route_template(scope))
+            stop_query_stats(token)
+
@@ -1,6 +1,8 @@
-from sqlalchemy import Column, String, Text, DateTime, Integer, Boolean
+from sqlalchemy import Column, String, Text, Date, DateTime, Integer, Boolean, Index, ForeignKey
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .database import Base
+from datetime import datetime
 import uuid
 
 class FeedbackSubmission(Base):
@@ -49,6 +51,15 @@ class FeedbackSubmission(Base):
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    
+    social_media_posts = relationship(
+        "SocialMediaPost", back_populates="feedback_submission", order_by="SocialMediaPost.id"
+    )
+
+    __table_args__ = (
+        Index("ix_feedback_submissions_created_at_id", "created_at", "id"),
+    )
 
 
 class SocialMediaPost(Base):
@@ -62,7 +73,11 @@ class SocialMediaPost(Base):
     email = Column(String(255), nullable=True)
     
     
-    feedback_submission_id = Column(String(255), nullable=True)
+    feedback_submission_id = Column(
+        String(255), ForeignKey("feedback_submissions.submission_id", name="fk_social_media_posts_feedback_submission_id"),
+        nullable=True,
+        index=True,
+    )
     
     
     social_platform = Column(String(100), nullable=True)  
@@ -92,6 +107,14 @@ class SocialMediaPost(Base):
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now()) 
+    
+    
+    feedback_submission = relationship("FeedbackSubmission", back_populates="social_media_posts")
+
+    __table_args__ = (
+        Index("ix_social_media_posts_created_at_id", "created_at", "id"),
+        Index("ix_social_media_posts_status_created_at_id", "status", "created_at", "id"),
+    )
 
 
 class User(Base):
@@ -104,4 +127,81 @@ class User(Base):
     password = Column(String(255), nullable=False)  # In production, this should be hashed
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+
+class OutboxMessage(Base):
+    """Webhook payload waiting to be delivered by the background dispatcher"""
+    __tablename__ = "outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    destination = Column(String(100), nullable=False)
+    url = Column(Text, nullable=False)
+    payload = Column(Text, nullable=False)
+    
+    
+    feedback_submission_id = Column(String(255), nullable=True)
+    
+    
+    status = Column(String(20), nullable=False, default="pending")  # pending, in_flight, delivered, dead
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
+    last_error = Column(Text)
+    
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+
+class WebhookLog(Base):
+    """One row per outbound webhook delivery attempt"""
+    __tablename__ = "webhook_logs"
+
+    log_id = Column(Integer, primary_key=True)
+    webhook_type = Column(String(100), nullable=False, index=True)
+    payload = Column(Text)
+    response_status = Column(Integer)
+    response_body = Column(Text)
+    
+    
+    outbox_id = Column(Integer, nullable=True, index=True)
+    attempt = Column(Integer, nullable=True)
+    
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+
+class UploadCacheEntry(Base):
+    """Upload server response for a previously uploaded file, keyed by content hash"""
+    __tablename__ = "upload_cache"
+
+    content_hash = Column(String(128), primary_key=True)
+    response_body = Column(Text, nullable=False)
+    size_bytes = Column(Integer)
+    content_type = Column(String(100))
+    hit_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
+    last_accessed_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow, index=True)
+
+
+class LLMPreferenceDaily(Base):
+    """Chosen-LLM counts per creation day, platform and model, maintained by triggers (see app/analytics.py)"""
+    __tablename__ = "llm_preference_daily"
+
+    day = Column(Date, primary_key=True)
+    platform = Column(String(20), primary_key=True)
+    model = Column(String(100), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class CacheGeneration(Base):
+    """Per-key counter of a response cache bumped by triggers on every write the key depends on (see app/cache.py)"""
+    __tablename__ = "cache_generations"
+
+    name = Column(String(50), primary_key=True)
+    cache_key = Column(String(255), primary_key=True)
+    generation = Column(Integer, nullable=False, default=0)
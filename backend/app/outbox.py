@@ -0,0 +1,213 @@
+"""
+Durable outbox for outbound webhooks
+
+Routes write the payload into the ``outbox`` table in the same transaction as
+the rows it describes and return immediately. ``OutboxDispatcher`` runs as a
+background task in every worker, claims due messages with a single atomic
+UPDATE (so two workers never deliver the same message), posts them with
+bounded concurrency and records every attempt in ``webhook_logs``. Failed
+deliveries are retried with exponential backoff and dead-lettered after
+``OUTBOX_MAX_ATTEMPTS``.
+"""
+import asyncio
+import json
+import logging
+import os
+import random
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+import httpx
+from sqlalchemy import select, update
+
+from . import models
+from .http_client import N8N_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+
+OUTBOX_CONCURRENCY = int(os.getenv("OUTBOX_CONCURRENCY", "4"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+OUTBOX_BACKOFF_BASE = float(os.getenv("OUTBOX_BACKOFF_BASE", "2"))
+OUTBOX_BACKOFF_MAX = float(os.getenv("OUTBOX_BACKOFF_MAX", "600"))
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "5"))
+# A claimed message whose worker died becomes due again after the lease expires
+OUTBOX_LEASE_SECONDS = float(os.getenv("OUTBOX_LEASE_SECONDS", "120"))
+
+STATUS_PENDING = "pending"
+STATUS_IN_FLIGHT = "in_flight"
+STATUS_DELIVERED = "delivered"
+STATUS_DEAD = "dead"
+
+MAX_LOGGED_RESPONSE_BODY = 2000
+
+
+def enqueue(db, destination: str, url: str, payload, feedback_submission_id: Optional[str] = None) -> models.OutboxMessage:
+    """Add a message to the outbox; it is sent once the caller's transaction commits"""
+    message = models.OutboxMessage(
+        destination=destination,
+        url=url,
+        payload=json.dumps(payload),
+        feedback_submission_id=feedback_submission_id,
+        status=STATUS_PENDING,
+        attempts=0,
+        next_attempt_at=datetime.utcnow(),
+    )
+    db.add(message)
+    return message
+
+
+def backoff_delay(attempts: int) -> float:
+    """Seconds to wait before the next attempt, with jitter so retries don't align"""
+    delay = min(OUTBOX_BACKOFF_MAX, OUTBOX_BACKOFF_BASE * (2 ** max(attempts - 1, 0)))
+    return delay * random.uniform(0.5, 1.0)
+
+
+class OutboxDispatcher:
+    """Background task that drains the outbox table"""
+
+    def __init__(
+        self,
+        session_factory,
+        client_factory: Callable[[], httpx.AsyncClient],
+        concurrency: int = OUTBOX_CONCURRENCY,
+        max_attempts: int = OUTBOX_MAX_ATTEMPTS,
+        poll_interval: float = OUTBOX_POLL_INTERVAL,
+    ):
+        self._session_factory = session_factory
+        self._client_factory = client_factory
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._stopping = True
+        self._wakeup.set()
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._task, timeout=10)
+            except asyncio.TimeoutError:
+                self._task.cancel()
+
+    def notify(self):
+        """Wake the dispatcher after a commit instead of waiting for the next poll"""
+        self._wakeup.set()
+
+    async def _run(self):
+        logger.info("Outbox dispatcher started (concurrency=%s, max_attempts=%s)", self.concurrency, self.max_attempts)
+        while not self._stopping:
+            try:
+                claimed = await self.drain_once()
+            except Exception as e:
+                logger.error("Outbox dispatcher iteration failed: %s", e)
+                claimed = 0
+            if claimed < self.concurrency:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+        logger.info("Outbox dispatcher stopped")
+
+    async def drain_once(self) -> int:
+        """Claim up to ``concurrency`` due messages and deliver them; returns how many were claimed"""
+        messages = await self._claim_batch()
+        if messages:
+            await asyncio.gather(*(self._deliver(message) for message in messages))
+        return len(messages)
+
+    async def _claim_batch(self):
+        now = datetime.utcnow()
+        outbox = models.OutboxMessage
+        due = (
+            select(outbox.id)
+            .where(
+                outbox.status.in_((STATUS_PENDING, STATUS_IN_FLIGHT)),
+                outbox.next_attempt_at <= now,
+            )
+            .order_by(outbox.next_attempt_at, outbox.id)
+            .limit(self.concurrency)
+        )
+        claim = (
+            update(outbox)
+            .where(
+                outbox.id.in_(due),
+                outbox.status.in_((STATUS_PENDING, STATUS_IN_FLIGHT)),
+                outbox.next_attempt_at <= now,
+            )
+            .values(
+                status=STATUS_IN_FLIGHT,
+                attempts=outbox.attempts + 1,
+                next_attempt_at=now + timedelta(seconds=OUTBOX_LEASE_SECONDS),
+                updated_at=now,
+            )
+            .returning(outbox.id, outbox.destination, outbox.url, outbox.payload, outbox.attempts)
+            .execution_options(synchronize_session=False)
+        )
+        async with self._session_factory() as db:
+            result = await db.execute(claim)
+            messages = result.all()
+            await db.commit()
+        return messages
+
+    async def _deliver(self, message):
+        response_status = None
+        response_body = None
+        error = None
+        try:
+            response = await self._client_factory().post(
+                message.url,
+                content=message.payload,
+                headers={"Content-Type": "application/json"},
+                timeout=N8N_TIMEOUT,
+            )
+            response_status = response.status_code
+            response_body = response.text[:MAX_LOGGED_RESPONSE_BODY]
+            if not response.is_success:
+                error = f"HTTP {response.status_code}"
+        except httpx.HTTPError as e:
+            error = f"{type(e).__name__}: {str(e)}"
+
+        now = datetime.utcnow()
+        if error is None:
+            values = {"status": STATUS_DELIVERED, "last_error": None}
+            logger.info("Delivered outbox message %s to %s (attempt %s)", message.id, message.destination, message.attempts)
+        elif message.attempts >= self.max_attempts:
+            values = {"status": STATUS_DEAD, "last_error": error}
+            logger.error("Dead-lettered outbox message %s after %s attempts: %s", message.id, message.attempts, error)
+        else:
+            delay = backoff_delay(message.attempts)
+            values = {
+                "status": STATUS_PENDING,
+                "last_error": error,
+                "next_attempt_at": now + timedelta(seconds=delay),
+            }
+            logger.warning("Outbox message %s attempt %s failed (%s), retrying in %.1fs", message.id, message.attempts, error, delay)
+
+        async with self._session_factory() as db:
+            db.add(models.WebhookLog(
+                webhook_type=message.destination,
+                response_status=response_status,
+                response_body=response_body if error is None else (response_body or error),
+                outbox_id=message.id,
+                attempt=message.attempts,
+            ))
+            await db.execute(
+                update(models.OutboxMessage)
+                .where(models.OutboxMessage.id == message.id)
+                .values(updated_at=now, **values)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+
+
+def notify_dispatcher(app):
+    dispatcher = getattr(app.state, "outbox_dispatcher", None)
+    if dispatcher is not None:
+        dispatcher.notify()
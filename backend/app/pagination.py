@@ -0,0 +1,82 @@
+"""
+Keyset (cursor) pagination for list endpoints
+
+``offset(skip)`` makes SQLite walk and discard ``skip`` rows, so deep pages get
+linearly slower. Lists are instead ordered by ``(created_at, id)`` and a page
+continues from the last row of the previous one, seeking into a composite
+``(created_at, id)`` index.
+
+SQLite (3.40) only seeks on the first column of ``(created_at, id) > (?, ?)``
+when ``id`` is the rowid, so rows sharing the cursor's timestamp (a bulk
+insert lands in the same second) would be scanned. The page is fetched as
+``created_at = ? AND id > ?`` followed, if still short, by ``created_at > ?``;
+both are pure index range seeks.
+
+The cursor handed to clients is opaque: URL-safe base64 of ``[created_at, id]``.
+``skip`` still works for existing clients and uses the same ordering.
+"""
+import base64
+import json
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy.dialects import sqlite
+from sqlalchemy import literal
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# created_at is filled by CURRENT_TIMESTAMP, which SQLite stores as text without
+# fractional seconds; bind cursor values in that format so equal timestamps
+# compare equal (the default DATETIME binding appends ".000000")
+_CURRENT_TIMESTAMP = sqlite.DATETIME(
+    storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"
+)
+
+
+def timestamp_param(value: datetime):
+    """Bind a datetime for comparison with a CURRENT_TIMESTAMP column (UTC, whole seconds)"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return literal(value, type_=_CURRENT_TIMESTAMP)
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor was not produced by ``encode_cursor``"""
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}") from e
+
+
+def paginate(query, model, limit: int, cursor: Optional[str] = None, skip: int = 0) -> Tuple[List, Optional[str]]:
+    """Return one page of ``query`` and the cursor for the next page (None on the last page)
+
+    ``model`` must have ``created_at`` and ``id`` columns. With a cursor ``skip``
+    is ignored.
+    """
+    query = query.order_by(model.created_at, model.id)
+    # One extra row tells whether another page exists without a COUNT
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        created_at = timestamp_param(created_at)
+        rows = query.filter(model.created_at == created_at, model.id > row_id).limit(limit + 1).all()
+        if len(rows) <= limit:
+            rows += query.filter(model.created_at > created_at).limit(limit + 1 - len(rows)).all()
+    else:
+        rows = query.offset(skip or None).limit(limit + 1).all()
+
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last.created_at, last.id)
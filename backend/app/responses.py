@@ -0,0 +1,32 @@
+"""
+JSON responses rendered with orjson
+
+``ORJSONResponse`` is the application's default response class, so every
+route's JSON is rendered by orjson instead of ``json.dumps``. Routes with a
+``response_model`` still go through FastAPI's validate + ``jsonable_encoder``
+step first. The hot list routes skip that step: they build their response
+models once and return ``models_response`` / ``model_response``, which dump
+the models and hand the result (datetimes included) straight to orjson.
+"""
+from typing import Dict, Iterable, Optional
+
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+
+def model_response(item: BaseModel, headers: Optional[Dict[str, str]] = None) -> ORJSONResponse:
+    """JSON object of an already validated model, serialized once"""
+    return ORJSONResponse(item.model_dump(), headers=headers)
+
+
+def models_response(
+    items: Iterable[BaseModel],
+    exclude_unset: bool = False,
+    headers: Optional[Dict[str, str]] = None,
+) -> ORJSONResponse:
+    """JSON array of already validated models, serialized once
+
+    Returning a Response bypasses the route's ``response_model`` and the
+    headers set on an injected ``Response``, so pass those in ``headers``.
+    """
+    return ORJSONResponse([item.model_dump(exclude_unset=exclude_unset) for item in items], headers=headers)
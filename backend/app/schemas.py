@@ -1,6 +1,16 @@
-from pydantic import BaseModel, validator
-from typing import Optional
-from datetime import datetime
+from pydantic import BaseModel, ConfigDict, PlainSerializer, model_validator
+from typing import Annotated, Any, Dict, List, Optional
+from datetime import date, datetime
+
+# Response timestamps are rendered with isoformat() in JSON
+IsoDatetime = Annotated[datetime, PlainSerializer(lambda value: value.isoformat(), return_type=str, when_used="json")]
+
+# (label, fields) per platform; at most one field of each group may be filled in
+EXCLUSIVE_FEEDBACK_GROUPS = (
+    ("LinkedIn", ("linkedin_feedback", "linkedin_chosen_llm", "linkedin_custom_content")),
+    ("X/Twitter", ("x_feedback", "x_chosen_llm", "x_custom_content")),
+    ("image", ("image_feedback", "linkedin_image_llm", "twitter_image_llm")),
+)
 
 class FeedbackSubmissionBase(BaseModel):
     n8n_execution_id: Optional[str] = None
@@ -37,44 +47,21 @@ class FeedbackSubmissionBase(BaseModel):
     linkedin_image_llm: Optional[str] = None
     twitter_image_llm: Optional[str] = None
 
-    @validator('linkedin_feedback', 'linkedin_chosen_llm', 'linkedin_custom_content', pre=True, always=True)
-    def validate_linkedin_feedback_methods(cls, v, values):
-        """Ensure only one LinkedIn feedback method is selected"""
-        feedback_fields = [
-            values.get('linkedin_feedback'),
-            values.get('linkedin_chosen_llm'),
-            values.get('linkedin_custom_content')
-        ]
-        filled_fields = [field for field in feedback_fields if field and str(field).strip()]
-        if len(filled_fields) > 1:
-            raise ValueError('Only one LinkedIn feedback method can be selected at a time')
-        return v
-
-    @validator('x_feedback', 'x_chosen_llm', 'x_custom_content', pre=True, always=True)
-    def validate_x_feedback_methods(cls, v, values):
-        """Ensure only one X/Twitter feedback method is selected"""
-        feedback_fields = [
-            values.get('x_feedback'),
-            values.get('x_chosen_llm'),
-            values.get('x_custom_content')
-        ]
-        filled_fields = [field for field in feedback_fields if field and str(field).strip()]
-        if len(filled_fields) > 1:
-            raise ValueError('Only one X/Twitter feedback method can be selected at a time')
-        return v
-
-    @validator('image_feedback', 'linkedin_image_llm', 'twitter_image_llm', pre=True, always=True)
-    def validate_image_feedback_methods(cls, v, values):
-        """Ensure only one image feedback method is selected"""
-        feedback_fields = [
-            values.get('image_feedback'),
-            values.get('linkedin_image_llm'),
-            values.get('twitter_image_llm')
-        ]
-        filled_fields = [field for field in feedback_fields if field and str(field).strip()]
-        if len(filled_fields) > 1:
-            raise ValueError('Only one image feedback method can be selected at a time')
-        return v
+    @model_validator(mode="after")
+    def validate_feedback_methods(self):
+        """Ensure only one feedback method is selected per platform (LinkedIn, X/Twitter, image)"""
+        conflicts = []
+        for label, fields in EXCLUSIVE_FEEDBACK_GROUPS:
+            filled = 0
+            for field in fields:
+                value = getattr(self, field)
+                if value and value.strip():
+                    filled += 1
+            if filled > 1:
+                conflicts.append(f"Only one {label} feedback method can be selected at a time")
+        if conflicts:
+            raise ValueError("; ".join(conflicts))
+        return self
 
 class FeedbackSubmissionCreate(FeedbackSubmissionBase):
     pass
@@ -86,6 +73,27 @@ class FeedbackSubmissionCreateResponse(BaseModel):
     feedback_form_link: str
     message: str
 
+class FeedbackBulkItemResult(BaseModel):
+    index: int
+    status_code: int
+    submission_id: Optional[str] = None
+    feedback_form_link: Optional[str] = None
+    errors: Optional[List[Dict[str, Any]]] = None
+
+class FeedbackBulkCreateResponse(BaseModel):
+    status_code: int
+    created: int
+    failed: int
+    results: List[FeedbackBulkItemResult]
+    message: str
+
+class FeedbackBatchGetRequest(BaseModel):
+    submission_ids: List[str]
+
+class FeedbackBatchGetResponse(BaseModel):
+    results: List["FeedbackSubmissionResponse"]
+    missing: List[str]
+
 class FeedbackSubmissionUpdate(BaseModel):
     n8n_execution_id: Optional[str] = None
     email: Optional[str] = None
@@ -127,8 +135,8 @@ class FeedbackSubmissionResponse(BaseModel):
     submission_id: Optional[str] = None
     n8n_execution_id: Optional[str] = None
     email: Optional[str] = None
-    created_at: Optional[datetime] = None
-    updated_at: Optional[datetime] = None
+    created_at: Optional[IsoDatetime] = None
+    updated_at: Optional[IsoDatetime] = None
     
     
     linkedin_grok_content: Optional[str] = None
@@ -161,16 +169,45 @@ class FeedbackSubmissionResponse(BaseModel):
     linkedin_image_llm: Optional[str] = None
     twitter_image_llm: Optional[str] = None
 
-    class Config:
-        from_attributes = True
-        
-        extra = "ignore"
-        
-        json_encoders = {
-            datetime: lambda v: v.isoformat() if v else None
-        }
+    model_config = ConfigDict(from_attributes=True, extra="ignore")
 
 
+FeedbackBatchGetResponse.model_rebuild()
+
+
+class FeedbackSearchResult(BaseModel):
+    submission_id: str
+    email: Optional[str] = None
+    n8n_execution_id: Optional[str] = None
+    created_at: Optional[datetime] = None
+    score: float
+    snippet: str
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class LLMPreferenceDay(BaseModel):
+    day: date
+    platform: str
+    model: str
+    count: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class LLMPreferenceTotal(BaseModel):
+    platform: str
+    model: str
+    count: int
+    share: float
+
+
+class LLMPreferencesResponse(BaseModel):
+    start: Optional[date] = None
+    end: Optional[date] = None
+    totals: List[LLMPreferenceTotal]
+    daily: Optional[List[LLMPreferenceDay]] = None
+
 
 class SocialMediaPostBase(BaseModel):
     content_creator: Optional[str] = None
@@ -233,17 +270,10 @@ class SocialMediaPostResponse(BaseModel):
     ai_image_style: Optional[str] = None
     ai_image_description: Optional[str] = None
     status: Optional[str] = "pending"
-    created_at: Optional[datetime] = None
-    updated_at: Optional[datetime] = None
+    created_at: Optional[IsoDatetime] = None
+    updated_at: Optional[IsoDatetime] = None
 
-    class Config:
-        from_attributes = True
-        
-        extra = "ignore"
-        
-        json_encoders = {
-            datetime: lambda v: v.isoformat() if v else None
-        } 
+    model_config = ConfigDict(from_attributes=True, extra="ignore")
 
 
 # User schemas
@@ -267,8 +297,7 @@ class UserResponse(UserBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class UserLogin(BaseModel):
     username: str
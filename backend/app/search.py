@@ -0,0 +1,236 @@
+"""
+Full-text search over generated content and feedback with SQLite FTS5
+
+``feedback_search`` holds one document per feedback submission (rowid =
+``feedback_submissions.id``) with four columns: all LinkedIn drafts, all X
+drafts, the three feedback fields, and the ``ai_prompt`` of linked social
+media posts. Triggers on both tables keep it in sync, so writers never touch
+it directly.
+
+The table and triggers are created by migration 010 and, for databases built
+with ``create_all``, by a metadata ``after_create`` hook. To reindex existing
+rows (e.g. after restoring a backup taken without the triggers):
+
+    python -m app.search rebuild
+"""
+import html
+import logging
+import re
+import sys
+from typing import List
+
+from sqlalchemy import DateTime, Float, String, Text, event, text
+from sqlalchemy.sql import column
+
+from . import models, schemas
+from .database import engine
+
+logger = logging.getLogger(__name__)
+
+
+SEARCH_TABLE = "feedback_search"
+SNIPPET_TOKENS = 16
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_END = "</mark>"
+# snippet() copies stored content verbatim, so it marks matches with private-use
+# characters; the text is HTML-escaped first and the markers swapped for <mark> after
+_MATCH_START = "\ue000"
+_MATCH_END = "\ue001"
+
+DOCUMENT_COLUMNS = {
+    "linkedin": ("linkedin_grok_content", "linkedin_o3_content", "linkedin_gemini_content", "linkedin_custom_content"),
+    "x": ("x_grok_content", "x_o3_content", "x_gemini_content", "x_custom_content"),
+    "feedback": ("linkedin_feedback", "x_feedback", "image_feedback"),
+}
+INDEXED_FEEDBACK_COLUMNS = ("submission_id",) + tuple(name for names in DOCUMENT_COLUMNS.values() for name in names)
+
+
+def _joined(row: str, names) -> str:
+    # Newline-separated non-NULL values; concat_ws() needs SQLite 3.44
+    parts = " || ".join(f"coalesce({row}.{name} || char(10), '')" for name in names)
+    return f"rtrim({parts}, char(10))"
+
+
+def _ai_prompts(submission_id: str) -> str:
+    return (
+        "(SELECT group_concat(ai_prompt, char(10)) FROM social_media_posts "
+        f"WHERE feedback_submission_id = {submission_id})"
+    )
+
+
+def _document(row: str) -> str:
+    """Column values of the search document for the feedback row alias ``row``"""
+    return ", ".join(
+        [f"{row}.id", f"{row}.submission_id"]
+        + [_joined(row, names) for names in DOCUMENT_COLUMNS.values()]
+        + [_ai_prompts(f"{row}.submission_id")]
+    )
+
+
+def _refresh_prompts(row: str) -> str:
+    return (
+        f"UPDATE {SEARCH_TABLE} SET ai_prompt = {_ai_prompts(f'{row}.feedback_submission_id')} "
+        f"WHERE rowid = (SELECT id FROM feedback_submissions WHERE submission_id = {row}.feedback_submission_id);"
+    )
+
+
+_INSERT = f"INSERT INTO {SEARCH_TABLE}(rowid, submission_id, linkedin, x, feedback, ai_prompt)"
+
+SEARCH_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+        submission_id UNINDEXED, linkedin, x, feedback, ai_prompt,
+        tokenize = 'porter unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS feedback_search_after_insert AFTER INSERT ON feedback_submissions BEGIN
+        {_INSERT} VALUES ({_document('new')});
+    END""",
+    # updated_at and the *_chosen_llm columns change far more often than the text
+    f"""CREATE TRIGGER IF NOT EXISTS feedback_search_after_update
+    AFTER UPDATE OF {', '.join(INDEXED_FEEDBACK_COLUMNS)} ON feedback_submissions BEGIN
+        DELETE FROM {SEARCH_TABLE} WHERE rowid = old.id;
+        {_INSERT} VALUES ({_document('new')});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS feedback_search_after_delete AFTER DELETE ON feedback_submissions BEGIN
+        DELETE FROM {SEARCH_TABLE} WHERE rowid = old.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS post_search_after_insert AFTER INSERT ON social_media_posts
+    WHEN new.feedback_submission_id IS NOT NULL AND new.ai_prompt IS NOT NULL BEGIN
+        {_refresh_prompts('new')}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS post_search_after_update
+    AFTER UPDATE OF ai_prompt, feedback_submission_id ON social_media_posts BEGIN
+        {_refresh_prompts('old')}
+        {_refresh_prompts('new')}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS post_search_after_delete AFTER DELETE ON social_media_posts
+    WHEN old.feedback_submission_id IS NOT NULL AND old.ai_prompt IS NOT NULL BEGIN
+        {_refresh_prompts('old')}
+    END""",
+]
+
+SEARCH_DROP = [
+    "DROP TRIGGER IF EXISTS post_search_after_delete",
+    "DROP TRIGGER IF EXISTS post_search_after_update",
+    "DROP TRIGGER IF EXISTS post_search_after_insert",
+    "DROP TRIGGER IF EXISTS feedback_search_after_delete",
+    "DROP TRIGGER IF EXISTS feedback_search_after_update",
+    "DROP TRIGGER IF EXISTS feedback_search_after_insert",
+    f"DROP TABLE IF EXISTS {SEARCH_TABLE}",
+]
+
+SEARCH_QUERY = text(f"""
+    SELECT f.submission_id, f.email, f.n8n_execution_id, f.created_at,
+           -{SEARCH_TABLE}.rank AS score,
+           snippet({SEARCH_TABLE}, -1, :highlight_start, :highlight_end, '…', {SNIPPET_TOKENS}) AS snippet
+    FROM {SEARCH_TABLE}
+    JOIN feedback_submissions AS f ON f.id = {SEARCH_TABLE}.rowid
+    WHERE {SEARCH_TABLE} MATCH :query
+    ORDER BY {SEARCH_TABLE}.rank
+    LIMIT :limit OFFSET :offset
+""").columns(
+    column("submission_id", String),
+    column("email", String),
+    column("n8n_execution_id", String),
+    column("created_at", DateTime),
+    column("score", Float),
+    column("snippet", Text),
+)
+
+_TERM_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def to_match_query(q: str) -> str:
+    """Turn user input into an FTS5 query that cannot be a syntax error
+
+    ``"exact phrase"`` stays a phrase, a trailing ``*`` is a prefix search and
+    every other word is quoted, so operators and punctuation are matched as text.
+    All terms must match.
+    """
+    terms = []
+    for phrase, word in _TERM_RE.findall(q):
+        term = phrase if phrase else word
+        prefix = not phrase and term.endswith("*") and len(term) > 1
+        term = term.rstrip("*") if prefix else term
+        if term.strip():
+            terms.append('"' + term.replace('"', '""') + '"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+def search_exists(connection) -> bool:
+    return connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": SEARCH_TABLE}
+    ).first() is not None
+
+
+def create_search_index(connection) -> bool:
+    """Create the FTS table and triggers if missing; returns True when the table was created"""
+    created = not search_exists(connection)
+    for statement in SEARCH_DDL:
+        connection.execute(text(statement))
+    return created
+
+
+def drop_search_index(connection):
+    for statement in SEARCH_DROP:
+        connection.execute(text(statement))
+
+
+def rebuild_search_index(connection) -> int:
+    """Reindex every feedback submission and merge the index segments"""
+    connection.execute(text(f"DELETE FROM {SEARCH_TABLE}"))
+    connection.execute(text(f"{_INSERT} SELECT {_document('f')} FROM feedback_submissions AS f"))
+    connection.execute(text(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')"))
+    indexed = connection.execute(text(f"SELECT count(*) FROM {SEARCH_TABLE}")).scalar()
+    logger.info("Rebuilt %s with %s feedback submissions", SEARCH_TABLE, indexed)
+    return indexed
+
+
+def highlight_snippet(snippet: str) -> str:
+    """HTML-escape a raw snippet and turn its match markers into ``<mark>`` tags"""
+    escaped = html.escape(snippet)
+    return escaped.replace(_MATCH_START, HIGHLIGHT_START).replace(_MATCH_END, HIGHLIGHT_END)
+
+
+def search_feedback(db, q: str, limit: int = 20, offset: int = 0) -> List[schemas.FeedbackSearchResult]:
+    """Best bm25 matches first (``score`` is the negated rank, higher is better) with a highlighted snippet
+
+    The snippet is safe to render as HTML: stored content is escaped and only
+    the ``<mark>`` tags around matches are markup.
+    """
+    match = to_match_query(q)
+    if not match:
+        return []
+    rows = db.execute(SEARCH_QUERY, {
+        "query": match,
+        "limit": limit,
+        "offset": offset,
+        "highlight_start": _MATCH_START,
+        "highlight_end": _MATCH_END,
+    }).all()
+    return [
+        schemas.FeedbackSearchResult.model_validate({**row._mapping, "snippet": highlight_snippet(row.snippet or "")})
+        for row in rows
+    ]
+
+
+@event.listens_for(models.Base.metadata, "after_create")
+def _create_search_index_after_create_all(target, connection, **kwargs):
+    if connection.dialect.name != "sqlite":
+        return
+    if create_search_index(connection):
+        rebuild_search_index(connection)
+
+
+def main(argv: List[str]) -> int:
+    if argv[1:] != ["rebuild"]:
+        print("usage: python -m app.search rebuild", file=sys.stderr)
+        return 2
+    with engine.begin() as connection:
+        create_search_index(connection)
+        indexed = rebuild_search_index(connection)
+    print(f"Indexed {indexed} feedback submissions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,199 @@
+"""
+Streaming proxy for /api/upload-image
+
+Starlette has already spooled the incoming file to a SpooledTemporaryFile, so
+instead of ``await file.read()`` into one bytes object we re-encode it as a
+multipart body chunk by chunk and let httpx send it with chunked transfer
+encoding. Memory per upload stays at roughly one chunk.
+
+Identical files are deduplicated through ``upload_cache``: the spooled file is
+hashed with BLAKE2b before anything is sent, and a hit returns the upload
+server's original response without the upstream round trip.
+"""
+import hashlib
+import json
+import logging
+import os
+import secrets
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from fastapi import UploadFile
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from . import models
+
+logger = logging.getLogger(__name__)
+
+
+UPLOAD_SERVER_URL = os.getenv("UPLOAD_SERVER_URL", "http://165.227.123.243:8000/upload")
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(20 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(64 * 1024)))
+
+UPLOAD_CACHE_ENABLED = os.getenv("UPLOAD_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+UPLOAD_CACHE_MAX_ENTRIES = int(os.getenv("UPLOAD_CACHE_MAX_ENTRIES", "5000"))
+UPLOAD_CACHE_TTL_SECONDS = int(os.getenv("UPLOAD_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+
+
+class UploadTooLarge(Exception):
+    """Raised while streaming once the file exceeds the configured limit"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        super().__init__(f"Upload exceeds the maximum size of {max_bytes} bytes")
+
+
+def _quote_header_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', "%22").replace("\r", "%0D").replace("\n", "%0A")
+
+
+class MultipartFileStream:
+    """Async iterable producing a multipart/form-data body with a single file field"""
+
+    def __init__(
+        self,
+        file: UploadFile,
+        field_name: str = "files",
+        max_bytes: int = UPLOAD_MAX_BYTES,
+        chunk_size: int = UPLOAD_CHUNK_SIZE,
+    ):
+        self.file = file
+        self.field_name = field_name
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.boundary = secrets.token_hex(16)
+        self.bytes_read = 0
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def _part_header(self) -> bytes:
+        filename = _quote_header_value(self.file.filename or "upload")
+        content_type = self.file.content_type or "application/octet-stream"
+        return (
+            f"--{self.boundary}\r\n"
+            f'Content-Disposition: form-data; name="{self.field_name}"; filename="{filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode("utf-8")
+
+    async def __aiter__(self):
+        yield self._part_header()
+        while True:
+            chunk = await self.file.read(self.chunk_size)
+            if not chunk:
+                break
+            self.bytes_read += len(chunk)
+            if self.bytes_read > self.max_bytes:
+                raise UploadTooLarge(self.max_bytes)
+            yield chunk
+        yield f"\r\n--{self.boundary}--\r\n".encode("utf-8")
+
+
+async def hash_upload(file: UploadFile, max_bytes: int = UPLOAD_MAX_BYTES, chunk_size: int = UPLOAD_CHUNK_SIZE) -> Tuple[str, int]:
+    """Hash the spooled file in chunks (enforcing the size limit) and rewind it"""
+    digest = hashlib.blake2b(digest_size=32)
+    size = 0
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_bytes:
+            raise UploadTooLarge(max_bytes)
+        digest.update(chunk)
+    await file.seek(0)
+    return digest.hexdigest(), size
+
+
+class UploadCache:
+    """SQLite-backed content hash -> upload response index with LRU and TTL eviction
+
+    Hit/miss counters are per worker; the entries themselves are shared.
+    Cache errors are logged and treated as misses so uploads never fail because of them.
+    """
+
+    def __init__(self, max_entries: int = UPLOAD_CACHE_MAX_ENTRIES, ttl_seconds: int = UPLOAD_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, db, content_hash: str) -> Optional[dict]:
+        try:
+            entry = await db.get(models.UploadCacheEntry, content_hash)
+            now = datetime.utcnow()
+            if entry is not None and entry.created_at + self.ttl < now:
+                await db.delete(entry)
+                await db.commit()
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            entry.hit_count += 1
+            entry.last_accessed_at = now
+            result = json.loads(entry.response_body)
+            await db.commit()
+        except SQLAlchemyError as e:
+            logger.warning("Upload cache lookup failed for %s: %s", content_hash, e)
+            await db.rollback()
+            self.misses += 1
+            return None
+        self.hits += 1
+        return result
+
+    async def put(self, db, content_hash: str, result, size_bytes: int, content_type: Optional[str]):
+        try:
+            now = datetime.utcnow()
+            await db.merge(models.UploadCacheEntry(
+                content_hash=content_hash,
+                response_body=json.dumps(result),
+                size_bytes=size_bytes,
+                content_type=content_type,
+                hit_count=0,
+                created_at=now,
+                last_accessed_at=now,
+            ))
+            await db.commit()
+            await self.evict(db)
+        except SQLAlchemyError as e:
+            logger.warning("Upload cache store failed for %s: %s", content_hash, e)
+            await db.rollback()
+
+    async def evict(self, db) -> int:
+        """Drop expired entries, then the least recently used ones above ``max_entries``"""
+        entry = models.UploadCacheEntry
+        removed = (await db.execute(
+            delete(entry).where(entry.created_at < datetime.utcnow() - self.ttl)
+        )).rowcount
+        count = (await db.execute(select(func.count()).select_from(entry))).scalar()
+        if count > self.max_entries:
+            oldest = select(entry.content_hash).order_by(entry.last_accessed_at).limit(count - self.max_entries)
+            removed += (await db.execute(delete(entry).where(entry.content_hash.in_(oldest)))).rowcount
+        await db.commit()
+        return removed
+
+    async def purge(self, db, content_hash: Optional[str] = None) -> int:
+        statement = delete(models.UploadCacheEntry)
+        if content_hash:
+            statement = statement.where(models.UploadCacheEntry.content_hash == content_hash)
+        removed = (await db.execute(statement)).rowcount
+        await db.commit()
+        return removed
+
+    async def stats(self, db) -> dict:
+        entries = (await db.execute(select(func.count()).select_from(models.UploadCacheEntry))).scalar()
+        lookups = self.hits + self.misses
+        return {
+            "enabled": UPLOAD_CACHE_ENABLED,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_seconds": int(self.ttl.total_seconds()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else None,
+        }
+
+
+upload_cache = UploadCache()
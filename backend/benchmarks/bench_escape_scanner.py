@@ -0,0 +1,97 @@
+"""
+Escape-sequence counting over LLM-sized text fields
+
+Compares the previous per-pattern implementation of log_escape_characters /
+validate_and_log_json_content (8 re.search + 8 re.findall, then 7 str.count
++ 1 re.findall) against ``count_escapes`` on generated 10-50KB bodies that
+look like JSON-escaped LLM output.
+
+Run from backend/:  python -m benchmarks.bench_escape_scanner [iterations]
+"""
+import random
+import re
+import sys
+import time
+
+from app.escape_scanner import count_escapes
+
+ESCAPE_PATTERNS = {
+    'newlines': r'\\n',
+    'tabs': r'\\t',
+    'carriage_returns': r'\\r',
+    'backspaces': r'\\b',
+    'form_feeds': r'\\f',
+    'quotes': r'\\"',
+    'backslashes': r'\\\\',
+    'unicode': r'\\u[0-9a-fA-F]{4}'
+}
+
+WORDS = ("engagement", "audience", "content", "strategy", "LinkedIn", "post", "growth", "brand",
+         "story", "insight", "founder", "launch", "community", "creator", "weekly", "results")
+# Mostly prose; paragraph breaks, bullets, quotes, dashes and emoji as escapes
+DECORATIONS = (" ",) * 24 + (", ", ". ", ". ", "\\n\\n", "\\n- ", " \\\"", "\\\" ", " \\u2014 ", " \\ud83d\\ude80", "\\t")
+
+
+def make_body(size: int, seed: int) -> str:
+    rng = random.Random(seed)
+    parts = []
+    length = 0
+    while length < size:
+        piece = rng.choice(WORDS) + rng.choice(DECORATIONS)
+        parts.append(piece)
+        length += len(piece)
+    return "".join(parts)
+
+
+def legacy_log_escape_characters(value: str):
+    found = []
+    for name, pattern in ESCAPE_PATTERNS.items():
+        if re.search(pattern, value):
+            found.append(f"{name}: {len(re.findall(pattern, value))}")
+    return found
+
+
+def legacy_validate_counts(value: str):
+    return {
+        'newlines': value.count('\\n'),
+        'tabs': value.count('\\t'),
+        'carriage_returns': value.count('\\r'),
+        'backspaces': value.count('\\b'),
+        'form_feeds': value.count('\\f'),
+        'quotes': value.count('\\"'),
+        'backslashes': value.count('\\\\'),
+        'unicode': len(re.findall(r'\\u[0-9a-fA-F]{4}', value))
+    }
+
+
+def legacy(value: str):
+    legacy_log_escape_characters(value)
+    legacy_validate_counts(value)
+
+
+def new(value: str):
+    # The scan now runs once per helper call, i.e. twice per field like before
+    count_escapes(value)
+    count_escapes(value)
+
+
+def timed(func, bodies, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        for body in bodies:
+            func(body)
+    return (time.perf_counter() - started) / (iterations * len(bodies)) * 1e6
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    for size in (10_000, 25_000, 50_000):
+        bodies = [make_body(size, seed) for seed in range(10)]
+        before = timed(legacy, bodies, iterations)
+        after = timed(new, bodies, iterations)
+        print(f"{size // 1000:3d}KB field: legacy {before:8.1f} us   single pass {after:8.1f} us   ({before / after:.1f}x)")
+    print("With INFO disabled both helpers return before scanning: ~0 us")
+
+
+if __name__ == "__main__":
+    main()
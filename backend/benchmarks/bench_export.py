@@ -0,0 +1,80 @@
+"""
+Peak memory of the streaming export vs paging through ORM objects
+
+For growing table sizes, measures (with tracemalloc) the peak Python memory of
+draining ``stream_export`` and of the previous approach: loading every
+submission as an ORM object with its posts and serializing the list.
+
+Run from backend/:  python -m benchmarks.bench_export
+"""
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import selectinload, sessionmaker
+
+from app.database import Base
+from app.export import export_statement, stream_export
+from app.models import FeedbackSubmission
+
+CONTENT = "Generated LinkedIn post body. " * 40
+
+
+def populate(session, start: int, stop: int):
+    session.execute(insert(FeedbackSubmission), [
+        {
+            "submission_id": f"s{i}",
+            "email": f"creator{i % 50}@example.com",
+            "linkedin_grok_content": CONTENT,
+            "linkedin_o3_content": CONTENT,
+            "x_grok_content": CONTENT[:280],
+        }
+        for i in range(start, stop)
+    ])
+    session.commit()
+
+
+def load_all(session_factory):
+    with session_factory() as db:
+        rows = db.query(FeedbackSubmission).options(selectinload(FeedbackSubmission.social_media_posts)).all()
+        return json.dumps([{column.name: getattr(row, column.name) for column in FeedbackSubmission.__table__.columns} for row in rows], default=str)
+
+
+def stream_all(session_factory):
+    size = 0
+    for chunk in stream_export(session_factory, export_statement(), fmt="ndjson"):
+        size += len(chunk)
+    return size
+
+
+def measure(func, session_factory):
+    tracemalloc.start()
+    started = time.perf_counter()
+    func(session_factory)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024 / 1024, elapsed
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.sqlite')}")
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine)
+        rows = 0
+        for target in (5_000, 20_000, 50_000):
+            with session_factory() as session:
+                populate(session, rows, target)
+            rows = target
+            load_mb, load_s = measure(load_all, session_factory)
+            stream_mb, stream_s = measure(stream_all, session_factory)
+            print(f"{rows:>6} rows: load all {load_mb:7.1f} MB peak {load_s:5.2f} s   stream {stream_mb:5.1f} MB peak {stream_s:5.2f} s")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+GET /api/feedback?limit=100: response_model + json.dumps vs models_response + orjson
+
+Fills a throwaway SQLite database with submissions carrying realistic drafts
+(nine LLM content fields of 1-3 KB each) and times:
+
+* serialization only: the 100 built response models through FastAPI's
+  ``serialize_response`` (re-validation against ``response_model`` +
+  ``jsonable_encoder``) and ``JSONResponse``, versus ``models_response``;
+* the whole request: the real route versus a replica of the previous one
+  (same query and builder, returning the model list through ``response_model``).
+
+Run from backend/:  python -m benchmarks.bench_json_responses [repeats]
+"""
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+from typing import List
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp.name, 'bench.sqlite')}"
+
+from fastapi import Depends, FastAPI  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.main import app  # noqa: E402  (first: app.api modules import from app.main)
+from app import models, schemas  # noqa: E402
+from app.api.feedback import build_feedback_response  # noqa: E402
+from app.database import Base, SessionLocal, engine, get_db  # noqa: E402
+from app.pagination import paginate  # noqa: E402
+from app.responses import models_response  # noqa: E402
+
+ROWS = 100
+PARAGRAPH = "We doubled weekly active teams by shipping the feedback loop our customers asked for. "
+CONTENT_FIELDS = [
+    "linkedin_grok_content", "linkedin_o3_content", "linkedin_gemini_content",
+    "x_grok_content", "x_o3_content", "x_gemini_content",
+    "linkedin_feedback", "x_feedback", "image_feedback",
+]
+
+
+def populate(db: Session):
+    db.execute(insert(models.FeedbackSubmission), [
+        {
+            "submission_id": f"s{i}",
+            "email": f"creator{i % 10}@example.com",
+            "linkedin_chosen_llm": "Grok",
+            **{field: PARAGRAPH * (12 + (i + n) % 25) for n, field in enumerate(CONTENT_FIELDS)},
+        }
+        for i in range(ROWS)
+    ])
+    db.commit()
+
+
+def legacy_app() -> FastAPI:
+    """The list route as it was: build models, let response_model re-validate them, json.dumps"""
+    legacy = FastAPI()
+
+    @legacy.get("/api/feedback", response_model=List[schemas.FeedbackSubmissionResponse], response_model_exclude_unset=True)
+    def get_all_feedback_submissions(limit: int = 100, db: Session = Depends(get_db)):
+        rows, _ = paginate(db.query(models.FeedbackSubmission), models.FeedbackSubmission, limit)
+        return [build_feedback_response(row, row.social_media_posts[0] if row.social_media_posts else None) for row in rows]
+
+    return legacy
+
+
+def timed(func, repeats: int) -> float:
+    func()
+    started = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - started) / repeats * 1000
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    logging.disable(logging.INFO)
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        populate(db)
+        rows, _ = paginate(db.query(models.FeedbackSubmission), models.FeedbackSubmission, ROWS)
+        built = [build_feedback_response(row, row.social_media_posts[0] if row.social_media_posts else None) for row in rows]
+
+    field = create_response_field(name="Response", type_=List[schemas.FeedbackSubmissionResponse])
+
+    def legacy_serialize():
+        content = asyncio.run(serialize_response(field=field, response_content=built, exclude_unset=True, is_coroutine=False))
+        return JSONResponse(content).body
+
+    def fast_serialize():
+        return models_response(built, exclude_unset=True).body
+
+    assert len(legacy_serialize()) > 100_000
+    legacy_ms = timed(legacy_serialize, repeats)
+    fast_ms = timed(fast_serialize, repeats)
+    print(f"serialize {ROWS} rows ({len(fast_serialize()) / 1024:.0f} KB): "
+          f"response_model + json.dumps {legacy_ms:6.2f} ms   models_response + orjson {fast_ms:6.2f} ms   ({legacy_ms / fast_ms:.1f}x)")
+
+    headers = {"Accept-Encoding": "identity"}
+    with TestClient(legacy_app()) as legacy_client, TestClient(app) as client:
+        assert legacy_client.get("/api/feedback?limit=100", headers=headers).json() == client.get("/api/feedback?limit=100", headers=headers).json()
+        legacy_ms = timed(lambda: legacy_client.get("/api/feedback?limit=100", headers=headers), repeats)
+        fast_ms = timed(lambda: client.get("/api/feedback?limit=100", headers=headers), repeats)
+    print(f"GET /api/feedback?limit=100 end to end:      previous {legacy_ms:6.2f} ms   current {fast_ms:6.2f} ms   ({legacy_ms / fast_ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
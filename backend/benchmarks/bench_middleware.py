@@ -0,0 +1,149 @@
+"""
+Per-request overhead of the middleware stack
+
+Compares the previous CORSMiddleware + three ``@app.middleware("http")`` layers
+against ``CORSLoggingMiddleware`` by driving a trivial route through the ASGI
+interface directly (no sockets, no TestClient), so the difference is the
+middleware cost alone.
+
+Run from backend/:  python -m benchmarks.bench_middleware [requests]
+"""
+import asyncio
+import json
+import logging
+import sys
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+
+from app.middleware import CORSLoggingMiddleware
+
+ORIGINS = ["http://localhost:3000", "http://104.131.8.230:3000", "http://127.0.0.1:3000", "http://0.0.0.0:3000"]
+FRONTEND_URL = "http://104.131.8.230:3000"
+
+logger = logging.getLogger("bench")
+
+
+def add_route(app: FastAPI):
+    @app.get("/api/ping")
+    async def ping():
+        return {"ok": True}
+
+
+def build_legacy_app() -> FastAPI:
+    """Replica of the stack in app/main.py before it was replaced"""
+    app = FastAPI()
+    add_route(app)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=ORIGINS,
+        allow_credentials=True,
+        allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
+        allow_headers=["*"],
+        expose_headers=["*"],
+        max_age=3600,
+    )
+
+    @app.middleware("http")
+    async def force_cors_headers(request: Request, call_next):
+        response = await call_next(request)
+        origin = request.headers.get("origin")
+        response.headers["Access-Control-Allow-Origin"] = origin if origin in ORIGINS else FRONTEND_URL
+        response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, OPTIONS, PATCH"
+        response.headers["Access-Control-Allow-Headers"] = "*"
+        response.headers["Access-Control-Allow-Credentials"] = "true"
+        response.headers["Access-Control-Max-Age"] = "3600"
+        logger.info(f"Force CORS: Setting headers for origin '{origin}'")
+        return response
+
+    @app.middleware("http")
+    async def log_requests(request: Request, call_next):
+        logger.info(f"Incoming request: {request.method} {request.url}")
+        logger.info(f"Origin header: {request.headers.get('origin', 'None')}")
+        logger.info(f"User-Agent: {request.headers.get('user-agent', 'None')}")
+        response = await call_next(request)
+        logger.info(f"Response status: {response.status_code}")
+        for header in ("Access-Control-Allow-Origin", "Access-Control-Allow-Methods", "Access-Control-Allow-Headers",
+                       "Access-Control-Allow-Credentials", "Access-Control-Max-Age"):
+            value = response.headers.get(header)
+            if value:
+                logger.info(f"  {header}: {value}")
+        return response
+
+    @app.middleware("http")
+    async def json_error_handler(request: Request, call_next):
+        try:
+            return await call_next(request)
+        except json.JSONDecodeError as e:
+            return JSONResponse(status_code=400, content={"detail": str(e)})
+
+    return app
+
+
+def build_new_app() -> FastAPI:
+    app = FastAPI()
+    add_route(app)
+    app.add_middleware(CORSLoggingMiddleware, allow_origins=ORIGINS, fallback_origin=FRONTEND_URL)
+    return app
+
+
+async def drive(app, requests: int) -> float:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/api/ping",
+        "raw_path": b"/api/ping",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench"), (b"origin", ORIGINS[0].encode()), (b"user-agent", b"bench")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+    }
+
+    async def one_request():
+        response_complete = asyncio.Event()
+        request_sent = False
+
+        async def receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            # Like a real server, report the disconnect only once the response is done
+            await response_complete.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                response_complete.set()
+
+        await app(dict(scope), receive, send)
+
+    for _ in range(200):
+        await one_request()
+    started = time.perf_counter()
+    for _ in range(requests):
+        await one_request()
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    # INFO is what production runs with, so the logging cost is part of the comparison
+    logging.basicConfig(level=logging.INFO, stream=open("/dev/null", "w"))
+
+    legacy = asyncio.run(drive(build_legacy_app(), requests))
+    new = asyncio.run(drive(build_new_app(), requests))
+    print(f"{requests} requests per stack")
+    print(f"legacy stack : {legacy:8.1f} us/request")
+    print(f"pure ASGI    : {new:8.1f} us/request")
+    print(f"saved        : {legacy - new:8.1f} us/request ({(1 - new / legacy) * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
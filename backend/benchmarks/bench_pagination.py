@@ -0,0 +1,76 @@
+"""
+Deep-page latency: offset vs keyset pagination
+
+Fills a throwaway SQLite database with social media posts and times fetching a
+100-row page at increasing depths, once with ``skip`` and once by following
+the cursor of the previous page (the cursor for each depth is taken from a
+prior walk, so only the page query itself is timed).
+
+Run from backend/:  python -m benchmarks.bench_pagination [rows]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import SocialMediaPost
+from app.pagination import paginate
+
+PAGE_SIZE = 100
+REPEATS = 20
+
+
+def populate(session, rows: int):
+    batch = 10_000
+    for start in range(0, rows, batch):
+        session.execute(insert(SocialMediaPost), [
+            {
+                "post_id": f"post-{i}",
+                "content_creator": f"creator-{i % 50}",
+                "status": "pending" if i % 3 else "posted",
+                "linkedin_post_content": "x" * 400,
+            }
+            for i in range(start, min(start + batch, rows))
+        ])
+        session.commit()
+
+
+def timed(func) -> float:
+    started = time.perf_counter()
+    for _ in range(REPEATS):
+        func()
+    return (time.perf_counter() - started) / REPEATS * 1000
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.sqlite')}")
+        Base.metadata.create_all(bind=engine)
+        session = sessionmaker(bind=engine)()
+        populate(session, rows)
+
+        depths = [d for d in (0, 1_000, 10_000, 50_000, rows - PAGE_SIZE) if d < rows]
+        cursors = {}
+        cursor = None
+        for skip in range(0, rows, PAGE_SIZE):
+            cursors[skip] = cursor
+            _, cursor = paginate(session.query(SocialMediaPost.id, SocialMediaPost.created_at), SocialMediaPost, PAGE_SIZE, cursor=cursor)
+
+        print(f"{rows} rows, {PAGE_SIZE} per page")
+        for depth in depths:
+            query = session.query(SocialMediaPost)
+            offset_ms = timed(lambda: paginate(query, SocialMediaPost, PAGE_SIZE, skip=depth))
+            keyset_ms = timed(lambda: paginate(query, SocialMediaPost, PAGE_SIZE, cursor=cursors[depth]))
+            session.expunge_all()
+            print(f"row {depth:>7}: offset {offset_ms:8.2f} ms   cursor {keyset_ms:6.2f} ms")
+        session.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
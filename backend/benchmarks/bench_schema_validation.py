@@ -0,0 +1,123 @@
+"""
+Validation throughput of the feedback schemas: v1-style validators vs one model_validator
+
+Times two workloads against replicas of the schemas as they were (three
+``@validator(..., pre=True, always=True)`` methods, each re-reading its whole
+group for every field, and ``class Config`` with ``json_encoders``) and the
+current ones (one ``model_validator(mode="after")`` pass, ``ConfigDict``):
+
+* bulk: ``FeedbackSubmissionCreate`` from request dicts, as ``/api/feedback/bulk``
+  does for every item;
+* list: a page of ``FeedbackSubmissionResponse`` from ORM-like objects through
+  one ``TypeAdapter`` with ``from_attributes``, as ``build_feedback_responses``
+  does.
+
+Needs no database. Run from backend/:  python -m benchmarks.bench_schema_validation [rows]
+"""
+import sys
+import time
+import warnings
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import List, Optional
+
+from pydantic import BaseModel, TypeAdapter, create_model, validator
+
+from app import schemas
+
+REPEATS = 20
+DRAFT = "We doubled weekly active teams by shipping the feedback loop our customers asked for. " * 12
+
+
+def legacy_group_validator(group_fields, message):
+    def check(cls, v, values):
+        filled_fields = [field for field in (values.get(name) for name in group_fields) if field and str(field).strip()]
+        if len(filled_fields) > 1:
+            raise ValueError(message)
+        return v
+    return validator(*group_fields, pre=True, always=True, allow_reuse=True)(check)
+
+
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore")
+    LegacyCreate = create_model(
+        "LegacyCreate",
+        __base__=BaseModel,
+        __validators__={
+            f"validate_{label}": legacy_group_validator(fields, f"Only one {label} feedback method can be selected at a time")
+            for label, fields in schemas.EXCLUSIVE_FEEDBACK_GROUPS
+        },
+        **{name: (Optional[str], None) for name in schemas.FeedbackSubmissionCreate.model_fields},
+    )
+
+    class LegacyConfigBase(BaseModel):
+        class Config:
+            from_attributes = True
+            extra = "ignore"
+            json_encoders = {datetime: lambda v: v.isoformat() if v else None}
+
+    LegacyResponse = create_model(
+        "LegacyResponse",
+        __base__=LegacyConfigBase,
+        **{name: (field.annotation, None) for name, field in schemas.FeedbackSubmissionResponse.model_fields.items()},
+    )
+
+
+def bulk_items(rows: int) -> List[dict]:
+    return [
+        {
+            "n8n_execution_id": f"exec-{i}",
+            "email": f"creator{i % 10}@example.com",
+            "linkedin_grok_content": DRAFT,
+            "x_o3_content": DRAFT[:280],
+            "linkedin_chosen_llm": "Grok" if i % 2 else None,
+            "linkedin_feedback": None if i % 2 else "Make it shorter",
+            "x_custom_content": "My own tweet",
+            "twitter_image_llm": "o3",
+        }
+        for i in range(rows)
+    ]
+
+
+def orm_rows(rows: int) -> List[SimpleNamespace]:
+    fields = dict.fromkeys(schemas.FeedbackSubmissionResponse.model_fields)
+    created = datetime(2026, 10, 1, tzinfo=timezone.utc)
+    return [
+        SimpleNamespace(**{**fields, "id": i, "submission_id": f"s{i}", "created_at": created, "linkedin_grok_content": DRAFT})
+        for i in range(rows)
+    ]
+
+
+def throughput(func, rows: int) -> float:
+    func()
+    started = time.perf_counter()
+    for _ in range(REPEATS):
+        func()
+    return rows * REPEATS / (time.perf_counter() - started)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    items = bulk_items(rows)
+    page = orm_rows(rows)
+    legacy_page = TypeAdapter(List[LegacyResponse])
+    current_page = TypeAdapter(List[schemas.FeedbackSubmissionResponse])
+
+    assert [LegacyCreate(**item).model_dump() for item in items] == [schemas.FeedbackSubmissionCreate(**item).model_dump() for item in items]
+    assert [item.model_dump() for item in legacy_page.validate_python(page, from_attributes=True)] == \
+        [item.model_dump() for item in current_page.validate_python(page, from_attributes=True)]
+
+    workloads = (
+        ("bulk create", lambda: [LegacyCreate(**item) for item in items], lambda: [schemas.FeedbackSubmissionCreate(**item) for item in items]),
+        ("list response", lambda: legacy_page.validate_python(page, from_attributes=True),
+         lambda: current_page.validate_python(page, from_attributes=True)),
+    )
+    for name, legacy, current in workloads:
+        legacy_rate = throughput(legacy, rows)
+        current_rate = throughput(current, rows)
+        print(f"{name:<14} {rows} rows: previous {legacy_rate:10,.0f} rows/s   "
+              f"current {current_rate:10,.0f} rows/s   ({current_rate / legacy_rate:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
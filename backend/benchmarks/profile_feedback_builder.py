@@ -0,0 +1,102 @@
+"""
+CPU per row of building feedback responses: per-row dict + constructor + response_model vs one TypeAdapter pass
+
+Loads 500 submissions with linked posts from a throwaway SQLite database and
+times, per row, the previous path (``getattr`` every field into a dict, build
+``FeedbackSubmissionResponse`` from it, then FastAPI re-validating the list
+against ``response_model``) against ``build_feedback_responses`` (one
+``from_attributes`` validation of the whole page, then ``model_copy`` with
+the linked post's image URLs). With ``--profile`` the top functions of each path are
+printed from cProfile.
+
+Run from backend/:  python -m benchmarks.profile_feedback_builder [--profile]
+"""
+import asyncio
+import cProfile
+import logging
+import os
+import pstats
+import sys
+import tempfile
+import time
+from typing import List
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp.name, 'bench.sqlite')}"
+
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+from sqlalchemy.orm import selectinload  # noqa: E402
+
+from app.main import app  # noqa: E402,F401  (first: app.api modules import from app.main)
+from app import models, schemas  # noqa: E402
+from app.api.feedback import build_feedback_responses, first_post  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+
+ROWS = 500
+REPEATS = 20
+CONTENT = "Generated LinkedIn post body. " * 60
+
+
+def legacy_build(feedback, social_media_post) -> schemas.FeedbackSubmissionResponse:
+    """The builder as it was before this change"""
+    response_data = {}
+    for field in schemas.FeedbackSubmissionResponse.model_fields:
+        response_data[field] = getattr(feedback, field, None)
+    if social_media_post is not None:
+        response_data["image_url"] = social_media_post.image_url
+        response_data["uploaded_image_url"] = social_media_post.uploaded_image_url
+    else:
+        response_data["image_url"] = None
+        response_data["uploaded_image_url"] = None
+    return schemas.FeedbackSubmissionResponse(**response_data)
+
+
+def populate(db):
+    db.execute(insert(models.FeedbackSubmission), [
+        {"submission_id": f"s{i}", "email": "creator@example.com", "linkedin_grok_content": CONTENT, "x_o3_content": CONTENT[:280]}
+        for i in range(ROWS)
+    ])
+    db.execute(insert(models.SocialMediaPost), [
+        {"post_id": f"p{i}", "feedback_submission_id": f"s{i}", "image_url": f"https://example.com/{i}.png"}
+        for i in range(0, ROWS, 2)
+    ])
+    db.commit()
+
+
+def main():
+    logging.disable(logging.INFO)
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        populate(db)
+        feedbacks = db.query(models.FeedbackSubmission).options(selectinload(models.FeedbackSubmission.social_media_posts)).all()
+        posts = [first_post(feedback) for feedback in feedbacks]
+
+        field = create_response_field(name="Response", type_=List[schemas.FeedbackSubmissionResponse])
+
+        def legacy():
+            built = [legacy_build(feedback, post) for feedback, post in zip(feedbacks, posts)]
+            return asyncio.run(serialize_response(field=field, response_content=built, is_coroutine=False))
+
+        def current():
+            return build_feedback_responses(feedbacks, posts)
+
+        assert [item.model_dump() for item in current()] == [schemas.FeedbackSubmissionResponse(**item).model_dump() for item in legacy()]
+
+        for name, func in (("dict + constructor + response_model", legacy), ("build_feedback_responses", current)):
+            func()
+            started = time.process_time()
+            for _ in range(REPEATS):
+                func()
+            per_row = (time.process_time() - started) / REPEATS / ROWS * 1e6
+            print(f"{name:<36} {per_row:6.1f} us CPU per row")
+
+            if "--profile" in sys.argv:
+                profiler = cProfile.Profile()
+                profiler.runcall(func)
+                pstats.Stats(profiler).sort_stats("tottime").print_stats(8)
+
+
+if __name__ == "__main__":
+    main()
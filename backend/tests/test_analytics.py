@@ -0,0 +1,99 @@
+from datetime import date, datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.analytics import backfill_llm_preferences, llm_preferences, summarize
+from app.database import Base
+from app.models import FeedbackSubmission, LLMPreferenceDaily
+
+
+engine = create_engine(
+    "sqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# app.analytics hooks create_all to build the rollup triggers
+Base.metadata.create_all(bind=engine)
+
+
+class TestLLMPreferenceRollup:
+    """Test cases for the trigger-maintained llm_preference_daily rollup"""
+
+    def setup_method(self):
+        """Setup method to insert submissions over two days"""
+        self.db = TestingSessionLocal()
+        self.db.query(FeedbackSubmission).delete()
+        self.db.query(LLMPreferenceDaily).delete()
+        self.db.add_all([
+            FeedbackSubmission(submission_id="a", linkedin_chosen_llm="Grok", x_chosen_llm="o3",
+                               created_at=datetime(2026, 10, 1, 9)),
+            FeedbackSubmission(submission_id="b", linkedin_chosen_llm="Grok", x_chosen_llm="",
+                               created_at=datetime(2026, 10, 1, 17)),
+            FeedbackSubmission(submission_id="c", linkedin_chosen_llm="Gemini", image_chosen_llm="Stable Diffusion",
+                               created_at=datetime(2026, 10, 2, 8)),
+        ])
+        self.db.commit()
+
+    def teardown_method(self):
+        """Teardown method to close database connection"""
+        self.db.close()
+
+    def counts(self):
+        return {(row.day, row.platform, row.model): row.count for row in llm_preferences(self.db)}
+
+    def test_insert_counts_choices(self):
+        """Test that inserts count non-empty choices per day and platform"""
+        assert self.counts() == {
+            (date(2026, 10, 1), "linkedin", "Grok"): 2,
+            (date(2026, 10, 1), "x", "o3"): 1,
+            (date(2026, 10, 2), "image", "Stable Diffusion"): 1,
+            (date(2026, 10, 2), "linkedin", "Gemini"): 1,
+        }
+
+    def test_update_moves_count(self):
+        """Test that a changed choice moves one count and drops empty rows"""
+        feedback = self.db.query(FeedbackSubmission).filter_by(submission_id="c").one()
+        feedback.linkedin_chosen_llm = "Grok"
+        feedback.image_chosen_llm = None
+        self.db.commit()
+        counts = self.counts()
+        assert counts[(date(2026, 10, 2), "linkedin", "Grok")] == 1
+        assert (date(2026, 10, 2), "linkedin", "Gemini") not in counts
+        assert (date(2026, 10, 2), "image", "Stable Diffusion") not in counts
+        assert counts[(date(2026, 10, 1), "linkedin", "Grok")] == 2
+
+    def test_unrelated_update_and_delete(self):
+        """Test that other column updates leave counts alone and deletes remove them"""
+        feedback = self.db.query(FeedbackSubmission).filter_by(submission_id="a").one()
+        feedback.linkedin_feedback = "Shorter please"
+        self.db.commit()
+        assert self.counts()[(date(2026, 10, 1), "linkedin", "Grok")] == 2
+
+        self.db.delete(feedback)
+        self.db.commit()
+        counts = self.counts()
+        assert counts[(date(2026, 10, 1), "linkedin", "Grok")] == 1
+        assert (date(2026, 10, 1), "x", "o3") not in counts
+
+    def test_backfill_matches_triggers(self):
+        """Test that a full recompute equals the incrementally maintained rollup"""
+        feedback = self.db.query(FeedbackSubmission).filter_by(submission_id="b").one()
+        feedback.x_chosen_llm = "Grok"
+        self.db.commit()
+        incremental = self.counts()
+        with engine.begin() as connection:
+            assert backfill_llm_preferences(connection) == len(incremental)
+        assert self.counts() == incremental
+
+    def test_range_and_summary(self):
+        """Test date-range filtering and per-platform shares"""
+        rows = llm_preferences(self.db, start=date(2026, 10, 1), end=date(2026, 10, 1), platform="linkedin")
+        assert [(row.model, row.count) for row in rows] == [("Grok", 2)]
+
+        totals = summarize(llm_preferences(self.db, platform="linkedin"))
+        assert [(total["model"], total["count"]) for total in totals] == [("Grok", 2), ("Gemini", 1)]
+        assert abs(totals[0]["share"] - 2 / 3) < 1e-9
@@ -0,0 +1,136 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.cache import ResponseCache, read_generation
+from app.database import Base
+from app.models import CacheGeneration, FeedbackSubmission, SocialMediaPost
+
+
+engine = create_engine(
+    "sqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# app.cache hooks create_all to build the generation triggers
+Base.metadata.create_all(bind=engine)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestResponseCache:
+    """Test cases for the LRU + TTL response cache"""
+
+    def setup_method(self):
+        """Setup method to create a small cache with a controllable clock"""
+        self.clock = FakeClock()
+        self.cache = ResponseCache("test", max_entries=2, ttl_seconds=10, clock=self.clock)
+
+    def test_hit_and_miss(self):
+        """Test that stored bytes are served and counted"""
+        assert self.cache.get("a", 0) is None
+        self.cache.set("a", b"{}", 0)
+        assert self.cache.get("a", 0) == b"{}"
+        stats = self.cache.stats()
+        assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (1, 1, 0.5)
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry goes first"""
+        self.cache.set("a", b"a", 0)
+        self.cache.set("b", b"b", 0)
+        self.cache.get("a", 0)
+        self.cache.set("c", b"c", 0)
+        assert self.cache.get("b", 0) is None
+        assert self.cache.get("a", 0) == b"a"
+        assert self.cache.get("c", 0) == b"c"
+
+    def test_ttl_expiry(self):
+        """Test that entries expire after the TTL"""
+        self.cache.set("a", b"a", 0)
+        self.clock.now = 9.9
+        assert self.cache.get("a", 0) == b"a"
+        self.clock.now = 10
+        assert self.cache.get("a", 0) is None
+        assert self.cache.stats()["entries"] == 0
+
+    def test_invalidate_and_generation(self):
+        """Test explicit invalidation and that a new generation drops only its own key"""
+        self.cache.set("a", b"a", 0)
+        self.cache.set("b", b"b", 0)
+        self.cache.invalidate("a")
+        assert self.cache.get("a", 0) is None
+        assert self.cache.get("b", 1) is None
+        self.cache.set("a", b"a", 3)
+        self.cache.set("b", b"b", 1)
+        assert self.cache.get("b", 2) is None
+        assert self.cache.get("a", 3) == b"a"
+
+    def test_stale_generation_is_not_served(self):
+        """Test that an entry built before another worker's write is dropped"""
+        self.cache.set("a", b"stale", 0)
+        assert self.cache.get("a", 1) is None
+        assert self.cache.stats()["entries"] == 0
+
+    def test_disabled(self):
+        """Test that a cache without capacity stores nothing"""
+        cache = ResponseCache("off", max_entries=0, ttl_seconds=10)
+        cache.set("a", b"a", 0)
+        assert not cache.enabled
+        assert cache.get("a", 0) is None
+
+
+class TestGenerationTriggers:
+    """Test cases for the triggers bumping per-submission feedback generations"""
+
+    def setup_method(self):
+        """Setup method to insert two submissions"""
+        self.db = TestingSessionLocal()
+        self.db.query(SocialMediaPost).delete()
+        self.db.query(FeedbackSubmission).delete()
+        self.db.add_all([FeedbackSubmission(submission_id="s1"), FeedbackSubmission(submission_id="s3")])
+        self.db.commit()
+
+    def teardown_method(self):
+        """Teardown method to close database connection"""
+        self.db.close()
+
+    def test_writes_bump_generation(self):
+        """Test that feedback updates and post writes move the counter of their submission only"""
+        generation = read_generation(self.db, "feedback", "s1")
+        other = read_generation(self.db, "feedback", "s3")
+
+        feedback = self.db.query(FeedbackSubmission).filter_by(submission_id="s1").one()
+        feedback.linkedin_feedback = "Shorter"
+        self.db.commit()
+        assert read_generation(self.db, "feedback", "s1") == generation + 1
+
+        self.db.add(SocialMediaPost(post_id="p1", feedback_submission_id="s1"))
+        self.db.commit()
+        assert read_generation(self.db, "feedback", "s1") == generation + 2
+        assert read_generation(self.db, "feedback", "s3") == other
+
+    def test_moving_a_post_bumps_both_submissions(self):
+        """Test that relinking a post invalidates the old and the new submission"""
+        self.db.add(SocialMediaPost(post_id="p1", feedback_submission_id="s1"))
+        self.db.commit()
+        before = read_generation(self.db, "feedback", "s1"), read_generation(self.db, "feedback", "s3")
+        post = self.db.query(SocialMediaPost).filter_by(post_id="p1").one()
+        post.feedback_submission_id = "s3"
+        self.db.commit()
+        assert (read_generation(self.db, "feedback", "s1"), read_generation(self.db, "feedback", "s3")) == (before[0] + 1, before[1] + 1)
+
+    def test_new_submissions_do_not_bump_generation(self):
+        """Test that inserting feedback or an unlinked post leaves cached responses alone"""
+        self.db.add(FeedbackSubmission(submission_id="s2"))
+        self.db.add(SocialMediaPost(post_id="p2"))
+        self.db.commit()
+        assert read_generation(self.db, "feedback", "s2") == 0
+        assert self.db.query(CacheGeneration).filter(CacheGeneration.cache_key.is_(None)).count() == 0
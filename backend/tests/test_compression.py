@@ -0,0 +1,156 @@
+import gzip
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app import compression
+from app.compression import CompressionMiddleware, compress_bytes, negotiate, precompressed_response
+
+
+BIG = "feedback " * 500
+
+app = FastAPI()
+app.add_middleware(CompressionMiddleware, min_bytes=1024)
+variants = {}
+
+
+@app.get("/big")
+def big():
+    return PlainTextResponse(BIG)
+
+
+@app.get("/small")
+def small():
+    return PlainTextResponse("ok")
+
+
+@app.get("/binary")
+def binary():
+    return Response(b"\x89PNG" * 1000, media_type="image/png")
+
+
+@app.get("/encoded")
+def encoded():
+    return Response(gzip.compress(BIG.encode()), media_type="text/plain", headers={"Content-Encoding": "gzip"})
+
+
+@app.get("/stream")
+def stream():
+    return StreamingResponse((f'{{"line": {i}}}\n' for i in range(100)), media_type="application/x-ndjson")
+
+
+@app.get("/export")
+def export():
+    return StreamingResponse((f"{i},row\n" for i in range(500)), media_type="text/csv", headers={"Vary": "Accept-Encoding"})
+
+
+@app.get("/cached")
+def cached(request: Request):
+    return precompressed_response(request, BIG.encode(), variants, media_type="text/plain")
+
+
+client = TestClient(app)
+
+
+class TestNegotiate:
+    """Test cases for Accept-Encoding negotiation"""
+
+    def test_gzip_and_quality(self):
+        """Test that q=0 refuses a coding and identity-only clients get None"""
+        assert negotiate("gzip, deflate") == "gzip"
+        assert negotiate("gzip;q=0, deflate") is None
+        assert negotiate("identity") is None
+        assert negotiate("") is None
+
+    def test_wildcard(self):
+        """Test that * accepts the server's preferred coding"""
+        assert negotiate("*") is not None
+        assert negotiate("*;q=0") is None
+
+    def test_round_trip(self):
+        """Test that gzip output decompresses to the input"""
+        assert gzip.decompress(compress_bytes(BIG.encode(), "gzip")) == BIG.encode()
+
+
+class TestCompressionMiddleware:
+    """Test cases for the compression middleware"""
+
+    def test_large_body_is_compressed(self):
+        """Test that a large text body is gzipped with a matching Content-Length"""
+        response = client.get("/big", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert int(response.headers["content-length"]) == response.num_bytes_downloaded < len(BIG)
+        assert response.text == BIG
+        assert "Accept-Encoding" in response.headers["vary"]
+
+    def test_small_and_binary_bodies_are_not(self):
+        """Test the size threshold and that non-text types pass through"""
+        response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+        assert response.text == "ok"
+        assert "content-encoding" not in client.get("/binary", headers={"Accept-Encoding": "gzip"}).headers
+
+    def test_already_encoded_passes_through(self):
+        """Test that a response with its own Content-Encoding is not compressed twice"""
+        response = client.get("/encoded", headers={"Accept-Encoding": "gzip"})
+        assert response.text == BIG
+
+    def test_streaming(self):
+        """Test that a streamed body is compressed without a Content-Length"""
+        response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert response.text.splitlines()[99] == '{"line": 99}'
+
+    def test_route_vary_is_not_repeated(self):
+        """Test that a stream whose route sets Vary honours q=0 and carries one Vary header"""
+        response = client.get("/export", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers.get_list("vary") == ["Accept-Encoding"]
+        refused = client.get("/export", headers={"Accept-Encoding": "gzip;q=0"})
+        assert "content-encoding" not in refused.headers
+        assert refused.text.splitlines()[499] == "499,row"
+
+    def test_no_accept_encoding(self):
+        """Test that clients without Accept-Encoding get identity, still varying on the header"""
+        response = client.get("/big", headers={"Accept-Encoding": ""})
+        assert "content-encoding" not in response.headers
+        assert response.num_bytes_downloaded == len(BIG)
+        assert response.headers.get_list("vary") == ["Accept-Encoding"]
+        refused = client.get("/export", headers={"Accept-Encoding": "gzip;q=0"})
+        assert refused.headers.get_list("vary") == ["Accept-Encoding"]
+        assert "vary" not in client.get("/binary", headers={"Accept-Encoding": ""}).headers
+
+
+class TestPrecompressedResponse:
+    """Test cases for compressed variants stored next to cached bodies"""
+
+    def test_variant_is_reused(self):
+        """Test that the compressed copy is built once and then served from the cache entry"""
+        variants.clear()
+        first = client.get("/cached", headers={"Accept-Encoding": "gzip"})
+        assert first.headers["content-encoding"] == "gzip"
+        stored = variants["gzip"]
+        second = client.get("/cached", headers={"Accept-Encoding": "gzip"})
+        assert variants["gzip"] is stored
+        assert second.text == first.text == BIG
+        assert "content-encoding" not in client.get("/cached", headers={"Accept-Encoding": "identity"}).headers
+
+    def test_concurrent_requests_compress_once(self, monkeypatch):
+        """Test that requests racing on a missing variant share one compression"""
+        calls = []
+
+        def slow_compress(data, encoding):
+            calls.append(encoding)
+            time.sleep(0.05)
+            return compress_bytes(data, encoding)
+
+        monkeypatch.setattr(compression, "compress_bytes", slow_compress)
+        variants.clear()
+        with ThreadPoolExecutor(4) as pool:
+            responses = list(pool.map(lambda _: client.get("/cached", headers={"Accept-Encoding": "gzip"}), range(4)))
+        assert calls == ["gzip"]
+        assert all(response.text == BIG for response in responses)
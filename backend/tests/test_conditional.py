@@ -0,0 +1,139 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from starlette.requests import Request
+
+from app.conditional import (
+    claim_version,
+    feedback_version_from_row,
+    feedback_version_statement,
+    if_match_failed,
+    is_not_modified,
+    not_modified_response,
+    post_version_from_row,
+    post_version_statement,
+    validator_headers,
+    version_of,
+)
+from app.database import Base
+from app.models import FeedbackSubmission, SocialMediaPost
+
+
+engine = create_engine(
+    "sqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+Base.metadata.create_all(bind=engine)
+
+
+def make_request(**headers):
+    raw = [(name.replace("_", "-").lower().encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "headers": raw})
+
+
+class TestValidators:
+    """Test cases for ETag and Last-Modified matching"""
+
+    def setup_method(self):
+        """Setup method to compute the version of one row"""
+        self.row = SocialMediaPost(id=7, created_at=datetime(2026, 10, 1, 9), updated_at=datetime(2026, 10, 2, 9, 30, 0, 250000))
+        self.etag, self.last_modified = version_of(self.row)
+
+    def test_etag_follows_updated_at(self):
+        """Test that the ETag is weak and changes with updated_at"""
+        assert self.etag.startswith('W/"')
+        self.row.updated_at += timedelta(microseconds=1)
+        assert version_of(self.row)[0] != self.etag
+        assert validator_headers(self.etag, self.last_modified)["Last-Modified"] == "Fri, 02 Oct 2026 09:30:00 GMT"
+
+    def test_not_modified_varies_like_the_full_response(self):
+        """Test that a 304 carries the validators and Vary: Accept-Encoding"""
+        response = not_modified_response(self.etag, self.last_modified)
+        assert response.status_code == 304
+        assert response.headers["etag"] == self.etag
+        assert response.headers["vary"] == "Accept-Encoding"
+
+    def test_if_none_match(self):
+        """Test weak comparison, lists and the wildcard"""
+        assert is_not_modified(make_request(if_none_match=self.etag), self.etag, self.last_modified)
+        assert is_not_modified(make_request(if_none_match=f'"other", {self.etag[2:]}'), self.etag, self.last_modified)
+        assert is_not_modified(make_request(if_none_match="*"), self.etag, self.last_modified)
+        assert not is_not_modified(make_request(if_none_match='W/"other"'), self.etag, self.last_modified)
+
+    def test_if_modified_since(self):
+        """Test second-resolution dates, and that If-None-Match takes precedence"""
+        assert is_not_modified(make_request(if_modified_since="Fri, 02 Oct 2026 09:30:00 GMT"), self.etag, self.last_modified)
+        assert not is_not_modified(make_request(if_modified_since="Fri, 02 Oct 2026 09:29:59 GMT"), self.etag, self.last_modified)
+        assert not is_not_modified(make_request(if_modified_since="yesterday"), self.etag, self.last_modified)
+        request = make_request(if_none_match='W/"other"', if_modified_since="Fri, 02 Oct 2026 09:30:00 GMT")
+        assert not is_not_modified(request, self.etag, self.last_modified)
+
+    def test_if_match(self):
+        """Test that If-Match fails only when present and different"""
+        assert not if_match_failed(make_request(), self.etag)
+        assert not if_match_failed(make_request(if_match=self.etag), self.etag)
+        assert not if_match_failed(make_request(if_match="*"), self.etag)
+        assert if_match_failed(make_request(if_match='W/"stale"'), self.etag)
+        assert if_match_failed(make_request(if_match="*"), None)
+
+
+class TestVersionQueries:
+    """Test cases for the version-only queries"""
+
+    def setup_method(self):
+        """Setup method to insert a submission with two linked posts"""
+        self.db = TestingSessionLocal()
+        self.db.query(SocialMediaPost).delete()
+        self.db.query(FeedbackSubmission).delete()
+        self.db.add(FeedbackSubmission(submission_id="s1"))
+        self.db.add_all([
+            SocialMediaPost(post_id="p1", feedback_submission_id="s1"),
+            SocialMediaPost(post_id="p2", feedback_submission_id="s1"),
+        ])
+        self.db.commit()
+
+    def teardown_method(self):
+        """Teardown method to close database connection"""
+        self.db.close()
+
+    def test_matches_loaded_rows(self):
+        """Test that version queries agree with the versions of the loaded rows"""
+        feedback = self.db.query(FeedbackSubmission).filter_by(submission_id="s1").one()
+        first_post = self.db.query(SocialMediaPost).filter_by(post_id="p1").one()
+        assert feedback_version_from_row(self.db.execute(feedback_version_statement("s1")).first()) == version_of(feedback, first_post)
+        assert post_version_from_row(self.db.execute(post_version_statement("p1")).first()) == version_of(first_post)
+        assert feedback_version_from_row(self.db.execute(feedback_version_statement("missing")).first()) is None
+
+    def test_post_update_changes_feedback_etag(self):
+        """Test that the feedback ETag covers its first linked post"""
+        before = feedback_version_from_row(self.db.execute(feedback_version_statement("s1")).first())
+        post = self.db.query(SocialMediaPost).filter_by(post_id="p1").one()
+        post.image_url = "https://example.com/new.png"
+        post.updated_at = datetime.utcnow()
+        self.db.commit()
+        after = feedback_version_from_row(self.db.execute(feedback_version_statement("s1")).first())
+        assert after[0] != before[0]
+
+    def test_claim_succeeds_once_per_version(self):
+        """Test that a second write checked against the same version matches no row"""
+        checked = self.db.execute(post_version_statement("p1")).first()
+        assert self.db.execute(claim_version(SocialMediaPost, checked, datetime.utcnow())).rowcount == 1
+        self.db.commit()
+        assert self.db.execute(claim_version(SocialMediaPost, checked, datetime.utcnow())).rowcount == 0
+        self.db.rollback()
+        current = self.db.execute(post_version_statement("p1")).first()
+        assert self.db.execute(claim_version(SocialMediaPost, current, datetime.utcnow())).rowcount == 1
+        self.db.commit()
+
+    def test_claim_matches_timestamps_written_by_sql(self):
+        """Test that a CURRENT_TIMESTAMP value without microseconds is claimed verbatim"""
+        self.db.execute(text("UPDATE feedback_submissions SET updated_at = CURRENT_TIMESTAMP WHERE submission_id = 's1'"))
+        self.db.commit()
+        checked = self.db.execute(feedback_version_statement("s1")).first()
+        assert self.db.execute(claim_version(FeedbackSubmission, checked, datetime.utcnow())).rowcount == 1
+        self.db.commit()
@@ -0,0 +1,179 @@
+import asyncio
+import pytest
+from sqlalchemy import text
+
+from app import database
+from app.database import (
+    _create_engine, _create_async_engine, current_query_stats, describe_parameters,
+    get_sqlite_pragmas, pragma_choice, pragma_int, start_query_stats, stop_query_stats, to_async_url,
+)
+
+
+class TestSQLitePragmas:
+    """Test cases for the per-connection SQLite configuration"""
+    
+    def setup_method(self):
+        """Setup method to create a file-backed engine (WAL needs a real file)"""
+        self.engine = None
+    
+    def teardown_method(self):
+        """Teardown method to dispose of the engine"""
+        if self.engine is not None:
+            self.engine.dispose()
+    
+    def test_pragmas_applied_on_connect(self, tmp_path):
+        """Test that every new connection is switched to WAL with the tuned settings"""
+        self.engine = _create_engine(f"sqlite:///{tmp_path / 'pragmas.db'}")
+        
+        with self.engine.connect() as conn:
+            pragmas = get_sqlite_pragmas(conn)
+        
+        assert pragmas["journal_mode"] == "wal"
+        assert pragmas["synchronous"] == 1  # NORMAL
+        assert pragmas["busy_timeout"] == 5000
+        assert pragmas["cache_size"] == -16000
+        assert pragmas["temp_store"] == 2  # MEMORY
+    
+    def test_reader_not_blocked_by_open_write_transaction(self, tmp_path):
+        """Test that a reader can query while another connection holds a write transaction"""
+        self.engine = _create_engine(f"sqlite:///{tmp_path / 'concurrency.db'}")
+        
+        with self.engine.begin() as conn:
+            conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+            conn.execute(text("INSERT INTO items (name) VALUES ('first')"))
+        
+        writer = self.engine.connect()
+        reader = self.engine.connect()
+        try:
+            writer.execute(text("INSERT INTO items (name) VALUES ('second')"))
+            
+            count = reader.execute(text("SELECT COUNT(*) FROM items")).scalar()
+            assert count == 1
+            
+            writer.commit()
+            reader.rollback()
+            count = reader.execute(text("SELECT COUNT(*) FROM items")).scalar()
+            assert count == 2
+        finally:
+            writer.close()
+            reader.close()
+    
+    def test_async_engine_uses_same_pragmas(self, tmp_path):
+        """Test that aiosqlite connections get the same configuration as sync ones"""
+        async_engine = _create_async_engine(to_async_url(f"sqlite:///{tmp_path / 'async.db'}"))
+        
+        async def read_pragmas():
+            try:
+                async with async_engine.connect() as conn:
+                    return await conn.run_sync(get_sqlite_pragmas)
+            finally:
+                await async_engine.dispose()
+        
+        pragmas = asyncio.run(read_pragmas())
+        assert pragmas["journal_mode"] == "wal"
+        assert pragmas["busy_timeout"] == 5000
+    
+    def test_keyword_pragmas_are_whitelisted(self, monkeypatch):
+        """Test that keyword PRAGMA values are normalised and anything else fails fast"""
+        monkeypatch.setenv("SQLITE_JOURNAL_MODE", " wal ")
+        assert pragma_choice("SQLITE_JOURNAL_MODE", "DELETE", "journal_mode") == "WAL"
+        
+        monkeypatch.setenv("SQLITE_JOURNAL_MODE", "WAL; DROP TABLE feedback_submissions")
+        with pytest.raises(ValueError, match="SQLITE_JOURNAL_MODE=.* is not a valid journal_mode"):
+            pragma_choice("SQLITE_JOURNAL_MODE", "WAL", "journal_mode")
+    
+    def test_numeric_pragmas_must_be_integers(self, monkeypatch):
+        """Test that size and timeout PRAGMAs are cast to int with a clear error"""
+        monkeypatch.setenv("SQLITE_CACHE_SIZE", "-8000")
+        assert pragma_int("SQLITE_CACHE_SIZE", -16000) == -8000
+        
+        monkeypatch.setenv("SQLITE_CACHE_SIZE", "1; PRAGMA writable_schema=1")
+        with pytest.raises(ValueError, match="SQLITE_CACHE_SIZE=.* is not an integer"):
+            pragma_int("SQLITE_CACHE_SIZE", -16000)
+
+
+class TestQueryInstrumentation:
+    """Test cases for the per-request SQL statement statistics"""
+    
+    def test_statements_are_counted_per_context(self, tmp_path):
+        """Test that statements run inside a request context are counted and timed"""
+        engine = _create_engine(f"sqlite:///{tmp_path / 'queries.db'}")
+        try:
+            with engine.connect() as conn:
+                conn.exec_driver_sql("SELECT 1")
+                
+                stats, token = start_query_stats()
+                try:
+                    conn.exec_driver_sql("SELECT 1")
+                    conn.exec_driver_sql("SELECT 2")
+                finally:
+                    stop_query_stats(token)
+            
+            assert stats.count == 2
+            assert stats.duration > 0
+            assert current_query_stats() is None
+        finally:
+            engine.dispose()
+    
+    def test_slow_queries_are_logged_with_parameter_shapes(self, tmp_path, caplog, monkeypatch):
+        """Test that the slow query log shows parameter types and sizes but not values"""
+        monkeypatch.setattr(database, "SLOW_QUERY_MS", 0)
+        engine = _create_engine(f"sqlite:///{tmp_path / 'queries.db'}")
+        try:
+            with caplog.at_level("WARNING", logger="app.database"):
+                with engine.connect() as conn:
+                    conn.execute(text("SELECT :name, :n"), {"name": "secret-value", "n": 3})
+        finally:
+            engine.dispose()
+        
+        messages = [r.getMessage() for r in caplog.records if r.getMessage().startswith("Slow query")]
+        assert any("params=(str(12), int)" in message for message in messages)
+        assert not any("secret-value" in message for message in messages)
+    
+    def test_describe_parameters_for_executemany(self):
+        """Test the shape description of a batch of parameter sets"""
+        assert describe_parameters([("a", 1), ("b", 2)], executemany=True) == "2 x (str(1), int)"
+        assert describe_parameters(()) == "()"
+
+
+class TestRecreateEngine:
+    """Test cases for rebuilding the engines after a failed health check"""
+    
+    def setup_method(self):
+        """Setup method to remember the engines the session factories are bound to"""
+        self.engine = database.engine
+        self.async_engine = database.async_engine
+    
+    def teardown_method(self):
+        """Teardown method to dispose of the new engines and rebind the originals"""
+        if database.engine is not self.engine:
+            database.engine.dispose()
+            asyncio.run(database.async_engine.dispose())
+        database.engine = self.engine
+        database.async_engine = self.async_engine
+        database.SessionLocal.configure(bind=self.engine)
+        database.AsyncSessionLocal.configure(bind=self.async_engine)
+    
+    def test_both_engines_and_factories_are_rebuilt(self, tmp_path, monkeypatch):
+        """Test that the async engine and AsyncSessionLocal are replaced along with the sync ones"""
+        monkeypatch.setattr(database, "DATABASE_URL", f"sqlite:///{tmp_path / 'recreated.db'}")
+        monkeypatch.setattr(database, "ASYNC_DATABASE_URL", to_async_url(database.DATABASE_URL))
+        session_factory = database.SessionLocal
+        async_session_factory = database.AsyncSessionLocal
+        
+        assert asyncio.run(database.recreate_engine()) is True
+        
+        assert database.engine is not self.engine
+        assert database.async_engine is not self.async_engine
+        assert database.async_engine.url.database == str(tmp_path / "recreated.db")
+        assert database.SessionLocal is session_factory
+        assert database.AsyncSessionLocal is async_session_factory
+        
+        async def query_new_engine():
+            async with async_session_factory() as db:
+                assert db.bind is database.async_engine
+                return (await db.execute(text("SELECT 1"))).scalar()
+        
+        assert asyncio.run(query_new_engine()) == 1
+        with session_factory() as db:
+            assert db.bind is database.engine
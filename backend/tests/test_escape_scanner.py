@@ -0,0 +1,34 @@
+from app.escape_scanner import count_escapes
+
+
+class TestCountEscapes:
+    """Test cases for the single-pass escape sequence counter"""
+    
+    def test_counts_every_kind(self):
+        """Test that each escape sequence is counted under its name"""
+        text = 'a\\nb\\n\\t\\r\\b\\f\\"q\\" \\\\ \\u00e9'
+        
+        assert count_escapes(text) == {
+            "newlines": 2,
+            "tabs": 1,
+            "carriage_returns": 1,
+            "backspaces": 1,
+            "form_feeds": 1,
+            "quotes": 2,
+            "backslashes": 1,
+            "unicode": 1,
+        }
+    
+    def test_plain_text_has_no_escapes(self):
+        """Test that text without backslashes, real newlines and empty strings return nothing"""
+        assert count_escapes("") == {}
+        assert count_escapes("Line one\nLine two\t\"quoted\"") == {}
+    
+    def test_escaped_backslash_is_consumed(self):
+        """Test that an escaped backslash is not also read as the start of the next escape"""
+        assert count_escapes("C:\\\\new") == {"backslashes": 1}
+    
+    def test_incomplete_unicode_is_ignored(self):
+        """Test that \\u needs four hex digits"""
+        assert count_escapes("\\u12 and \\uZZZZ") == {}
+        assert count_escapes("\\u1F60") == {"unicode": 1}
@@ -0,0 +1,83 @@
+import csv
+import io
+import json
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.export import export_statement, stream_export
+from app.filters import filter_feedback
+from app.models import FeedbackSubmission, SocialMediaPost
+
+
+engine = create_engine(
+    "sqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+Base.metadata.create_all(bind=engine)
+
+
+class TestStreamExport:
+    """Test cases for the streaming feedback export"""
+
+    def setup_method(self):
+        """Setup method to insert submissions, one with two posts"""
+        self.db = TestingSessionLocal()
+        self.db.query(SocialMediaPost).delete()
+        self.db.query(FeedbackSubmission).delete()
+        for i in range(50):
+            self.db.add(FeedbackSubmission(
+                submission_id=f"s{i}",
+                email="a@example.com" if i % 2 else "b@example.com",
+                linkedin_grok_content=f'Post {i}, with "quotes"\nand a newline',
+            ))
+        self.db.add_all([
+            SocialMediaPost(post_id="p1", feedback_submission_id="s0", image_url="https://example.com/1.png"),
+            SocialMediaPost(post_id="p2", feedback_submission_id="s0", ai_prompt="skyline"),
+        ])
+        self.db.commit()
+
+    def teardown_method(self):
+        """Teardown method to close database connection"""
+        self.db.close()
+
+    def export(self, statement=None, **kwargs):
+        return b"".join(stream_export(TestingSessionLocal, statement if statement is not None else export_statement(), **kwargs))
+
+    def test_ndjson_joins_posts(self):
+        """Test one line per post, and one line for submissions without posts"""
+        rows = [json.loads(line) for line in self.export(fmt="ndjson").decode("utf-8").splitlines()]
+        assert len(rows) == 51
+        assert [row["post_id"] for row in rows[:3]] == ["p1", "p2", None]
+        assert rows[0]["post_image_url"] == "https://example.com/1.png"
+        assert rows[1]["post_ai_prompt"] == "skyline"
+        assert rows[2]["linkedin_grok_content"] == 'Post 1, with "quotes"\nand a newline'
+
+    def test_csv_round_trip(self):
+        """Test that CSV quoting survives commas, quotes and newlines"""
+        rows = list(csv.DictReader(io.StringIO(self.export(fmt="csv").decode("utf-8"))))
+        assert len(rows) == 51
+        assert rows[2]["linkedin_grok_content"] == 'Post 1, with "quotes"\nand a newline'
+        assert rows[2]["post_id"] == ""
+
+    def test_filters_apply(self):
+        """Test that the list endpoint filters work on the export statement"""
+        statement = filter_feedback(export_statement(), email="a@example.com")
+        rows = self.export(statement, fmt="ndjson").decode("utf-8").splitlines()
+        assert len(rows) == 25
+
+    def test_stream_in_small_chunks(self):
+        """Test that small chunks join up to the whole export"""
+        chunks = list(stream_export(TestingSessionLocal, export_statement(), fmt="csv", chunk_bytes=256))
+        assert len(chunks) > 1
+        assert b"".join(chunks) == self.export(fmt="csv")
+
+    def test_empty_csv_has_header(self):
+        """Test that an export without rows still has the CSV header"""
+        statement = filter_feedback(export_statement(), email="nobody@example.com")
+        assert self.export(statement, fmt="csv").decode("utf-8").startswith("id,submission_id,")
@@ -0,0 +1,112 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.filters import (
+    InvalidFilter,
+    filter_feedback,
+    parse_fields,
+    parse_sort,
+    project_feedback,
+    sort_feedback,
+)
+from app.models import FeedbackSubmission, SocialMediaPost
+
+
+engine = create_engine(
+    "sqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+Base.metadata.create_all(bind=engine)
+
+
+class TestFeedbackFilters:
+    """Test cases for feedback list filtering, sorting and projection"""
+
+    def setup_method(self):
+        """Setup method to insert a few feedback submissions"""
+        self.db = TestingSessionLocal()
+        self.db.query(SocialMediaPost).delete()
+        self.db.query(FeedbackSubmission).delete()
+        self.db.add_all([
+            FeedbackSubmission(submission_id="a", email="a@example.com", linkedin_chosen_llm="grok", linkedin_feedback="shorter"),
+            FeedbackSubmission(submission_id="b", email="b@example.com", linkedin_chosen_llm="o3", x_feedback=""),
+            FeedbackSubmission(submission_id="c", email="a@example.com", linkedin_chosen_llm="o3", image_feedback="brighter"),
+        ])
+        self.db.add(SocialMediaPost(feedback_submission_id="c", image_url="https://example.com/c.png"))
+        self.db.commit()
+
+    def teardown_method(self):
+        """Teardown method to close database connection"""
+        self.db.close()
+
+    def submission_ids(self, query):
+        return sorted(feedback.submission_id for feedback in query.all())
+
+    def test_parse_sort(self):
+        """Test the sort whitelist and the descending prefix"""
+        assert parse_sort(None) == ("created_at", False)
+        assert parse_sort("-email") == ("email", True)
+        with pytest.raises(InvalidFilter):
+            parse_sort("linkedin_grok_content")
+
+    def test_parse_fields(self):
+        """Test that fields are deduplicated and unknown ones rejected"""
+        assert parse_fields(None) is None
+        assert parse_fields("email, submission_id,email") == ["email", "submission_id"]
+        with pytest.raises(InvalidFilter):
+            parse_fields("email,password")
+
+    def test_filter_by_email_and_llm(self):
+        """Test exact-match filters"""
+        query = self.db.query(FeedbackSubmission)
+        assert self.submission_ids(filter_feedback(query, email="a@example.com")) == ["a", "c"]
+        assert self.submission_ids(filter_feedback(query, email="a@example.com", linkedin_chosen_llm="o3")) == ["c"]
+
+    def test_filter_has_feedback(self):
+        """Test that a chosen LLM or custom content counts as feedback and empty strings do not"""
+        self.db.add_all([
+            FeedbackSubmission(submission_id="d", x_custom_content="My own post"),
+            FeedbackSubmission(submission_id="e", linkedin_feedback="", x_chosen_llm=""),
+        ])
+        self.db.commit()
+        query = self.db.query(FeedbackSubmission)
+        assert self.submission_ids(filter_feedback(query, has_feedback=True)) == ["a", "b", "c", "d"]
+        assert self.submission_ids(filter_feedback(query, has_feedback=False)) == ["e"]
+
+    def test_filter_created_range(self):
+        """Test that the date range includes rows created in the same second as the bound"""
+        created_at = self.db.query(FeedbackSubmission).first().created_at
+        query = self.db.query(FeedbackSubmission)
+        assert self.submission_ids(filter_feedback(query, created_after=created_at)) == ["a", "b", "c"]
+        assert self.submission_ids(filter_feedback(query, created_before=created_at)) == []
+        assert self.submission_ids(filter_feedback(query, created_before=created_at + timedelta(seconds=1))) == ["a", "b", "c"]
+
+    def test_sort_descending(self):
+        """Test sorting with the id tie-breaker"""
+        rows = sort_feedback(self.db.query(FeedbackSubmission), parse_sort("-email")).all()
+        assert [feedback.submission_id for feedback in rows] == ["b", "c", "a"]
+
+    def test_projection_loads_only_requested_columns(self):
+        """Test that unrequested Text columns are not loaded"""
+        feedback = project_feedback(self.db.query(FeedbackSubmission), ["email"]).filter(
+            FeedbackSubmission.submission_id == "a"
+        ).one()
+        unloaded = inspect(feedback).unloaded
+        assert "email" not in unloaded
+        assert "linkedin_grok_content" in unloaded
+        assert "social_media_posts" in unloaded
+
+    def test_projection_with_post_fields(self):
+        """Test that image URL fields eager-load the linked posts"""
+        feedback = project_feedback(self.db.query(FeedbackSubmission), ["image_url"]).filter(
+            FeedbackSubmission.submission_id == "c"
+        ).one()
+        assert "social_media_posts" not in inspect(feedback).unloaded
+        assert feedback.social_media_posts[0].image_url == "https://example.com/c.png"
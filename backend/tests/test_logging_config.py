@@ -0,0 +1,80 @@
+import io
+import json
+import logging
+
+from app import logging_config
+from app.logging_config import SamplingFilter, configure_logging, parse_levels, shutdown_logging
+
+
+class TestLoggingConfig:
+    """Test cases for the queue-backed JSON logging pipeline"""
+    
+    def setup_method(self):
+        """Setup method to save the root logger configuration"""
+        self.root = logging.getLogger()
+        self.saved_handlers = list(self.root.handlers)
+        self.saved_level = self.root.level
+        self.stream = io.StringIO()
+    
+    def teardown_method(self):
+        """Teardown method to restore the root logger configuration"""
+        shutdown_logging()
+        for handler in list(self.root.handlers):
+            self.root.removeHandler(handler)
+        for handler in self.saved_handlers:
+            self.root.addHandler(handler)
+        self.root.setLevel(self.saved_level)
+        logging.getLogger("test.quiet").setLevel(logging.NOTSET)
+    
+    def _lines(self):
+        shutdown_logging()
+        return [json.loads(line) for line in self.stream.getvalue().splitlines()]
+    
+    def test_records_are_written_as_json(self):
+        """Test that records reach the stream as one JSON object per line with extras and tracebacks"""
+        configure_logging(level="INFO", levels={}, fmt="json", stream=self.stream)
+        logger = logging.getLogger("test.json")
+        
+        logger.info("hello %s", "world", extra={"submission_id": "abc"})
+        try:
+            raise ValueError("bad")
+        except ValueError:
+            logger.exception("failed")
+        
+        hello, failed = self._lines()
+        assert hello["msg"] == "hello world"
+        assert hello["level"] == "INFO"
+        assert hello["logger"] == "test.json"
+        assert hello["submission_id"] == "abc"
+        assert "ValueError: bad" in failed["exc"]
+    
+    def test_per_logger_levels(self):
+        """Test that LOG_LEVELS style overrides silence individual loggers"""
+        configure_logging(level="DEBUG", levels={"test.quiet": "WARNING"}, fmt="json", stream=self.stream)
+        
+        logging.getLogger("test.quiet").info("dropped")
+        logging.getLogger("test.loud").debug("kept")
+        
+        assert [line["msg"] for line in self._lines()] == ["kept"]
+    
+    def test_configure_is_idempotent(self):
+        """Test that a second call reuses the running listener"""
+        first = configure_logging(levels={}, stream=self.stream)
+        assert configure_logging(levels={}, stream=self.stream) is first
+        assert logging_config._listener is first
+    
+    def test_parse_levels(self):
+        """Test parsing of the LOG_LEVELS environment variable"""
+        assert parse_levels("app.api=debug, httpx=WARNING,broken,=INFO") == {"app.api": "DEBUG", "httpx": "WARNING"}
+    
+    def test_sampling_filter(self):
+        """Test that DEBUG records are sampled and other levels pass unless they carry a rate"""
+        def record(level, **extra):
+            entry = logging.LogRecord("test", level, __file__, 1, "msg", (), None)
+            entry.__dict__.update(extra)
+            return entry
+        
+        assert not SamplingFilter(debug_rate=0).filter(record(logging.DEBUG))
+        assert SamplingFilter(debug_rate=1).filter(record(logging.DEBUG))
+        assert SamplingFilter(debug_rate=0).filter(record(logging.INFO))
+        assert not SamplingFilter().filter(record(logging.INFO, sample_rate=0))
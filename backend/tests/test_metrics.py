@@ -0,0 +1,137 @@
+import asyncio
+import json
+import subprocess
+import sys
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app import metrics
+from app.metrics import InstrumentedTransport, MetricsMiddleware, Registry, instrument_engine
+
+
+def make_registry(multiproc_dir: str = "") -> Registry:
+    registry = Registry(multiproc_dir=multiproc_dir)
+    registry.counter("http_requests_total", "Requests", ("method", "route", "status"))
+    registry.histogram("http_request_duration_seconds", "Latency", ("method", "route"), buckets=(0.1, 1.0))
+    return registry
+
+
+class TestRegistry:
+    """Test cases for the metrics registry and its exposition format"""
+    
+    def test_render_counter_and_histogram(self):
+        """Test the Prometheus text output for counters and cumulative histogram buckets"""
+        registry = make_registry()
+        registry.metrics["http_requests_total"].inc("GET", "/api/feedback/{submission_id}", "200")
+        duration = registry.metrics["http_request_duration_seconds"]
+        for value in (0.05, 0.5, 5.0):
+            duration.observe(value, "GET", "/x")
+        
+        output = registry.render()
+        
+        assert "# TYPE http_requests_total counter" in output
+        assert 'http_requests_total{method="GET",route="/api/feedback/{submission_id}",status="200"} 1.0' in output
+        assert 'http_request_duration_seconds_bucket{method="GET",route="/x",le="0.1"} 1.0' in output
+        assert 'http_request_duration_seconds_bucket{method="GET",route="/x",le="1.0"} 2.0' in output
+        assert 'http_request_duration_seconds_bucket{method="GET",route="/x",le="+Inf"} 3.0' in output
+        assert 'http_request_duration_seconds_count{method="GET",route="/x"} 3.0' in output
+        assert 'http_request_duration_seconds_sum{method="GET",route="/x"} 5.55' in output
+    
+    def test_label_values_are_escaped(self):
+        """Test that quotes and newlines cannot break the exposition format"""
+        registry = make_registry()
+        registry.metrics["http_requests_total"].inc('GE"T', "a\nb", "200")
+        
+        assert 'method="GE\\"T",route="a\\nb"' in registry.render()
+    
+    def test_multiprocess_snapshots_are_summed(self, tmp_path):
+        """Test that each worker's snapshot is merged into one scrape"""
+        worker_a = make_registry(str(tmp_path))
+        worker_b = make_registry(str(tmp_path))
+        worker_b._snapshot_path = lambda: str(tmp_path / "metrics_other.json")
+        
+        worker_a.metrics["http_requests_total"].inc("GET", "/x", "200")
+        worker_b.metrics["http_requests_total"].inc("GET", "/x", "200", amount=2)
+        worker_a.metrics["http_request_duration_seconds"].observe(0.05, "GET", "/x")
+        worker_b.metrics["http_request_duration_seconds"].observe(0.5, "GET", "/x")
+        worker_b.write_snapshot()
+        
+        output = worker_a.render()
+        
+        assert 'http_requests_total{method="GET",route="/x",status="200"} 3.0' in output
+        assert 'http_request_duration_seconds_count{method="GET",route="/x"} 2.0' in output
+    
+    def test_dead_workers_keep_counters_but_not_gauges(self, tmp_path):
+        """Test that an exited worker's gauge samples are dropped while its counters still count"""
+        worker = make_registry(str(tmp_path))
+        worker.gauge("db_pool_connections_in_use", "In use", ("engine",))
+        worker.metrics["http_requests_total"].inc("GET", "/x", "200")
+        worker.metrics["db_pool_connections_in_use"].set(1, "sync")
+        
+        exited = subprocess.Popen([sys.executable, "-c", "pass"])
+        exited.wait()
+        (tmp_path / f"metrics_{exited.pid}.json").write_text(json.dumps({
+            "http_requests_total": [[["GET", "/x", "200"], 5.0]],
+            "db_pool_connections_in_use": [[["sync"], 4.0]],
+        }))
+        
+        output = worker.render()
+        
+        assert 'http_requests_total{method="GET",route="/x",status="200"} 6.0' in output
+        assert 'db_pool_connections_in_use{engine="sync"} 1.0' in output
+
+
+class TestInstrumentation:
+    """Test cases for the request, outbound HTTP and pool instrumentation"""
+    
+    def setup_method(self):
+        """Setup method to start each test from empty metrics"""
+        for metric in metrics.REGISTRY.metrics.values():
+            metric.clear()
+    
+    def test_requests_are_labelled_by_route_template(self):
+        """Test that path parameters don't end up in the route label"""
+        app = FastAPI()
+        app.add_middleware(MetricsMiddleware)
+        
+        @app.get("/api/feedback/{submission_id}")
+        async def get_feedback(submission_id: str):
+            return {"id": submission_id}
+        
+        client = TestClient(app)
+        client.get("/api/feedback/abc")
+        client.get("/api/feedback/def")
+        client.get("/nowhere")
+        
+        output = metrics.REGISTRY.render()
+        assert 'http_requests_total{method="GET",route="/api/feedback/{submission_id}",status="200"} 2.0' in output
+        assert 'http_requests_total{method="GET",route="<unmatched>",status="404"} 1.0' in output
+    
+    def test_outbound_requests_are_recorded_per_host(self):
+        """Test that the transport wrapper records status and latency per destination"""
+        transport = InstrumentedTransport(httpx.MockTransport(lambda request: httpx.Response(202)))
+        
+        async def send():
+            async with httpx.AsyncClient(transport=transport) as client:
+                await client.post("http://n8n.test/webhook/abc", json={})
+        
+        asyncio.run(send())
+        
+        output = metrics.REGISTRY.render()
+        assert 'http_client_requests_total{destination="n8n.test",status="202"} 1.0' in output
+        assert 'http_client_request_duration_seconds_count{destination="n8n.test"} 1.0' in output
+    
+    def test_pool_checkouts_are_counted(self):
+        """Test the pool checkout counter and in-use gauge"""
+        engine = create_engine("sqlite://")
+        instrument_engine(engine, "test")
+        
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            assert 'db_pool_connections_in_use{engine="test"} 1.0' in metrics.REGISTRY.render()
+        
+        output = metrics.REGISTRY.render()
+        assert 'db_pool_checkouts_total{engine="test"} 1.0' in output
+        assert 'db_pool_connections_in_use{engine="test"} 0.0' in output
@@ -0,0 +1,124 @@
+import json
+import re
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.database import _create_engine
+from app.middleware import CORSLoggingMiddleware, ServerTimingMiddleware
+
+
+ALLOWED = "http://localhost:3000"
+FALLBACK = "http://frontend.test:3000"
+
+
+def make_client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(CORSLoggingMiddleware, allow_origins=[ALLOWED], fallback_origin=FALLBACK)
+    
+    @app.get("/ok")
+    async def ok():
+        return {"ok": True}
+    
+    @app.get("/missing")
+    async def missing():
+        raise HTTPException(status_code=404, detail="nope")
+    
+    @app.get("/bad-json")
+    async def bad_json():
+        return json.loads("{'single': 'quotes'}")
+    
+    @app.get("/boom")
+    async def boom():
+        raise RuntimeError("boom")
+    
+    return TestClient(app, raise_server_exceptions=False)
+
+
+class TestCORSLoggingMiddleware:
+    """Test cases for the combined CORS / error / access log middleware"""
+    
+    def setup_method(self):
+        """Setup method to create a fresh app for each test"""
+        self.client = make_client()
+    
+    def test_allowed_origin_is_echoed(self):
+        """Test that an allowed origin is reflected with the credential headers"""
+        response = self.client.get("/ok", headers={"Origin": ALLOWED})
+        
+        assert response.status_code == 200
+        assert response.headers["access-control-allow-origin"] == ALLOWED
+        assert response.headers["access-control-allow-credentials"] == "true"
+        assert response.headers["access-control-allow-methods"] == "GET, POST, PUT, DELETE, OPTIONS, PATCH"
+        assert response.headers["vary"] == "Origin"
+    
+    def test_unknown_origin_falls_back_to_frontend(self):
+        """Test that unknown or missing origins get the frontend URL"""
+        assert self.client.get("/ok", headers={"Origin": "http://evil.test"}).headers["access-control-allow-origin"] == FALLBACK
+        assert self.client.get("/ok").headers["access-control-allow-origin"] == FALLBACK
+    
+    def test_preflight_answered_directly(self):
+        """Test that preflight requests never reach the routes"""
+        headers = {"Origin": ALLOWED, "Access-Control-Request-Method": "POST"}
+        response = self.client.options("/ok", headers=headers)
+        
+        assert response.status_code == 200
+        assert response.headers["access-control-allow-origin"] == ALLOWED
+        assert response.headers["access-control-max-age"] == "3600"
+        
+        headers["Origin"] = "http://evil.test"
+        assert self.client.options("/ok", headers=headers).status_code == 400
+    
+    def test_error_responses_keep_cors_headers(self):
+        """Test that HTTP errors and unhandled exceptions are mapped to JSON with CORS headers"""
+        missing = self.client.get("/missing", headers={"Origin": ALLOWED})
+        assert missing.status_code == 404
+        assert missing.headers["access-control-allow-origin"] == ALLOWED
+        
+        bad_json = self.client.get("/bad-json", headers={"Origin": ALLOWED})
+        assert bad_json.status_code == 400
+        assert bad_json.json()["detail"][0]["type"] == "json_invalid"
+        assert bad_json.headers["access-control-allow-origin"] == ALLOWED
+        
+        boom = self.client.get("/boom")
+        assert boom.status_code == 500
+        assert boom.json()["detail"][0]["ctx"] == {"error": "boom"}
+    
+    def test_access_log_is_one_line(self, caplog):
+        """Test that a request produces a single access log record"""
+        with caplog.at_level("INFO", logger="app.access"):
+            self.client.get("/ok?x=1", headers={"Origin": ALLOWED})
+        
+        records = [r for r in caplog.records if r.name == "app.access"]
+        assert len(records) == 1
+        assert records[0].getMessage().startswith("GET /ok?x=1 200 ")
+    
+    def test_curl_health_checks_not_logged(self, caplog):
+        """Test that Docker health checks stay out of the access log"""
+        with caplog.at_level("INFO", logger="app.access"):
+            self.client.get("/health", headers={"User-Agent": "curl/8.0"})
+        
+        assert not [r for r in caplog.records if r.name == "app.access"]
+
+
+class TestServerTimingMiddleware:
+    """Test cases for the Server-Timing header"""
+    
+    def test_header_reports_request_queries(self, tmp_path):
+        """Test that statements issued by the route show up in the header"""
+        engine = _create_engine(f"sqlite:///{tmp_path / 'timing.db'}")
+        app = FastAPI()
+        app.add_middleware(ServerTimingMiddleware)
+        
+        @app.get("/queries")
+        def queries():
+            with engine.connect() as conn:
+                for _ in range(3):
+                    conn.exec_driver_sql("SELECT 1")
+            return {}
+        
+        try:
+            response = TestClient(app).get("/queries")
+        finally:
+            engine.dispose()
+        
+        assert re.fullmatch(r'db;dur=\d+\.\d;desc="3 queries"', response.headers["server-timing"])
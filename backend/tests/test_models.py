@@ -1,11 +1,11 @@
 import pytest
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import selectinload, sessionmaker
 from sqlalchemy.pool import StaticPool
 import uuid
 
 from app.database import Base
-from app.models import FeedbackSubmission
+from app.models import FeedbackSubmission, SocialMediaPost
 
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
@@ -253,4 +253,53 @@ class TestFeedbackSubmissionModel:
             self.db.commit()
         
         
-        self.db.rollback() 
\ No newline at end of file
+        self.db.rollback()
+
+
+class TestSocialMediaPostRelationship:
+    """Test cases for the feedback submission <-> social media post link"""
+    
+    def setup_method(self):
+        """Setup method to clear both tables before each test"""
+        self.db = TestingSessionLocal()
+        self.db.query(SocialMediaPost).delete()
+        self.db.query(FeedbackSubmission).delete()
+        self.db.commit()
+    
+    def teardown_method(self):
+        """Teardown method to close database connection"""
+        self.db.close()
+    
+    def test_feedback_submission_id_is_indexed_foreign_key(self):
+        """Test that the lookup column has an index and references submission_id"""
+        inspector = inspect(engine)
+        
+        indexes = {index["name"]: index["column_names"] for index in inspector.get_indexes("social_media_posts")}
+        assert indexes["ix_social_media_posts_feedback_submission_id"] == ["feedback_submission_id"]
+        
+        foreign_keys = inspector.get_foreign_keys("social_media_posts")
+        assert [(fk["referred_table"], fk["referred_columns"]) for fk in foreign_keys] == [("feedback_submissions", ["submission_id"])]
+    
+    def test_posts_are_eager_loaded(self):
+        """Test that selectinload fills the relationship for every submission in one extra query"""
+        feedback = FeedbackSubmission()
+        self.db.add(feedback)
+        self.db.flush()
+        self.db.add_all([
+            SocialMediaPost(feedback_submission_id=feedback.submission_id, image_url="https://example.com/1.png"),
+            SocialMediaPost(feedback_submission_id=feedback.submission_id, image_url="https://example.com/2.png"),
+        ])
+        self.db.add(FeedbackSubmission())
+        self.db.commit()
+        self.db.expunge_all()
+        
+        submissions = self.db.query(FeedbackSubmission).options(
+            selectinload(FeedbackSubmission.social_media_posts)
+        ).order_by(FeedbackSubmission.id).all()
+        
+        assert [post.image_url for post in submissions[0].social_media_posts] == [
+            "https://example.com/1.png", "https://example.com/2.png"
+        ]
+        assert submissions[1].social_media_posts == []
+        assert submissions[0].social_media_posts[0].feedback_submission is submissions[0]
+
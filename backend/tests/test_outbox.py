@@ -0,0 +1,118 @@
+import asyncio
+import httpx
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.database import Base, _create_engine, _create_async_engine, to_async_url
+from app.models import OutboxMessage, WebhookLog
+from app import outbox
+
+
+class TestOutboxDispatcher:
+    """Test cases for the webhook outbox dispatcher"""
+    
+    def setup_method(self):
+        """Setup method to speed up retries"""
+        self._backoff_base = outbox.OUTBOX_BACKOFF_BASE
+        outbox.OUTBOX_BACKOFF_BASE = 0
+    
+    def teardown_method(self):
+        """Teardown method to restore the backoff"""
+        outbox.OUTBOX_BACKOFF_BASE = self._backoff_base
+    
+    def _run(self, tmp_path, handler, scenario, **dispatcher_kwargs):
+        url = f"sqlite:///{tmp_path / 'outbox.db'}"
+        sync_engine = _create_engine(url)
+        Base.metadata.create_all(bind=sync_engine)
+        sync_engine.dispose()
+        
+        async def main():
+            async_engine = _create_async_engine(to_async_url(url))
+            session_factory = async_sessionmaker(async_engine, expire_on_commit=False)
+            client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            dispatcher = outbox.OutboxDispatcher(session_factory, lambda: client, **dispatcher_kwargs)
+            try:
+                return await scenario(session_factory, dispatcher)
+            finally:
+                await client.aclose()
+                await async_engine.dispose()
+        
+        return asyncio.run(main())
+    
+    def test_delivers_pending_message(self, tmp_path):
+        """Test that a queued payload is posted once and marked delivered"""
+        received = []
+        
+        def handler(request):
+            received.append(request.content)
+            return httpx.Response(200, text="ok")
+        
+        async def scenario(session_factory, dispatcher):
+            async with session_factory() as db:
+                outbox.enqueue(db, "n8n", "http://n8n.test/hook", [{"a": 1}])
+                await db.commit()
+            
+            assert await dispatcher.drain_once() == 1
+            assert await dispatcher.drain_once() == 0
+            
+            async with session_factory() as db:
+                message = (await db.execute(OutboxMessage.__table__.select())).one()
+                logs = (await db.execute(WebhookLog.__table__.select())).all()
+            return message, logs
+        
+        message, logs = self._run(tmp_path, handler, scenario)
+        
+        assert received == [b'[{"a": 1}]']
+        assert message.status == "delivered"
+        assert message.attempts == 1
+        assert len(logs) == 1
+        assert logs[0].response_status == 200
+    
+    def test_retries_then_dead_letters(self, tmp_path):
+        """Test that failing deliveries are retried and dead-lettered after max attempts"""
+        def handler(request):
+            return httpx.Response(503, text="unavailable")
+        
+        async def scenario(session_factory, dispatcher):
+            async with session_factory() as db:
+                outbox.enqueue(db, "n8n", "http://n8n.test/hook", {"a": 1})
+                await db.commit()
+            
+            for _ in range(5):
+                await dispatcher.drain_once()
+            
+            async with session_factory() as db:
+                message = (await db.execute(OutboxMessage.__table__.select())).one()
+                logs = (await db.execute(WebhookLog.__table__.select())).all()
+            return message, logs
+        
+        message, logs = self._run(tmp_path, handler, scenario, max_attempts=3)
+        
+        assert message.status == "dead"
+        assert message.attempts == 3
+        assert message.last_error == "HTTP 503"
+        assert [log.attempt for log in logs] == [1, 2, 3]
+    
+    def test_concurrent_dispatchers_claim_each_message_once(self, tmp_path):
+        """Test that two dispatchers (one per worker) never deliver the same message twice"""
+        received = []
+        
+        async def handler(request):
+            await asyncio.sleep(0.01)
+            received.append(request.content)
+            return httpx.Response(200)
+        
+        async def scenario(session_factory, dispatcher):
+            async with session_factory() as db:
+                for i in range(10):
+                    outbox.enqueue(db, "n8n", "http://n8n.test/hook", {"i": i})
+                await db.commit()
+            
+            other = outbox.OutboxDispatcher(session_factory, dispatcher._client_factory, concurrency=3)
+            for _ in range(5):
+                await asyncio.gather(dispatcher.drain_once(), other.drain_once())
+        
+        self._run(tmp_path, handler, scenario, concurrency=3)
+        
+        assert len(received) == 10
+        assert len(set(received)) == 10
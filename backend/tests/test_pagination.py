@@ -0,0 +1,95 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models import SocialMediaPost
+from app.pagination import InvalidCursor, decode_cursor, encode_cursor, paginate
+
+
+engine = create_engine(
+    "sqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+Base.metadata.create_all(bind=engine)
+
+
+class TestKeysetPagination:
+    """Test cases for cursor pagination over (created_at, id)"""
+
+    def setup_method(self):
+        """Setup method to insert posts, many sharing the same created_at second"""
+        self.db = TestingSessionLocal()
+        self.db.query(SocialMediaPost).delete()
+        for i in range(25):
+            self.db.add(SocialMediaPost(content_creator=f"creator-{i}", status="pending" if i % 2 else "posted"))
+        self.db.commit()
+
+    def teardown_method(self):
+        """Teardown method to close database connection"""
+        self.db.close()
+
+    def walk(self, query, limit):
+        pages = []
+        cursor = None
+        while True:
+            rows, cursor = paginate(query, SocialMediaPost, limit, cursor=cursor)
+            pages.append(rows)
+            if cursor is None:
+                return pages
+
+    def test_cursor_round_trip(self):
+        """Test that a cursor decodes back to its timestamp and id"""
+        created_at, row_id = decode_cursor(encode_cursor(self.db.query(SocialMediaPost).first().created_at, 7))
+        assert row_id == 7
+        assert created_at is not None
+
+    def test_invalid_cursor(self):
+        """Test that tampered cursors are rejected"""
+        with pytest.raises(InvalidCursor):
+            decode_cursor("not-a-cursor")
+
+    def test_pages_cover_every_row_once(self):
+        """Test that walking the cursors visits every row once in (created_at, id) order"""
+        pages = self.walk(self.db.query(SocialMediaPost), 10)
+        assert [len(page) for page in pages] == [10, 10, 5]
+        ids = [post.id for page in pages for post in page]
+        expected = [post.id for post in self.db.query(SocialMediaPost).order_by(SocialMediaPost.created_at, SocialMediaPost.id)]
+        assert ids == expected
+
+    def test_exact_multiple_has_no_empty_last_page(self):
+        """Test that the last full page returns no next cursor"""
+        pages = self.walk(self.db.query(SocialMediaPost), 5)
+        assert [len(page) for page in pages] == [5, 5, 5, 5, 5]
+
+    def test_cursor_with_filter(self):
+        """Test that the cursor composes with a status filter"""
+        query = self.db.query(SocialMediaPost).filter(SocialMediaPost.status == "pending")
+        ids = [post.id for page in self.walk(query, 4) for post in page]
+        assert len(ids) == 12
+        assert len(set(ids)) == 12
+
+    def test_offset_still_supported(self):
+        """Test that skip keeps working and returns a cursor to continue from"""
+        rows, cursor = paginate(self.db.query(SocialMediaPost), SocialMediaPost, 10, skip=10)
+        following, _ = paginate(self.db.query(SocialMediaPost), SocialMediaPost, 10, cursor=cursor)
+        assert len(rows) == 10
+        assert [post.id for post in following] == [
+            post.id for post in paginate(self.db.query(SocialMediaPost), SocialMediaPost, 10, skip=20)[0]
+        ]
+
+    def test_cursor_query_uses_composite_index(self):
+        """Test that both page queries are range seeks on the (created_at, id) index"""
+        _, cursor = paginate(self.db.query(SocialMediaPost), SocialMediaPost, 10)
+        created_at, row_id = decode_cursor(cursor)
+        params = {"created_at": created_at.strftime("%Y-%m-%d %H:%M:%S"), "id": row_id}
+        for condition in ("created_at = :created_at AND id > :id", "created_at > :created_at"):
+            plan = " ".join(str(row[-1]) for row in self.db.execute(text(
+                f"EXPLAIN QUERY PLAN SELECT * FROM social_media_posts WHERE {condition} ORDER BY created_at, id LIMIT 11"
+            ), params))
+            assert "SEARCH social_media_posts USING INDEX ix_social_media_posts_created_at_id" in plan
+            assert "TEMP B-TREE" not in plan
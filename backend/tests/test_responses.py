@@ -0,0 +1,37 @@
+import json
+from datetime import datetime
+
+from fastapi.encoders import jsonable_encoder
+
+from app.responses import model_response, models_response
+from app.schemas import FeedbackBatchGetResponse, FeedbackSubmissionResponse
+
+
+class TestModelsResponse:
+    """Test cases for the single-pass orjson responses"""
+
+    def setup_method(self):
+        """Setup method to build two response models"""
+        self.items = [
+            FeedbackSubmissionResponse(id=i, submission_id=f"s{i}", linkedin_grok_content="Draft — \"quoted\"\n",
+                                       created_at=datetime(2026, 10, 1, 9, 30, 0, 123456 * i))
+            for i in range(2)
+        ]
+
+    def test_matches_jsonable_encoder(self):
+        """Test that the body equals what the response_model path produced"""
+        body = json.loads(models_response(self.items).body)
+        assert body == jsonable_encoder(self.items)
+        assert body[1]["created_at"] == "2026-10-01T09:30:00.123456"
+
+    def test_exclude_unset_and_headers(self):
+        """Test projection of unset fields and pass-through headers"""
+        projected = [FeedbackSubmissionResponse(submission_id="s1")]
+        response = models_response(projected, exclude_unset=True, headers={"X-Next-Cursor": "abc"})
+        assert json.loads(response.body) == [{"submission_id": "s1"}]
+        assert response.headers["x-next-cursor"] == "abc"
+
+    def test_nested_model(self):
+        """Test a single model wrapping already validated models"""
+        response = model_response(FeedbackBatchGetResponse.model_construct(results=self.items, missing=["x"]))
+        assert json.loads(response.body)["results"][0]["submission_id"] == "s0"
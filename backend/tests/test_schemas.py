@@ -1,6 +1,6 @@
 import pytest
 from pydantic import ValidationError
-from datetime import datetime
+from datetime import datetime, timezone
 
 from app.schemas import FeedbackSubmissionCreate, FeedbackSubmissionResponse
 
@@ -315,19 +315,49 @@ class TestFeedbackSubmissionSchemas:
             "email": "long-text@example.com",
             "linkedin_grok_content": long_content,
             "linkedin_feedback": long_content,
-            "linkedin_custom_content": long_content,
             "x_grok_content": long_content,
             "x_feedback": long_content,
-            "x_custom_content": long_content,
             "image_feedback": long_content
         }
         
         feedback = FeedbackSubmissionCreate(**data)
+        custom = FeedbackSubmissionCreate(linkedin_custom_content=long_content, x_custom_content=long_content)
         
         assert feedback.linkedin_grok_content == long_content
         assert feedback.linkedin_feedback == long_content
-        assert feedback.linkedin_custom_content == long_content
+        assert custom.linkedin_custom_content == long_content
         assert feedback.x_grok_content == long_content
         assert feedback.x_feedback == long_content
-        assert feedback.x_custom_content == long_content
-        assert feedback.image_feedback == long_content 
\ No newline at end of file
+        assert custom.x_custom_content == long_content
+        assert feedback.image_feedback == long_content 
+
+class TestFeedbackMethodGroups:
+    """Test cases for the one-pass feedback method validator"""
+
+    def test_any_two_methods_conflict(self):
+        """Test that feedback + custom content is rejected like feedback + chosen LLM"""
+        with pytest.raises(ValidationError, match="Only one LinkedIn"):
+            FeedbackSubmissionCreate(linkedin_feedback="Shorter", linkedin_custom_content="My own post")
+        with pytest.raises(ValidationError, match="Only one X/Twitter"):
+            FeedbackSubmissionCreate(x_chosen_llm="Grok", x_custom_content="My own tweet")
+
+    def test_blank_values_are_not_selections(self):
+        """Test that empty and whitespace-only fields do not count as a method"""
+        feedback = FeedbackSubmissionCreate(linkedin_feedback="  ", linkedin_chosen_llm="Grok", image_feedback="", twitter_image_llm="o3")
+        assert feedback.linkedin_chosen_llm == "Grok"
+
+    def test_all_conflicts_in_one_error(self):
+        """Test that every conflicting group is reported together"""
+        with pytest.raises(ValidationError) as exc_info:
+            FeedbackSubmissionCreate(linkedin_feedback="a", linkedin_chosen_llm="Grok", linkedin_image_llm="o3", twitter_image_llm="Grok")
+        errors = exc_info.value.errors()
+        assert len(errors) == 1
+        assert "LinkedIn" in errors[0]["msg"] and "image" in errors[0]["msg"]
+        assert "X/Twitter" not in errors[0]["msg"]
+
+    def test_response_timestamps_use_isoformat(self):
+        """Test that response datetimes serialize to JSON with isoformat()"""
+        created = datetime(2026, 10, 1, 9, 30, tzinfo=timezone.utc)
+        response = FeedbackSubmissionResponse(submission_id="s1", created_at=created)
+        assert response.model_dump(mode="json")["created_at"] == created.isoformat()
+        assert response.model_dump()["created_at"] == created
@@ -0,0 +1,116 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models import FeedbackSubmission, SocialMediaPost
+from app.search import rebuild_search_index, search_feedback, to_match_query
+
+
+engine = create_engine(
+    "sqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# app.search hooks create_all to build the FTS table and triggers
+Base.metadata.create_all(bind=engine)
+
+
+class TestToMatchQuery:
+    """Test cases for turning user input into FTS5 queries"""
+
+    def test_words_are_quoted(self):
+        """Test that FTS5 operators in input are matched as text"""
+        assert to_match_query("founder NOT story") == '"founder" "NOT" "story"'
+
+    def test_phrase_and_prefix(self):
+        """Test quoted phrases and trailing-star prefixes"""
+        assert to_match_query('"our founder" launch*') == '"our founder" "launch"*'
+
+    def test_embedded_quotes_and_blank_input(self):
+        """Test that stray quotes are escaped and blank input yields no query"""
+        assert to_match_query('it"s') == '"it""s"'
+        assert to_match_query('   ""  ') == ""
+
+
+class TestFeedbackSearch:
+    """Test cases for the feedback_search index and its triggers"""
+
+    def setup_method(self):
+        """Setup method to insert feedback with a linked post"""
+        self.db = TestingSessionLocal()
+        self.db.query(SocialMediaPost).delete()
+        self.db.query(FeedbackSubmission).delete()
+        self.db.add_all([
+            FeedbackSubmission(
+                submission_id="launch",
+                linkedin_grok_content="We are launching our founder story this week",
+                x_feedback="Too formal for X",
+            ),
+            FeedbackSubmission(submission_id="recap", x_o3_content="Weekly recap: community growth and results"),
+        ])
+        self.db.add(SocialMediaPost(post_id="p1", feedback_submission_id="recap", ai_prompt="A watercolor city skyline"))
+        self.db.commit()
+
+    def teardown_method(self):
+        """Teardown method to close database connection"""
+        self.db.close()
+
+    def submission_ids(self, q):
+        return [result.submission_id for result in search_feedback(self.db, q)]
+
+    def test_insert_is_indexed(self):
+        """Test that content, feedback and post prompts are searchable"""
+        assert self.submission_ids("founder") == ["launch"]
+        assert self.submission_ids("formal") == ["launch"]
+        assert self.submission_ids("watercolor") == ["recap"]
+
+    def test_stemming_and_phrases(self):
+        """Test porter stemming and exact phrases"""
+        assert self.submission_ids("launch") == ["launch"]
+        assert self.submission_ids('"founder story"') == ["launch"]
+        assert self.submission_ids('"story founder"') == []
+
+    def test_snippet_highlights_match(self):
+        """Test that the snippet marks the matched term"""
+        result = search_feedback(self.db, "community")[0]
+        assert "<mark>community</mark>" in result.snippet
+        assert result.score > 0
+
+    def test_snippet_escapes_stored_markup(self):
+        """Test that markup in stored content is escaped and only the highlight is a tag"""
+        self.db.add(FeedbackSubmission(
+            submission_id="xss",
+            linkedin_custom_content='<script>alert("pwned")</script> <b>teardown</b> & more',
+        ))
+        self.db.commit()
+        snippet = search_feedback(self.db, "teardown")[0].snippet
+        assert "<script>" not in snippet
+        assert "&lt;script&gt;alert(&quot;pwned&quot;)&lt;/script&gt;" in snippet
+        assert "&lt;b&gt;<mark>teardown</mark>&lt;/b&gt; &amp; more" in snippet
+
+    def test_update_and_delete_are_synced(self):
+        """Test that the triggers follow updates and deletes on both tables"""
+        feedback = self.db.query(FeedbackSubmission).filter_by(submission_id="launch").one()
+        feedback.linkedin_grok_content = "A product teardown"
+        post = self.db.query(SocialMediaPost).filter_by(post_id="p1").one()
+        post.ai_prompt = "Neon portrait"
+        self.db.commit()
+        assert self.submission_ids("founder") == []
+        assert self.submission_ids("teardown") == ["launch"]
+        assert self.submission_ids("watercolor") == []
+        assert self.submission_ids("neon") == ["recap"]
+
+        self.db.delete(post)
+        self.db.delete(feedback)
+        self.db.commit()
+        assert self.submission_ids("neon") == []
+        assert self.submission_ids("teardown") == []
+
+    def test_rebuild(self):
+        """Test that a rebuild reindexes every submission"""
+        with engine.begin() as connection:
+            assert rebuild_search_index(connection) == 2
+        assert self.submission_ids("watercolor") == ["recap"]
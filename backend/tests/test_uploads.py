@@ -0,0 +1,139 @@
+import asyncio
+import io
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from starlette.datastructures import Headers, UploadFile
+
+from app.database import Base, _create_engine, _create_async_engine, to_async_url
+from app.uploads import MultipartFileStream, UploadCache, UploadTooLarge, hash_upload
+
+
+def make_upload(content: bytes, filename: str = "image.png") -> UploadFile:
+    return UploadFile(
+        file=io.BytesIO(content),
+        filename=filename,
+        headers=Headers({"content-type": "image/png"}),
+    )
+
+
+async def collect(stream) -> bytes:
+    return b"".join([chunk async for chunk in stream])
+
+
+class TestMultipartFileStream:
+    """Test cases for the streaming multipart encoder used by /api/upload-image"""
+    
+    def test_body_is_valid_multipart(self):
+        """Test that the streamed body wraps the file in a single form-data part"""
+        content = b"\x89PNG" + b"x" * 200_000
+        stream = MultipartFileStream(make_upload(content), chunk_size=16 * 1024)
+        
+        body = asyncio.run(collect(stream))
+        
+        header, rest = body.split(b"\r\n\r\n", 1)
+        assert header.startswith(f"--{stream.boundary}\r\n".encode())
+        assert b'name="files"; filename="image.png"' in header
+        assert b"Content-Type: image/png" in header
+        assert rest == content + f"\r\n--{stream.boundary}--\r\n".encode()
+        assert stream.bytes_read == len(content)
+        assert stream.content_type == f"multipart/form-data; boundary={stream.boundary}"
+    
+    def test_chunks_are_bounded(self):
+        """Test that no chunk is larger than the configured chunk size"""
+        stream = MultipartFileStream(make_upload(b"x" * 100_000), chunk_size=8192)
+        
+        async def chunk_sizes():
+            return [len(chunk) async for chunk in stream]
+        
+        sizes = asyncio.run(chunk_sizes())
+        assert max(sizes[1:-1]) <= 8192
+    
+    def test_size_limit_enforced_while_streaming(self):
+        """Test that the stream aborts as soon as the limit is crossed"""
+        stream = MultipartFileStream(make_upload(b"x" * 50_000), max_bytes=20_000, chunk_size=8192)
+        
+        with pytest.raises(UploadTooLarge):
+            asyncio.run(collect(stream))
+        assert stream.bytes_read <= 20_000 + 8192
+    
+    def test_filename_is_escaped(self):
+        """Test that quotes and newlines in the filename cannot break the part header"""
+        stream = MultipartFileStream(make_upload(b"x", filename='a"b\r\n.png'))
+        
+        body = asyncio.run(collect(stream))
+        assert b'filename="a%22b%0D%0A.png"' in body
+
+
+class TestUploadCache:
+    """Test cases for the content-addressed upload cache"""
+    
+    def _run(self, tmp_path, scenario):
+        url = f"sqlite:///{tmp_path / 'uploads.db'}"
+        sync_engine = _create_engine(url)
+        Base.metadata.create_all(bind=sync_engine)
+        sync_engine.dispose()
+        
+        async def main():
+            async_engine = _create_async_engine(to_async_url(url))
+            session_factory = async_sessionmaker(async_engine, expire_on_commit=False)
+            try:
+                async with session_factory() as db:
+                    return await scenario(db)
+            finally:
+                await async_engine.dispose()
+        
+        return asyncio.run(main())
+    
+    def test_hash_rewinds_and_identifies_content(self):
+        """Test that identical content hashes the same and the file can still be streamed"""
+        first = make_upload(b"same bytes", filename="a.png")
+        second = make_upload(b"same bytes", filename="b.png")
+        
+        first_hash, size = asyncio.run(hash_upload(first, chunk_size=4))
+        second_hash, _ = asyncio.run(hash_upload(second))
+        
+        assert first_hash == second_hash
+        assert size == len(b"same bytes")
+        assert asyncio.run(first.read()) == b"same bytes"
+    
+    def test_hash_enforces_size_limit(self):
+        """Test that the hashing pre-pass rejects oversized files"""
+        with pytest.raises(UploadTooLarge):
+            asyncio.run(hash_upload(make_upload(b"x" * 100), max_bytes=50, chunk_size=16))
+    
+    def test_hit_after_put(self, tmp_path):
+        """Test that a stored response is returned on the next lookup"""
+        cache = UploadCache()
+        
+        async def scenario(db):
+            assert await cache.get(db, "abc") is None
+            await cache.put(db, "abc", {"urls": ["https://cdn.test/a.png"]}, 10, "image/png")
+            return await cache.get(db, "abc"), await cache.stats(db)
+        
+        result, stats = self._run(tmp_path, scenario)
+        assert result == {"urls": ["https://cdn.test/a.png"]}
+        assert stats["hits"] == 1 and stats["misses"] == 1 and stats["entries"] == 1
+    
+    def test_evicts_least_recently_used(self, tmp_path):
+        """Test that the cache is trimmed to max_entries by last access"""
+        cache = UploadCache(max_entries=2)
+        
+        async def scenario(db):
+            await cache.put(db, "first", {"n": 1}, 1, None)
+            await cache.put(db, "second", {"n": 2}, 1, None)
+            await cache.get(db, "first")
+            await cache.put(db, "third", {"n": 3}, 1, None)
+            return [await cache.get(db, key) for key in ("first", "second", "third")]
+        
+        assert self._run(tmp_path, scenario) == [{"n": 1}, None, {"n": 3}]
+    
+    def test_expired_entries_are_misses(self, tmp_path):
+        """Test that entries older than the TTL are not served"""
+        cache = UploadCache(ttl_seconds=0)
+        
+        async def scenario(db):
+            await cache.put(db, "abc", {"n": 1}, 1, None)
+            return await cache.get(db, "abc")
+        
+        assert self._run(tmp_path, scenario) is None
+